@@ -4,7 +4,7 @@ Blueprints package - Flask application modularization
 This package contains all Flask blueprints for the application organized
 in a structured hierarchy:
 - ui/: Frontend/UI blueprints (base, workflows, files)
-- api/: Backend API blueprints (workflows, tools, plugins, system, files)
+- api/: Backend API blueprints (workflows, tools, plugins, system, files, databases)
 - shared/: Common utilities and helpers
 
 New structure provides:
@@ -29,11 +29,12 @@ from .api import (
     tools_api_blueprint,
     plugins_api_blueprint,
     system_api_blueprint,
-    files_api_blueprint
+    files_api_blueprint,
+    databases_api_blueprint
 )
 
 # Import shared utilities for backward compatibility
-from .shared import generators
+from .shared import task_executor
 
 
 def register_blueprints(app: Flask) -> None:
@@ -54,14 +55,15 @@ def register_blueprints(app: Flask) -> None:
     app.register_blueprint(plugins_api_blueprint)
     app.register_blueprint(system_api_blueprint)
     app.register_blueprint(files_api_blueprint)
+    app.register_blueprint(databases_api_blueprint)
     
     print("Blueprints registered successfully:")
     print(f"  - UI routes: /, /workflows, /files/*")
-    print(f"  - API routes: /api/* (workflows, tools, plugins, system, files)")
+    print(f"  - API routes: /api/* (workflows, tools, plugins, system, files, databases)")
 
 
 # Export registration function and shared utilities for backward compatibility
 __all__ = [
     'register_blueprints',
-    'generators'  # Export for main.py compatibility
+    'task_executor'  # Export for main.py compatibility
 ]
\ No newline at end of file
@@ -6,7 +6,8 @@ This package contains all Flask blueprints for API endpoints:
 - tools: Tools testing API (/api/tools/*)
 - plugins: Plugin management API (/api/reload_plugins)
 - system: System diagnostics API (/api/diagnostic)
-- files: Files CRUD API (/api/files/*) - for future implementation
+- files: Folder listing API (/api/files/)
+- databases: JSON databases read API (/api/databases/*)
 
 Each blueprint handles specific API functionality with consistent
 JSON responses and error handling.
@@ -17,6 +18,7 @@ from .tools import tools_api_blueprint
 from .plugins import plugins_api_blueprint
 from .system import system_api_blueprint
 from .files import files_api_blueprint
+from .databases import databases_api_blueprint
 
 # Export all API blueprints
 __all__ = [
@@ -24,5 +26,6 @@ __all__ = [
     'tools_api_blueprint',
     'plugins_api_blueprint', 
     'system_api_blueprint',
-    'files_api_blueprint'
+    'files_api_blueprint',
+    'databases_api_blueprint'
 ]
\ No newline at end of file
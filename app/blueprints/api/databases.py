@@ -0,0 +1,83 @@
+"""
+Databases API Blueprint - Read access to JSON databases
+
+This blueprint handles database-related API routes:
+- Page of collection entries (/api/databases/collection)
+
+Entries are streamed from the database file (JSON or SQLite, see
+app.storage.databases), so large databases are never loaded into worker memory.
+"""
+
+from itertools import islice
+from flask import Blueprint, request, jsonify
+from app.storage.databases import iter_db_collection
+from app.storage.paths import sandboxed_path_or_none
+from app.utils.response_types import response_output_error, ResponseKey, ResponseStatus
+
+# Create databases API blueprint
+databases_api_blueprint = Blueprint('databases_api', __name__, url_prefix='/api/databases')
+
+# Maximum entries per page
+COLLECTION_PAGE_MAX_LIMIT = 500
+
+
+def _database_path(db_filepath: str):
+    """Resolve a database path relative to the user data files path, None if outside of it."""
+    return sandboxed_path_or_none(db_filepath)
+
+
+@databases_api_blueprint.get('/collection')
+def get_collection_page():
+    """
+    Return one page of entries of a collection (newest first).
+
+    Query params:
+        db (str): Database file path relative to the user data files folder
+        collection (str): Collection name
+        offset (int): Number of entries to skip (use `next_offset` of the previous page)
+        limit (int): Entries per page (default 50, max 500)
+    """
+    db_filepath = request.args.get("db", default="")
+    collection = request.args.get("collection", default="")
+    offset = max(request.args.get("offset", default=0, type=int), 0)
+    limit = min(max(request.args.get("limit", default=50, type=int), 1), COLLECTION_PAGE_MAX_LIMIT)
+    if not db_filepath or not collection:
+        return jsonify(response_output_error({
+            ResponseKey.ERROR.value: "[get_collection_page()]: 'db' and 'collection' are required."
+            })), 400
+
+    full_path = _database_path(db_filepath)
+    if full_path is None:
+        return jsonify(response_output_error({
+            ResponseKey.ERROR.value: "[get_collection_page()]: Invalid db path: Path traversal not allowed."
+            })), 400
+
+    try:
+        entries_iterator = iter_db_collection(full_path, collection, offset=offset)
+        if entries_iterator is None:
+            return jsonify(response_output_error({
+                ResponseKey.ERROR.value: "[get_collection_page()]: Database or collection not found."
+                })), 404
+        # One entry more than the page tells if there is a next page
+        entries = list(islice(entries_iterator, limit + 1))
+        entries_iterator.close()
+    except Exception as e:
+        return jsonify(response_output_error({
+            ResponseKey.ERROR.value: f"[get_collection_page()]: {str(e)}"
+            })), 500
+
+    has_more = len(entries) > limit
+    return jsonify({
+        ResponseKey.STATUS.value: ResponseStatus.SUCCESS.value,
+        ResponseKey.DATA.value: {
+            "collection_name": collection,
+            "offset": offset,
+            "limit": limit,
+            "entries": entries[:limit],
+            "next_offset": offset + limit if has_more else None
+        }
+    }), 200
+
+
+# Export blueprint
+__all__ = ['databases_api_blueprint']
@@ -1,26 +1,78 @@
 """
-Files API Blueprint - File CRUD endpoints (placeholder)
+Files API Blueprint - File browser endpoints
 
 This blueprint handles file-related API routes:
-- Future file CRUD operations (/api/files/*)
+- Page of one folder's items (/api/files/)
 
-Currently placeholder - to be implemented in future.
+Only the requested directory is scanned, so listing a folder with thousands
+of files does not walk the whole user data tree. Item ids are the same as in
+the file browser UI (/files/file/<id>, /files/folder/<id>).
 """
 
-from flask import Blueprint, jsonify
+from flask import Blueprint, request, jsonify
+from app.configs.app_config import APP_SETTINGS
+from app.storage.manager import FileStorageManager
+from app.utils.response_types import response_output_error, ResponseKey, ResponseStatus
 
 # Create files API blueprint
 files_api_blueprint = Blueprint('files_api', __name__, url_prefix='/api/files')
 
+# Same folder and skipped folders as the file browser UI
+file_manager = FileStorageManager(base_path=APP_SETTINGS.USER_DATA_PATH, skip_folders=["__pycache__"])
+
+# Maximum items per page
+FOLDER_PAGE_MAX_LIMIT = 1000
+
+
+@files_api_blueprint.get('/')
+def list_folder():
+    """
+    Return one page of a folder's items (folders first).
+
+    Query params:
+        path (str): Folder path relative to the user data folder (default: the user data folder)
+        sort (str): "name" (default), "mtime" or "size"
+        order (str): "asc" (default) or "desc"
+        limit (int): Items per page (default 100, max 1000)
+        cursor (str): `next_cursor` of the previous page
+        stat (bool): Add "size" and "modified_at" to the items
+    """
+    folder_path = request.args.get("path", default="")
+    sort_by = request.args.get("sort", default="name")
+    descending = request.args.get("order", default="asc") == "desc"
+    limit = min(max(request.args.get("limit", default=100, type=int), 1), FOLDER_PAGE_MAX_LIMIT)
+    cursor = request.args.get("cursor") or None
+    with_stat = request.args.get("stat", default="").lower() in ("1", "true", "yes")
+
+    try:
+        page = file_manager.list_folder(folder_path, sort_by=sort_by, descending=descending,
+                                        limit=limit, cursor=cursor, with_stat=with_stat)
+    except ValueError as e:
+        return jsonify(response_output_error({
+            ResponseKey.ERROR.value: f"[list_folder()]: {str(e)}."
+            })), 400
+    except Exception as e:
+        return jsonify(response_output_error({
+            ResponseKey.ERROR.value: f"[list_folder()]: {str(e)}"
+            })), 500
+
+    if page is None:
+        return jsonify(response_output_error({
+            ResponseKey.ERROR.value: "[list_folder()]: Folder not found."
+            })), 404
 
-@files_api_blueprint.route('/', methods=['GET'])
-def placeholder():
-    """Placeholder endpoint for future file CRUD API."""
     return jsonify({
-        "status": "not_implemented",
-        "message": "File CRUD API endpoints will be implemented in the future"
-    }), 501
+        ResponseKey.STATUS.value: ResponseStatus.SUCCESS.value,
+        ResponseKey.DATA.value: {
+            "path": folder_path.strip("/"),
+            "sort": sort_by,
+            "order": "desc" if descending else "asc",
+            "limit": limit,
+            "items": page["items"],
+            "next_cursor": page["next_cursor"]
+        }
+    }), 200
 
 
 # Export blueprint
-__all__ = ['files_api_blueprint']
\ No newline at end of file
+__all__ = ['files_api_blueprint']
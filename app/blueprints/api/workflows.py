@@ -4,22 +4,32 @@ Workflows API Blueprint - Workflow management endpoints
 This blueprint handles workflow-related API routes:
 - Start task (/api/start_task)
 - Continue task (/api/continue_task) 
+- Task status and buffered events (/api/tasks/<task_id>)
+- Server-Sent Events stream of task events (/api/tasks/<task_id>/events)
 - Get workflows registry (/api/get_workflows_registry)
 
+Workflows run in background on the shared task executor, so these
+endpoints return immediately with task status.
+
 Separated for focused workflow API functionality.
 """
 
 import uuid
 import time
+import json
 import inspect
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify
 from app.core import WORKFLOWS_REGISTRY
 from app.utils.response_types import response_output_error, ResponseKey, ResponseStatus
-from app.blueprints.shared.helpers import get_workflows_catalog, generators
+from app.core.task_executor import FINAL_TASK_STATUSES
+from app.blueprints.shared.helpers import get_workflows_catalog, task_executor
 
 # Create workflows API blueprint
 workflows_api_blueprint = Blueprint('workflows_api', __name__, url_prefix='/api')
 
+# Seconds between SSE keep-alive comments while the task produces no events
+SSE_HEARTBEAT_SECONDS = 15
+
 
 @workflows_api_blueprint.route("/start_task", methods=["POST"])
 def start_task():
@@ -55,37 +65,118 @@ def start_task():
             kwargs['model'] = data.get('model')
         # Always include task_id
         kwargs['task_id'] = task_id
-                
-        generator_func = workflow['function'](**kwargs)
-        generators[task_id] = generator_func
         
-        # Check if the result is a generator
-        if hasattr(generator_func, '__iter__') and hasattr(generator_func, '__next__'):
-            # Kick off the generator until first yield
-            response_from_generator = next(generator_func)
-        else:
-            # If it's not a generator, use the return value directly
-            response_from_generator = generator_func
-        return jsonify({"task_id": task_id, "timestamp": time.time(), **response_from_generator})        
+        # Run the workflow in background - the request returns immediately
+        task = task_executor.start_task(
+            task_id=task_id,
+            workflow_function=workflow['function'],
+            kwargs=kwargs,
+            workflow_id=workflow_id
+        )
+        return jsonify({
+            ResponseKey.STATUS.value: ResponseStatus.SUCCESS.value,
+            ResponseKey.TASK_ID.value: task_id,
+            ResponseKey.TASK_STATUS.value: task.status,
+            ResponseKey.TIMESTAMP.value: time.time(),
+            ResponseKey.MESSAGE.value: {
+                ResponseKey.TITLE.value: "Workflow started",
+                ResponseKey.BODY.value: f"Workflow '{workflow_id}' is running in background."
+            }
+        }), 202
     except Exception as e:
         return jsonify(response_output_error({ResponseKey.ERROR.value: str(e)})), 500
 
 
 @workflows_api_blueprint.route("/continue_task", methods=["POST"])
 def continue_task():
-    """Continue an existing workflow task."""
-    data = request.json
+    """Resume a workflow task waiting for user input (runs in background)."""
+    data = request.json or {}
     task_id = data.get("task_id")
-    generator_func = generators.get(task_id)
-    if not generator_func:
+    task = task_executor.get_task(task_id)
+    if not task:
         return jsonify(response_output_error({ResponseKey.ERROR.value: "[continue_task()]: unknown task_id. Probably the workflow func incorrectly works with task_id"})), 400
     try:
-        continue_generator = generator_func.send(data.get("user_input")) # .send() will resume the generator
-        return jsonify(continue_generator)
-    except StopIteration as e:
-        # Signal SSE stream to close
-        generators.pop(task_id, None)        
-        return jsonify(getattr(e, "value", None) or {})
+        task = task_executor.continue_task(task_id, data.get("user_input"))
+        return jsonify({
+            ResponseKey.STATUS.value: ResponseStatus.SUCCESS.value,
+            ResponseKey.TASK_ID.value: task_id,
+            ResponseKey.TASK_STATUS.value: task.status,
+            ResponseKey.TIMESTAMP.value: time.time()
+        }), 202
+    except Exception as e:
+        return jsonify(response_output_error({
+            ResponseKey.ERROR.value: f"[continue_task()]: {str(e)}",
+            ResponseKey.TASK_ID.value: task_id
+            })), 409
+
+
+@workflows_api_blueprint.get("/tasks/<task_id>")
+def get_task_status(task_id):
+    """
+    Return task status and buffered events.
+
+    Query params:
+        after (int): Index of the first event to return (use `next_event_index`
+            from the previous response to fetch only new events)
+    """
+    task = task_executor.get_task(task_id)
+    if not task:
+        return jsonify(response_output_error({
+            ResponseKey.ERROR.value: "[get_task_status()]: unknown task_id.",
+            ResponseKey.TASK_ID.value: task_id
+            })), 404
+    after_index = request.args.get("after", default=0, type=int)
+    return jsonify(task.to_status_dict(after_index=after_index))
+
+
+@workflows_api_blueprint.get("/tasks/<task_id>/events")
+def stream_task_events(task_id):
+    """
+    Stream task events as Server-Sent Events.
+
+    Every message the workflow yields (status messages, interaction requests)
+    and its final response is sent as one SSE `message` with the event index
+    as SSE id. The stream ends with a `task_end` event once the task is
+    finished or failed. Reconnecting clients resume from the `Last-Event-ID`
+    header (or `?after=<index>`), so no event is lost or repeated.
+    """
+    task = task_executor.get_task(task_id)
+    if not task:
+        return jsonify(response_output_error({
+            ResponseKey.ERROR.value: "[stream_task_events()]: unknown task_id.",
+            ResponseKey.TASK_ID.value: task_id
+            })), 404
+
+    # Resume after the last event the client has already received
+    last_event_id = request.headers.get("Last-Event-ID")
+    if last_event_id is not None and last_event_id.isdigit():
+        start_index = int(last_event_id) + 1
+    else:
+        start_index = request.args.get("after", default=0, type=int)
+
+    def generate_events():
+        next_index = start_index
+        while True:
+            events, task_status = task.wait_for_events(after_index=next_index, timeout=SSE_HEARTBEAT_SECONDS)
+            for event in events:
+                yield f"id: {next_index}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+                next_index += 1
+            if task_status in FINAL_TASK_STATUSES and not task.get_events(after_index=next_index):
+                end_payload = {ResponseKey.TASK_ID.value: task_id, ResponseKey.TASK_STATUS.value: task_status}
+                yield f"event: task_end\ndata: {json.dumps(end_payload)}\n\n"
+                return
+            if not events:
+                # Comment line keeps proxies from closing an idle connection
+                yield ": heartbeat\n\n"
+
+    return Response(
+        generate_events(),
+        mimetype="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # Disable response buffering in nginx-like proxies
+        }
+    )
 
 
 @workflows_api_blueprint.get("/get_workflows_registry")
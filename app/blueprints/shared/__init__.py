@@ -10,10 +10,10 @@ These utilities promote code reuse and consistency across
 all blueprint modules.
 """
 
-from .helpers import get_workflows_catalog, generators
+from .helpers import get_workflows_catalog, task_executor
 
 # Export shared utilities
 __all__ = [
     'get_workflows_catalog',
-    'generators'
+    'task_executor'
 ]
\ No newline at end of file
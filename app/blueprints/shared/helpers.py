@@ -5,9 +5,34 @@ This module contains utility functions and shared data structures
 used across multiple blueprints to avoid code duplication.
 """
 
-# In‐memory store for generator functions (shared across application)
+from app.core.task_executor import TaskExecutor
+from app.core.task_store import SqliteTaskStore
+from app.configs.app_config import APP_SETTINGS
+
+
+def create_task_executor() -> TaskExecutor:
+    """
+    Create the workflow task executor configured in APP_SETTINGS.
+
+    With TASK_STORE_BACKEND="sqlite" task state is shared by all app
+    processes (e.g. gunicorn workers), otherwise it lives in process memory.
+    """
+    if APP_SETTINGS.TASK_STORE_BACKEND not in {"memory", "sqlite"}:
+        raise Exception(f"Unknown TASK_STORE_BACKEND '{APP_SETTINGS.TASK_STORE_BACKEND}'. Use 'memory' or 'sqlite'.")
+    task_store = None
+    if APP_SETTINGS.TASK_STORE_BACKEND == "sqlite":
+        task_store = SqliteTaskStore(APP_SETTINGS.TASK_STORE_SQLITE_PATH)
+    return TaskExecutor(
+        max_workers=APP_SETTINGS.TASK_EXECUTOR_MAX_WORKERS,
+        max_tasks=APP_SETTINGS.TASK_MAX_TASKS,
+        task_ttl_seconds=APP_SETTINGS.TASK_TTL_SECONDS,
+        store=task_store
+    )
+
+
+# Background executor running workflow tasks (shared across application)
 # This needs to be accessible from main.py for backward compatibility
-generators: dict[str, any] = {}
+task_executor = create_task_executor()
 
 
 def get_workflows_catalog():
@@ -49,5 +74,5 @@ def get_workflows_catalog():
 # Export all shared utilities
 __all__ = [
     'get_workflows_catalog',
-    'generators'
+    'task_executor'
 ]
\ No newline at end of file
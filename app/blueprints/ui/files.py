@@ -4,13 +4,16 @@ Files UI Blueprint - File browser and management
 This blueprint handles file-related UI routes:
 - File browser (/files, /files/folder/<id>)
 - File detail view (/files/file/<id>)
+- Raw file content (/files/file/<id>/raw)
 
 Moved from the original files.py blueprint for better organization.
 """
 
-from flask import Blueprint, render_template, redirect, url_for, abort
+import codecs
+from flask import Blueprint, render_template, redirect, url_for, abort, request, send_file
 from pathlib import Path
 from app.storage.manager import FileStorageManager
+from app.storage.prepend_log import materialize_prepends
 from app.configs.app_config import APP_SETTINGS
 
 # Create files UI blueprint with '/files' prefix
@@ -20,6 +23,9 @@ files_blueprint = Blueprint('files', __name__, url_prefix='/files')
 FILES_FOLDER = APP_SETTINGS.USER_DATA_PATH
 file_manager = FileStorageManager(base_path=FILES_FOLDER, skip_folders=["__pycache__"])
 
+# Files larger than this are shown truncated on the detail page, with a link to the raw content
+PREVIEW_MAX_BYTES = 256 * 1024
+
 
 # Redirect to handle the trailing slash issue
 @files_blueprint.route('/')
@@ -37,35 +43,23 @@ def files(item_id=None):
     Args:
         item_id: Optional folder ID to browse into
     """
-    structure = file_manager.get_structure()
-    items_list = structure['items']
-    
     # Get current folder and build breadcrumb path
     current_folder = None
     breadcrumbs = []
     
     if item_id:
-        current_folder = next((item for item in items_list if item.id == item_id), None)
+        current_folder = file_manager.get_item(item_id)
         if not current_folder or current_folder.type != 'folder':
             abort(404)
             
         # Build breadcrumbs
-        temp_folder = current_folder
-        while hasattr(temp_folder, 'parent'):
-            parent = next((item for item in items_list if item.id == temp_folder.parent), None)
-            if parent:
-                breadcrumbs.insert(0, parent)
-                temp_folder = parent
-            else:
-                break
+        breadcrumbs = file_manager.get_ancestors(current_folder)
         breadcrumbs.append(current_folder)
     
-    # Filter items for current folder
-    filtered_items = [
-        item for item in items_list 
-        if (not item_id and not hasattr(item, 'parent')) or
-           (hasattr(item, 'parent') and item.parent == item_id)
-    ]
+    # Items of the current folder
+    filtered_items = file_manager.get_children(item_id)
+    if filtered_items is None:
+        abort(404)
     
     return render_template('files.html', 
                          items=filtered_items, 
@@ -81,8 +75,7 @@ def file_detail(item_id):
     Args:
         item_id: File ID to display
     """
-    structure = file_manager.get_structure()
-    item = next((item for item in structure['items'] if item.id == item_id), None)
+    item = file_manager.get_item(item_id)
     
     if not item or item.type != 'file':
         abort(404)
@@ -93,24 +86,55 @@ def file_detail(item_id):
         # If item has no parent, it's in the root folder
         breadcrumbs = [{'id': None, 'name': 'root', 'type': 'folder'}]
     else:
-        current = next((i for i in structure['items'] if i.id == item.parent), None)
-        while current:
-            breadcrumbs.insert(0, current)
-            current = next((i for i in structure['items'] if i.id == current.parent), None) if hasattr(current, 'parent') and current.parent else None
+        breadcrumbs = file_manager.get_ancestors(item)
 
     try:
         full_path = Path(FILES_FOLDER) / item.file_path
-        print(f"DEBUG: Reading file from {full_path}")
-        print(f"DEBUG: File exists: {full_path.exists()}")
-        with full_path.open('r', encoding='utf-8') as f:
-            content = f.read()
-        print(f"DEBUG: Content length: {len(content)}")
-        print(f"DEBUG: First 50 chars: {content[:50]}")
-        return render_template('files_file_detail.html', item=item, content=content, breadcrumbs=breadcrumbs)
+        materialize_prepends(full_path)
+        size = full_path.stat().st_size
+        # Read only the preview part; an incomplete character at the cut is left out
+        with full_path.open('rb') as f:
+            data = f.read(PREVIEW_MAX_BYTES)
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        truncated = size > len(data)
+        content = decoder.decode(data, final=not truncated)
+        return render_template('files_file_detail.html', item=item, content=content, breadcrumbs=breadcrumbs,
+                               truncated=truncated, size=size)
     except Exception as e:
         print(f"Error reading file {item.file_path}: {e}")
         abort(500)
 
 
+@files_blueprint.route('/file/<item_id>/raw')
+def file_raw(item_id):
+    """
+    Raw file content, streamed in chunks.
+    
+    Supports HTTP Range requests and ETag / Last-Modified conditional requests.
+    
+    Args:
+        item_id: File ID to serve
+    
+    Query params:
+        download: If set, serve the file as an attachment
+    """
+    item = file_manager.get_item(item_id)
+    
+    if not item or item.type != 'file':
+        abort(404)
+
+    full_path = Path(FILES_FOLDER) / item.file_path
+    materialize_prepends(full_path)
+    try:
+        return send_file(
+            full_path,
+            conditional=True,
+            as_attachment=bool(request.args.get('download')),
+            download_name=item.title
+        )
+    except FileNotFoundError:
+        abort(404)
+
+
 # Export blueprint
 __all__ = ['files_blueprint']
\ No newline at end of file
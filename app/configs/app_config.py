@@ -24,4 +24,22 @@ class APP_SETTINGS:
     
     EXTERNAL_STORAGE_1_LOCAL_PATH = os.getenv("EXTERNAL_STORAGE_1_LOCAL_PATH")
     CUSTOM_MODULES_FOLDERS = ["workflows", "prompts", "tools"]
+
+    # Number of background threads running workflow tasks (per app process)
+    TASK_EXECUTOR_MAX_WORKERS = int(os.getenv("TASK_EXECUTOR_MAX_WORKERS", "8"))
+    # Tasks without activity (e.g. abandoned while waiting for user input) are evicted after this time
+    TASK_TTL_SECONDS = int(os.getenv("TASK_TTL_SECONDS", "3600"))
+    # Maximum number of tasks kept in memory per app process
+    TASK_MAX_TASKS = int(os.getenv("TASK_MAX_TASKS", "200"))
+    # "memory" (single process) or "sqlite" (shared by all gunicorn workers on one host)
+    TASK_STORE_BACKEND = os.getenv("TASK_STORE_BACKEND", "memory")
+    TASK_STORE_SQLITE_PATH = _APP_ROOT / "user" / ".runtime" / "tasks.sqlite3"
+
+    # Cache identical LLM requests on disk (opt-in, can also be enabled per fetch_llm call)
+    LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+    LLM_CACHE_PATH = _APP_ROOT / "user" / ".runtime" / "llm_cache"
+    LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+    LLM_CACHE_MAX_AGE_SECONDS = int(os.getenv("LLM_CACHE_MAX_AGE_SECONDS", str(30 * 24 * 3600)))
+    # LLM calls are logged to user/files/logs/llm_YYYYMMDD.jsonl, a new file is started after this size
+    LLM_LOG_MAX_BYTES = int(os.getenv("LLM_LOG_MAX_BYTES", str(50 * 1024 * 1024)))
     
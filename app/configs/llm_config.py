@@ -30,6 +30,18 @@ llm_providers = [
     }
 ]
 
+# HTTP client settings and rate limits for calls to LLM providers (shared pooled session per provider).
+# A provider can override any of them with an "http_settings" dict in its entry above.
+llm_http_settings = {
+    "pool_size": 10,          # kept-alive connections per provider
+    "max_retries": 3,         # retries on connection errors and 429/5xx responses
+    "backoff_factor": 0.5,    # exponential backoff between retries: 0.5s, 1s, 2s, ...
+    "connect_timeout": 10,    # seconds to establish connection
+    "read_timeout": 180,      # seconds to wait for the response (LLM completions can be slow)
+    "max_concurrency": 8,     # calls in flight per provider (per app process)
+    "requests_per_minute": None,  # call starts per minute per provider, None = unlimited
+}
+
 # Model Configurations 
 
 #
@@ -6,6 +6,7 @@ This module provides centralized access to core application functionality:
 - Configuration management  
 - Global registries
 - Shared base classes and utilities
+- Background task executor for workflow runs
 
 The core module acts as a single import point for commonly used functionality
 across the application, improving maintainability and reducing import complexity.
@@ -15,6 +16,8 @@ across the application, improving maintainability and reducing import complexity
 from .plugins_manager import PluginsManager
 from .plugins_config import PluginsConfig
 from .base import BaseManager, BaseConfig
+from .task_executor import TaskExecutor, WorkflowTask
+from .task_store import SqliteTaskStore
 
 # During migration, import existing registries for compatibility
 from app.utils.registries import (
@@ -33,7 +36,10 @@ __all__ = [
     'TOOLS_REGISTRY',
     'ASSISTANTS_REGISTRY',
     'BaseManager',
-    'BaseConfig'
+    'BaseConfig',
+    'TaskExecutor',
+    'WorkflowTask',
+    'SqliteTaskStore'
 ]
 
 # Version info for tracking migration progress
@@ -12,6 +12,7 @@ All functionality follows Python instructions for path handling and
 PythonAnywhere compatibility.
 """
 
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
@@ -20,6 +21,7 @@ class BaseManager:
     """Base class providing common functionality for all managers."""
     
     @staticmethod
+    @lru_cache(maxsize=None)
     def get_project_root() -> Path:
         """
         Get the project root directory using robust path resolution.
@@ -27,6 +29,8 @@ class BaseManager:
         This method follows Python instructions for absolute path resolution
         and ensures compatibility with PythonAnywhere hosting environment.
         
+        The result is cached for the process, the directory walk runs once.
+        
         Returns:
             Path: Absolute path to the project root directory
             
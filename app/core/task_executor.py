@@ -0,0 +1,394 @@
+"""
+Background task executor for workflow runs.
+
+Workflows are generator functions which yield status messages
+(`Workflow.stream_msg`) and interaction requests (`Workflow.interaction_request`)
+and return a final response. This module drives those generators on a thread
+pool, off the Flask request thread, and buffers every yielded message as a
+task event. HTTP endpoints only submit work and read buffered events, so they
+return immediately while the workflow (and its LLM calls) runs in background.
+
+A thread pool is used instead of a process pool because live generators
+cannot be pickled and moved to another process.
+
+Tasks are evicted after `task_ttl_seconds` without activity and the number
+of tasks held in memory is capped by `max_tasks`. With a shared task store
+(`SqliteTaskStore`) task state is visible to all app processes and user
+input posted to any process is routed to the process owning the generator.
+"""
+
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from app.core.task_store import SqliteTaskStore, StoredTaskView, FINAL_TASK_STATUSES
+from app.storage.prepend_log import materialize_stale_prepends
+from app.utils.response_types import (
+    ResponseKey,
+    ResponseAction,
+    ResponseStatus,
+    TaskStatus,
+    response_output_error,
+)
+
+
+# Seconds between maintenance runs (pending input routing, eviction)
+TASK_MAINTENANCE_INTERVAL = 0.5
+
+# Seconds between eviction passes (and merges of stale prepend logs) inside the maintenance loop
+TASK_EVICTION_INTERVAL = 30
+
+
+class WorkflowTask:
+    """
+    State of a single workflow run.
+
+    Holds the workflow generator, the list of buffered events (everything the
+    workflow yielded or returned) and the current task status. All mutations
+    happen under `self.condition`, so readers can wait for new events. When a
+    shared task store is given, events and status are written through to it.
+    """
+
+    def __init__(self, task_id: str, workflow_id: Optional[str] = None, store: Optional[SqliteTaskStore] = None):
+        self.task_id = task_id
+        self.workflow_id = workflow_id
+        self.status = TaskStatus.QUEUED.value
+        self.generator = None
+        self.events: List[dict] = []
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self.condition = threading.Condition()
+        self.store = store
+
+    def add_event(self, event: Any) -> None:
+        """Buffer one message produced by the workflow and wake up waiting readers."""
+        if not isinstance(event, dict):
+            event = {ResponseKey.DATA.value: event}
+        # Store a JSON snapshot: enum keys become plain strings and later
+        # mutations of the yielded dict by the workflow do not leak into the buffer
+        event = json.loads(json.dumps(event, ensure_ascii=False, default=str))
+        with self.condition:
+            event_index = len(self.events)
+            self.events.append(event)
+            self.updated_at = time.time()
+            if self.store:
+                self.store.add_event(self.task_id, event_index, event)
+            self.condition.notify_all()
+
+    def set_status(self, status: str) -> None:
+        """Change task status and wake up waiting readers."""
+        with self.condition:
+            self.status = status
+            self.updated_at = time.time()
+            if self.store:
+                self.store.set_status(self.task_id, status)
+            self.condition.notify_all()
+
+    def finish(self, final_response: Any) -> None:
+        """Buffer the final workflow response and mark the task as finished or failed."""
+        final_response = final_response if final_response is not None else {}
+        self.add_event(final_response)
+        failed = self.events[-1].get(ResponseKey.STATUS.value) == ResponseStatus.ERROR.value
+        self.set_status(TaskStatus.FAILED.value if failed else TaskStatus.FINISHED.value)
+
+    def is_final(self) -> bool:
+        """Return True if the task is finished or failed."""
+        return self.status in FINAL_TASK_STATUSES
+
+    def get_events(self, after_index: int = 0) -> List[dict]:
+        """Return buffered events starting at `after_index` (events are never removed)."""
+        with self.condition:
+            return self.events[max(after_index, 0):]
+
+    def wait_for_events(self, after_index: int = 0, timeout: Optional[float] = None) -> Tuple[List[dict], str]:
+        """
+        Block until there are events after `after_index`, the task ends or the timeout expires.
+
+        Returns:
+            tuple: (new events starting at `after_index`, current task status)
+        """
+        after_index = max(after_index, 0)
+        with self.condition:
+            self.condition.wait_for(
+                lambda: len(self.events) > after_index or self.is_final(),
+                timeout=timeout
+            )
+            return self.events[after_index:], self.status
+
+    def to_status_dict(self, after_index: int = 0) -> dict:
+        """Return JSON-serializable task status including events starting at `after_index`."""
+        with self.condition:
+            events = self.events[max(after_index, 0):]
+            return {
+                ResponseKey.STATUS.value: ResponseStatus.SUCCESS.value,
+                ResponseKey.TASK_ID.value: self.task_id,
+                ResponseKey.TASK_STATUS.value: self.status,
+                ResponseKey.EVENTS.value: events,
+                ResponseKey.NEXT_EVENT_INDEX.value: len(self.events),
+                ResponseKey.TIMESTAMP.value: time.time(),
+            }
+
+
+class TaskExecutor:
+    """
+    Runs workflow generators on a bounded thread pool.
+
+    A workflow is advanced in a pool thread until it yields an interaction
+    request (then the thread is released and the task waits for user input)
+    or until it returns (then the task is finished). Status messages are
+    buffered and the generator continues immediately, without a client
+    round-trip per message.
+
+    The pool and the maintenance thread are created lazily per process, so
+    an executor created before gunicorn forks its workers still works.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        max_tasks: int = 200,
+        task_ttl_seconds: float = 3600,
+        store: Optional[SqliteTaskStore] = None
+    ):
+        self.max_workers = max_workers
+        self.max_tasks = max_tasks
+        self.task_ttl_seconds = task_ttl_seconds
+        self.store = store
+        self.owner_id = None
+        self._pool = None
+        self._pid = None
+        self._tasks: Dict[str, WorkflowTask] = {}
+        self._tasks_lock = threading.Lock()
+        self._process_lock = threading.Lock()
+
+    def _ensure_process_resources(self) -> None:
+        """Create thread pool, owner ID and maintenance thread once per process."""
+        process_id = os.getpid()
+        if self._pid == process_id:
+            return
+        with self._process_lock:
+            if self._pid == process_id:
+                return
+            # Threads and live generators do not survive fork - start clean in a new process
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="workflow-task")
+            self._tasks = {}
+            self.owner_id = f"{socket.gethostname()}:{process_id}:{uuid.uuid4().hex[:8]}"
+            maintenance_thread = threading.Thread(target=self._maintenance_loop, name="workflow-task-maintenance", daemon=True)
+            maintenance_thread.start()
+            self._pid = process_id
+
+    def start_task(self, task_id: str, workflow_function: Callable, kwargs: dict, workflow_id: Optional[str] = None) -> WorkflowTask:
+        """
+        Register a new task and schedule the workflow to run in background.
+
+        Args:
+            task_id (str): Unique ID of the task
+            workflow_function (Callable): Workflow function from WORKFLOWS_REGISTRY
+            kwargs (dict): Keyword arguments for the workflow function
+            workflow_id (str, optional): Name of the workflow (for diagnostics)
+
+        Returns:
+            WorkflowTask: The registered task (status 'queued')
+        """
+        self._ensure_process_resources()
+        task = WorkflowTask(task_id=task_id, workflow_id=workflow_id, store=self.store)
+        if self.store:
+            self.store.create_task(task_id, workflow_id, self.owner_id, task.status)
+        with self._tasks_lock:
+            self._tasks[task_id] = task
+        self._enforce_max_tasks()
+        self._pool.submit(self._run_task, task, workflow_function, kwargs)
+        return task
+
+    def continue_task(self, task_id: str, user_input: Any) -> Union[WorkflowTask, StoredTaskView]:
+        """
+        Resume a task waiting for user input, in background.
+
+        Tasks owned by another process get the input through the shared task
+        store; the owning process resumes them in its maintenance loop.
+
+        Raises:
+            Exception: If the task does not exist or is not waiting for input
+        """
+        self._ensure_process_resources()
+        task = self._get_local_task(task_id)
+        if task:
+            self._resume_local_task(task, user_input)
+            return task
+
+        remote_task = self.get_task(task_id)
+        if not remote_task:
+            raise Exception(f"Unknown task_id '{task_id}'.")
+        if not self.store.post_input(task_id, user_input):
+            raise Exception(f"Task '{task_id}' is not waiting for user input (task status: {remote_task.status}).")
+        remote_task.status = TaskStatus.RUNNING.value
+        return remote_task
+
+    def get_task(self, task_id: str) -> Optional[Union[WorkflowTask, StoredTaskView]]:
+        """Return a local task, a view of a task owned by another process, or None if unknown."""
+        task = self._get_local_task(task_id)
+        if task or not self.store or not task_id:
+            return task
+        task_info = self.store.get_task_info(task_id)
+        return StoredTaskView(self.store, task_info) if task_info else None
+
+    def remove_task(self, task_id: str) -> None:
+        """Forget a task, closing its generator and failing it if still alive."""
+        with self._tasks_lock:
+            task = self._tasks.pop(task_id, None)
+        if task and not task.is_final():
+            if task.generator is not None:
+                try:
+                    task.generator.close()
+                except Exception as e:
+                    print(f"Warning: Failed to close generator of task {task_id}: {e}")
+            # Readers still holding the task (event streams, pollers) get a final event instead of waiting forever
+            task.finish(response_output_error({
+                ResponseKey.ERROR.value: "[TaskExecutor]: Task was evicted.",
+                ResponseKey.TASK_ID.value: task_id
+            }))
+        if self.store:
+            self.store.delete_task(task_id)
+
+    def get_tasks_count(self) -> int:
+        """Return number of tasks currently held by the executor."""
+        with self._tasks_lock:
+            return len(self._tasks)
+
+    def evict_expired_tasks(self) -> int:
+        """
+        Remove tasks without activity for longer than `task_ttl_seconds`.
+
+        This cleans up workflows abandoned while waiting for user input.
+        Running tasks are never evicted.
+
+        Returns:
+            int: Number of evicted local tasks
+        """
+        cutoff = time.time() - self.task_ttl_seconds
+        with self._tasks_lock:
+            expired_task_ids = [
+                task_id for task_id, task in self._tasks.items()
+                if task.updated_at < cutoff and task.status != TaskStatus.RUNNING.value
+            ]
+        for task_id in expired_task_ids:
+            self.remove_task(task_id)
+        if self.store:
+            self.store.delete_tasks_older_than(self.task_ttl_seconds)
+        return len(expired_task_ids)
+
+    def _enforce_max_tasks(self) -> None:
+        """Evict least recently active tasks (finished first, then waiting) above `max_tasks`."""
+        with self._tasks_lock:
+            overflow = len(self._tasks) - self.max_tasks
+            if overflow <= 0:
+                return
+            evictable_tasks = sorted(
+                (task for task in self._tasks.values() if task.status != TaskStatus.RUNNING.value),
+                key=lambda task: (not task.is_final(), task.updated_at)
+            )
+            task_ids_to_evict = [task.task_id for task in evictable_tasks[:overflow]]
+        for task_id in task_ids_to_evict:
+            self.remove_task(task_id)
+
+    def _get_local_task(self, task_id: str) -> Optional[WorkflowTask]:
+        with self._tasks_lock:
+            return self._tasks.get(task_id)
+
+    def _resume_local_task(self, task: WorkflowTask, user_input: Any, input_claimed: bool = False) -> None:
+        """
+        Switch a waiting local task to running and advance it in the pool.
+
+        Args:
+            input_claimed (bool): True if the input was already taken from the
+                task store (the store status is already 'running')
+        """
+        with task.condition:
+            if not input_claimed:
+                if task.status != TaskStatus.WAITING_FOR_INPUT.value:
+                    raise Exception(f"Task '{task.task_id}' is not waiting for user input (task status: {task.status}).")
+                # The store transition is atomic across processes, so input posted
+                # to another worker at the same time cannot resume the task twice
+                if task.store and not task.store.transition_status(task.task_id, TaskStatus.WAITING_FOR_INPUT.value, TaskStatus.RUNNING.value):
+                    raise Exception(f"Task '{task.task_id}' is not waiting for user input (input already received).")
+            # Switch status before submitting so a second request cannot resume the task twice
+            task.status = TaskStatus.RUNNING.value
+            task.updated_at = time.time()
+            task.condition.notify_all()
+        self._pool.submit(self._advance_task, task, user_input)
+
+    def _maintenance_loop(self) -> None:
+        """Route user input posted via the task store to local tasks, evict stale tasks and merge stale prepend logs."""
+        last_eviction = time.time()
+        while True:
+            time.sleep(TASK_MAINTENANCE_INTERVAL)
+            try:
+                if self.store:
+                    for task_id, user_input in self.store.take_pending_inputs(self.owner_id):
+                        task = self._get_local_task(task_id)
+                        if task:
+                            self._resume_local_task(task, user_input, input_claimed=True)
+                if time.time() - last_eviction >= TASK_EVICTION_INTERVAL:
+                    self.evict_expired_tasks()
+                    # Files prepended to by workflows catch up without waiting for a reader
+                    materialize_stale_prepends()
+                    last_eviction = time.time()
+            except Exception as e:
+                print(f"Warning: Task maintenance failed: {e}")
+
+    def _run_task(self, task: WorkflowTask, workflow_function: Callable, kwargs: dict) -> None:
+        """Call the workflow function (pool thread) and advance the generator to its first pause."""
+        task.set_status(TaskStatus.RUNNING.value)
+        try:
+            result = workflow_function(**kwargs)
+        except Exception as e:
+            task.finish(response_output_error({
+                ResponseKey.ERROR.value: f"[TaskExecutor]: {str(e)}",
+                ResponseKey.TASK_ID.value: task.task_id
+            }))
+            return
+
+        # Non-generator workflows return the final response directly
+        if not (hasattr(result, '__iter__') and hasattr(result, '__next__')):
+            task.finish(result)
+            return
+
+        task.generator = result
+        self._advance_task(task, None)
+
+    def _advance_task(self, task: WorkflowTask, value_to_send: Any) -> None:
+        """
+        Drive the generator (pool thread) until it asks for user input or ends.
+
+        Every yielded message is buffered as an event. Status messages do not
+        pause the workflow; interaction requests do.
+        """
+        task.set_status(TaskStatus.RUNNING.value)
+        try:
+            while True:
+                message = task.generator.send(value_to_send)
+                value_to_send = None
+                task.add_event(message)
+                if isinstance(message, dict) and message.get(ResponseKey.ACTION.value) == ResponseAction.INTERACTION_REQUEST.value:
+                    task.set_status(TaskStatus.WAITING_FOR_INPUT.value)
+                    return
+        except StopIteration as e:
+            task.finish(getattr(e, "value", None) or {})
+        except Exception as e:
+            task.finish(response_output_error({
+                ResponseKey.ERROR.value: f"[TaskExecutor]: {str(e)}",
+                ResponseKey.TASK_ID.value: task.task_id
+            }))
+
+
+# Export executor classes
+__all__ = [
+    'TaskExecutor',
+    'WorkflowTask',
+    'FINAL_TASK_STATUSES'
+]
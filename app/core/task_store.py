@@ -0,0 +1,251 @@
+"""
+Cross-process store for workflow task state.
+
+Live workflow generators can only run in the process that created them, but
+with several gunicorn workers the follow-up requests of one task (polling,
+SSE, continue_task) land on random workers. This module keeps task status,
+buffered events and posted user inputs in a SQLite database shared by all
+workers of one host:
+
+- any worker can read task status and events (`StoredTaskView`)
+- any worker can post user input for a task waiting for it
+- the owning worker picks the input up and resumes the generator locally
+
+Only the Python standard library (`sqlite3`) is used.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, List, Optional, Tuple, Union
+
+from app.utils.response_types import ResponseKey, ResponseStatus, TaskStatus
+
+
+# Task statuses after which the task will never produce new events
+FINAL_TASK_STATUSES = {TaskStatus.FINISHED.value, TaskStatus.FAILED.value}
+
+# Seconds between store reads while waiting for events of a task owned by another process
+STORED_TASK_POLL_INTERVAL = 0.25
+
+
+class SqliteTaskStore:
+    """
+    SQLite-backed task registry shared by all app processes.
+
+    Every thread uses its own connection; the database runs in WAL mode so
+    readers do not block the writer.
+    """
+
+    def __init__(self, db_path: Union[str, Path]):
+        self.db_path = Path(db_path).resolve()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._create_tables()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return the connection of the current thread (created on first use)."""
+        connection = getattr(self._local, "connection", None)
+        # SQLite connections must not be shared with a forked child process
+        if connection is None or self._local.process_id != os.getpid():
+            connection = sqlite3.connect(str(self.db_path), timeout=10, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            self._local.process_id = os.getpid()
+        return connection
+
+    def _create_tables(self) -> None:
+        connection = self._connection()
+        connection.execute("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                task_id TEXT PRIMARY KEY,
+                workflow_id TEXT,
+                owner_id TEXT NOT NULL,
+                status TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                pending_input TEXT,
+                has_pending_input INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        connection.execute("""
+            CREATE TABLE IF NOT EXISTS task_events (
+                task_id TEXT NOT NULL,
+                event_index INTEGER NOT NULL,
+                payload TEXT NOT NULL,
+                PRIMARY KEY (task_id, event_index)
+            )
+        """)
+        connection.execute("CREATE INDEX IF NOT EXISTS idx_tasks_owner_input ON tasks (owner_id, has_pending_input)")
+        connection.execute("CREATE INDEX IF NOT EXISTS idx_tasks_updated_at ON tasks (updated_at)")
+
+    def create_task(self, task_id: str, workflow_id: Optional[str], owner_id: str, status: str) -> None:
+        """Register a new task owned by the process `owner_id`."""
+        now = time.time()
+        self._connection().execute(
+            "INSERT OR REPLACE INTO tasks (task_id, workflow_id, owner_id, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (task_id, workflow_id, owner_id, status, now, now)
+        )
+
+    def add_event(self, task_id: str, event_index: int, event: dict) -> None:
+        """Store one task event under its index."""
+        connection = self._connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO task_events (task_id, event_index, payload) VALUES (?, ?, ?)",
+            (task_id, event_index, json.dumps(event, ensure_ascii=False))
+        )
+        connection.execute("UPDATE tasks SET updated_at = ? WHERE task_id = ?", (time.time(), task_id))
+
+    def set_status(self, task_id: str, status: str) -> None:
+        self._connection().execute(
+            "UPDATE tasks SET status = ?, updated_at = ? WHERE task_id = ?",
+            (status, time.time(), task_id)
+        )
+
+    def transition_status(self, task_id: str, from_status: str, to_status: str) -> bool:
+        """Atomically change task status only if it currently is `from_status`."""
+        cursor = self._connection().execute(
+            "UPDATE tasks SET status = ?, updated_at = ? WHERE task_id = ? AND status = ?",
+            (to_status, time.time(), task_id, from_status)
+        )
+        return cursor.rowcount == 1
+
+    def get_task_info(self, task_id: str) -> Optional[dict]:
+        """Return task row as dict or None if unknown."""
+        row = self._connection().execute(
+            "SELECT task_id, workflow_id, owner_id, status, created_at, updated_at FROM tasks WHERE task_id = ?",
+            (task_id,)
+        ).fetchone()
+        if not row:
+            return None
+        return {
+            "task_id": row[0],
+            "workflow_id": row[1],
+            "owner_id": row[2],
+            "status": row[3],
+            "created_at": row[4],
+            "updated_at": row[5],
+        }
+
+    def get_events(self, task_id: str, after_index: int = 0) -> List[dict]:
+        rows = self._connection().execute(
+            "SELECT payload FROM task_events WHERE task_id = ? AND event_index >= ? ORDER BY event_index",
+            (task_id, max(after_index, 0))
+        ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def post_input(self, task_id: str, user_input: Any) -> bool:
+        """
+        Hand user input over to the owning process.
+
+        The task is switched from 'waiting_for_input' to 'running' in the same
+        statement, so the input can be posted only once.
+
+        Returns:
+            bool: True if the task was waiting for input and the input was stored
+        """
+        cursor = self._connection().execute(
+            "UPDATE tasks SET status = ?, pending_input = ?, has_pending_input = 1, updated_at = ? "
+            "WHERE task_id = ? AND status = ?",
+            (TaskStatus.RUNNING.value, json.dumps(user_input, ensure_ascii=False), time.time(),
+             task_id, TaskStatus.WAITING_FOR_INPUT.value)
+        )
+        return cursor.rowcount == 1
+
+    def take_pending_inputs(self, owner_id: str) -> List[Tuple[str, Any]]:
+        """Return and clear user inputs posted for tasks owned by `owner_id`."""
+        connection = self._connection()
+        rows = connection.execute(
+            "SELECT task_id, pending_input FROM tasks WHERE owner_id = ? AND has_pending_input = 1",
+            (owner_id,)
+        ).fetchall()
+        taken_inputs = []
+        for task_id, pending_input in rows:
+            cursor = connection.execute(
+                "UPDATE tasks SET has_pending_input = 0, pending_input = NULL WHERE task_id = ? AND has_pending_input = 1",
+                (task_id,)
+            )
+            if cursor.rowcount == 1:
+                taken_inputs.append((task_id, json.loads(pending_input) if pending_input is not None else None))
+        return taken_inputs
+
+    def delete_task(self, task_id: str) -> None:
+        connection = self._connection()
+        connection.execute("DELETE FROM task_events WHERE task_id = ?", (task_id,))
+        connection.execute("DELETE FROM tasks WHERE task_id = ?", (task_id,))
+
+    def delete_tasks_older_than(self, max_age_seconds: float) -> int:
+        """Delete tasks (of any process) without activity for `max_age_seconds`. Running tasks are never deleted."""
+        connection = self._connection()
+        cutoff = time.time() - max_age_seconds
+        running = TaskStatus.RUNNING.value
+        connection.execute(
+            "DELETE FROM task_events WHERE task_id IN (SELECT task_id FROM tasks WHERE updated_at < ? AND status != ?)",
+            (cutoff, running)
+        )
+        cursor = connection.execute("DELETE FROM tasks WHERE updated_at < ? AND status != ?", (cutoff, running))
+        return cursor.rowcount
+
+
+class StoredTaskView:
+    """
+    Read-only view of a task owned by another process.
+
+    Offers the same reading interface as `WorkflowTask` (status, events,
+    waiting for events), backed by the shared task store.
+    """
+
+    def __init__(self, store: SqliteTaskStore, task_info: dict):
+        self.store = store
+        self.task_id = task_info["task_id"]
+        self.workflow_id = task_info["workflow_id"]
+        self.status = task_info["status"]
+
+    def _refresh_status(self) -> str:
+        task_info = self.store.get_task_info(self.task_id)
+        # A task deleted by eviction will never produce events again
+        self.status = task_info["status"] if task_info else TaskStatus.FAILED.value
+        return self.status
+
+    def is_final(self) -> bool:
+        return self._refresh_status() in FINAL_TASK_STATUSES
+
+    def get_events(self, after_index: int = 0) -> List[dict]:
+        return self.store.get_events(self.task_id, after_index)
+
+    def wait_for_events(self, after_index: int = 0, timeout: Optional[float] = None) -> Tuple[List[dict], str]:
+        """Poll the store until there are new events, the task ends or the timeout expires."""
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            status = self._refresh_status()
+            events = self.get_events(after_index)
+            if events or status in FINAL_TASK_STATUSES:
+                return events, status
+            if deadline is not None and time.time() >= deadline:
+                return [], status
+            time.sleep(STORED_TASK_POLL_INTERVAL)
+
+    def to_status_dict(self, after_index: int = 0) -> dict:
+        status = self._refresh_status()
+        after_index = max(after_index, 0)
+        events = self.get_events(after_index)
+        return {
+            ResponseKey.STATUS.value: ResponseStatus.SUCCESS.value,
+            ResponseKey.TASK_ID.value: self.task_id,
+            ResponseKey.TASK_STATUS.value: status,
+            ResponseKey.EVENTS.value: events,
+            ResponseKey.NEXT_EVENT_INDEX.value: after_index + len(events),
+            ResponseKey.TIMESTAMP.value: time.time(),
+        }
+
+
+# Export store classes
+__all__ = [
+    'SqliteTaskStore',
+    'StoredTaskView',
+    'FINAL_TASK_STATUSES'
+]
@@ -0,0 +1,64 @@
+"""
+Storage backend selection for the `json_db_*` tools.
+
+The backend is chosen by the database file name:
+- `.sqlite`, `.sqlite3`, `.db`: `SqliteDb` (large databases, incremental access)
+- anything else (`.json`): `JsonDb` (plain JSON file)
+
+Both store the same documents, so a database can be moved between backends
+without loss with `convert_db()` (e.g. export of a SQLite database to JSON).
+"""
+
+from pathlib import Path
+from typing import Any, Iterator, Optional, Union
+
+from app.storage.db_backend import DbBackend
+from app.storage.json_db import open_json_db, save_json_db
+from app.storage.json_db_stream import iter_collection
+from app.storage.sqlite_db import is_sqlite_db_path, open_sqlite_db
+
+
+def open_db(db_path: Union[str, Path]) -> DbBackend:
+    """Return the database for a file path, using the backend of its file type."""
+    if is_sqlite_db_path(db_path):
+        return open_sqlite_db(db_path)
+    return open_json_db(db_path)
+
+
+def save_db(db_path: Union[str, Path], document: dict) -> DbBackend:
+    """Write a whole database (document in the JSON database format) using the backend of its file type."""
+    if is_sqlite_db_path(db_path):
+        db = open_sqlite_db(db_path)
+        db.replace(document)
+        return db
+    return save_json_db(db_path, document)
+
+
+def iter_db_collection(db_path: Union[str, Path], collection: str, offset: int = 0) -> Optional[Iterator[Any]]:
+    """
+    Stream entries of one collection (newest first) without loading the whole database.
+    Returns None if the database or collection does not exist.
+    """
+    if is_sqlite_db_path(db_path):
+        db = open_sqlite_db(db_path)
+        if not db.has_collection(collection):
+            return None
+        return db.iter_entries(collection, offset=offset)
+    return iter_collection(db_path, collection, offset=offset)
+
+
+def convert_db(source_path: Union[str, Path], target_path: Union[str, Path]) -> DbBackend:
+    """Copy a database to another file, converting between backends by file type (replaces the target)."""
+    source = open_db(source_path)
+    if not source.exists:
+        raise Exception(f"Database file not found: {source_path}")
+    return save_db(target_path, source.to_dict())
+
+
+# Export backend selection functions
+__all__ = [
+    'open_db',
+    'save_db',
+    'iter_db_collection',
+    'convert_db'
+]
@@ -0,0 +1,151 @@
+"""
+Interface of the storage backends behind the `json_db_*` tools.
+
+A database is a document in the JSON database format:
+
+    {"db_info": {...}, "db_json_schema": {...}, "collections": {"name": [entry, ...]}, ...}
+
+with entries of each collection ordered newest first. Backends store it in
+different ways (`JsonDb`: the JSON file itself, `SqliteDb`: a SQLite
+database) but expose the same operations, so the tools do not depend on the
+storage. `to_dict()` / `replace()` convert a database from and to the JSON
+format without loss, which is how databases are exported and imported.
+
+Entry changes run in transactions (`with db.transaction(): ...`): either
+all changes of the block are stored, or none.
+"""
+
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from app.storage.json_db_schema import (
+    CollectionSchema, format_validation_errors, get_collection_schema, schema_hash
+)
+
+
+class DbBackend(ABC):
+    """Base class of database storage backends; subclasses implement the abstract storage methods."""
+
+    db_path: Path
+    # False if the database does not exist (yet)
+    exists: bool = False
+
+    # --- Transactions ---
+
+    @abstractmethod
+    def transaction(self):
+        """Context manager grouping changes into one atomic commit (nested transactions join the outer one)."""
+
+    # --- Changes ---
+
+    @abstractmethod
+    def add_entry(self, collection: str, entry: dict, updated_at: Optional[str] = None, validate: bool = True) -> dict:
+        """Add entry (must have an "id") as the newest one of the collection; an existing entry with its id is replaced."""
+
+    @abstractmethod
+    def update_entry(self, collection: str, entry_id: str, updates: dict, updated_at: Optional[str] = None,
+                     validate: bool = True) -> Optional[dict]:
+        """Merge `updates` into the entry. Returns the updated entry or None if not found."""
+
+    @abstractmethod
+    def delete_entry(self, collection: str, entry_id: str, updated_at: Optional[str] = None) -> bool:
+        """Delete entry by id. Returns False if not found."""
+
+    @abstractmethod
+    def add_collection(self, collection: str) -> None:
+        """Add an empty collection (no-op if it exists)."""
+
+    @abstractmethod
+    def define_index(self, collection: str, field: str, index_type: Optional[str]) -> None:
+        """Create (or change) a secondary index on a collection field; index_type None drops it."""
+
+    @abstractmethod
+    def replace(self, document: dict) -> None:
+        """Replace the whole database with a document in the JSON database format."""
+
+    def compact(self) -> None:
+        """Write pending changes into the main storage (no-op for backends without a journal)."""
+
+    # --- Reading ---
+
+    @property
+    @abstractmethod
+    def db_info(self) -> Optional[dict]:
+        """The `db_info` part of the database."""
+
+    @property
+    @abstractmethod
+    def db_json_schema(self) -> Optional[dict]:
+        """The `db_json_schema` part of the database."""
+
+    @abstractmethod
+    def has_collection(self, collection: str) -> bool:
+        """Return True if the collection exists."""
+
+    @abstractmethod
+    def collection_names(self) -> List[str]:
+        """Return names of all collections."""
+
+    @abstractmethod
+    def get_entry(self, collection: str, entry_id: str) -> Optional[dict]:
+        """Return entry by id, None if not found."""
+
+    @abstractmethod
+    def count_entries(self, collection: str) -> Optional[int]:
+        """Return number of entries of the collection, None if no such collection."""
+
+    @abstractmethod
+    def iter_entries(self, collection: str, offset: int = 0) -> Iterator[dict]:
+        """Iterate entries of the collection newest first, skipping the first `offset` ones."""
+
+    @abstractmethod
+    def get_indexes(self, collection: str) -> Dict[str, str]:
+        """Return {field: index type} of the collection."""
+
+    @abstractmethod
+    def query(self, collection: str, where: Optional[dict] = None, sort_by: Optional[str] = None,
+              descending: bool = False, limit: Optional[int] = None, offset: int = 0) -> Optional[dict]:
+        """
+        Find entries of a collection (see `JsonDb.query`).
+
+        Returns:
+            dict: {"total": number of matching entries, "entries": [...]} or None if no such collection
+        """
+
+    @abstractmethod
+    def to_dict(self) -> dict:
+        """Return the whole database in the JSON database format."""
+
+    # --- Shared by all backends ---
+
+    def get_entries(self, collection: str) -> Optional[List[dict]]:
+        """Return entries of the collection newest first, or None if no such collection."""
+        if not self.has_collection(collection):
+            return None
+        return list(self.iter_entries(collection))
+
+    def _current_schema_hash(self) -> Optional[str]:
+        """Hash of `db_json_schema`; backends cache it per version of the database."""
+        db_json_schema = self.db_json_schema
+        return schema_hash(db_json_schema) if isinstance(db_json_schema, dict) else None
+
+    def collection_schema(self, collection: str) -> Optional[CollectionSchema]:
+        """Return the compiled schema of a collection, None if the database has no schema for it."""
+        db_json_schema = self.db_json_schema
+        if not isinstance(db_json_schema, dict):
+            return None
+        return get_collection_schema((self.db_info or {}).get("id"), db_json_schema, collection, self._current_schema_hash())
+
+    def validate_entry(self, collection: str, entry: dict) -> None:
+        """Raise if the entry does not match the collection schema."""
+        schema = self.collection_schema(collection)
+        if schema is None:
+            return
+        errors = schema.validate(entry)
+        if errors:
+            raise Exception(f"Entry does not match the database schema: {format_validation_errors(errors)}")
+
+
+# Export backend interface
+__all__ = ['DbBackend']
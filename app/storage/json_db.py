@@ -0,0 +1,679 @@
+"""
+Storage engine for JSON databases used by the `json_db_*` tools.
+
+A database file keeps its plain format:
+
+    {"db_info": {...}, "collections": {"name": [entry, ...]}, ...}
+
+with entries of each collection ordered newest first. In memory every
+collection is a dict `id -> entry` (oldest first, so adding an entry is an
+append), which makes lookups, updates and deletes by id O(1).
+
+Changes are not written by rewriting the whole file. Each change is appended
+as one JSON line to a journal sidecar (`.<db file name>.journal`) and the
+journal is merged into the database file (compaction) once it grows too big.
+The first journal line records size and mtime of the database file it
+belongs to; a journal that does not match the database file (file edited
+by hand, or crash right after compaction) is ignored.
+
+Writes are crash-safe and safe between processes:
+- every change runs in a transaction holding an exclusive `fcntl` lock on
+  the `.<db file name>.lock` sidecar; the transaction first reloads the
+  database if another process changed it, and appends all its changes to
+  the journal with a single fsync on commit
+- compaction writes a temporary file and renames it over the database file
+- loading holds a shared lock, so it never sees a half-done compaction
+On Windows (no `fcntl`) only threads of one process are synchronized.
+
+Secondary indexes declared under the top-level `db_indexes` key are kept
+in memory and updated with every change (see `json_db_indexes`); `query()`
+uses them for filtering and sorting.
+
+Added and updated entries are validated against the collection schema in
+`db_json_schema` (compiled once, see `json_db_schema`).
+
+`open_json_db()` keeps loaded databases in memory for the whole process,
+keyed by resolved path, and reloads one only when its file or journal was
+changed by someone else (size or mtime differs).
+"""
+
+import copy
+import json
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from app.storage.json_db_indexes import (
+    SortedIndex, create_index, matches_condition, normalize_conditions, sort_entries
+)
+from app.storage.db_backend import DbBackend
+from app.storage.json_db_schema import schema_hash
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+# Journal is merged into the database file when it exceeds this size ...
+JOURNAL_COMPACT_MIN_BYTES = 256 * 1024
+# ... and this fraction of the database file size
+JOURNAL_COMPACT_RATIO = 0.5
+
+# Maximum number of databases kept loaded per process (least recently used are dropped)
+JSON_DB_CACHE_MAX_DBS = 16
+
+
+def journal_path_for(db_path: Union[str, Path]) -> Path:
+    """Return path of the journal sidecar of a database file."""
+    db_path = Path(db_path)
+    return db_path.with_name(f".{db_path.name}.journal")
+
+
+def lock_path_for(db_path: Union[str, Path]) -> Path:
+    """Return path of the lock sidecar of a database file."""
+    db_path = Path(db_path)
+    return db_path.with_name(f".{db_path.name}.lock")
+
+
+@contextmanager
+def db_file_lock(db_path: Union[str, Path], exclusive: bool = True):
+    """Hold the inter-process lock of a database (no-op without fcntl)."""
+    if fcntl is None:
+        yield
+        return
+    lock_path = lock_path_for(db_path)
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, "a") as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def read_journal(journal_path: Union[str, Path], db_signature: Optional[Tuple[int, int]]) -> Tuple[List[dict], int]:
+    """
+    Return (operations, journal size in bytes) of a journal, if it belongs to
+    the database file with the given (size, mtime_ns), otherwise ([], 0).
+    """
+    try:
+        with open(journal_path, "r", encoding="utf-8") as f:
+            lines = f.readlines()
+    except FileNotFoundError:
+        return [], 0
+    if not lines:
+        return [], 0
+    try:
+        header = json.loads(lines[0])
+    except ValueError:
+        header = {}
+    if header.get("op") != "base" or db_signature is None or [header.get("size"), header.get("mtime_ns")] != list(db_signature):
+        # Journal belongs to another version of the database file, the next commit overwrites it
+        return [], 0
+    operations = []
+    for line in lines[1:]:
+        try:
+            operations.append(json.loads(line))
+        except ValueError:
+            # Torn last line after a crash during append
+            break
+    return operations, sum(len(line.encode("utf-8")) for line in lines)
+
+
+def _fsync_directory(directory: Path) -> None:
+    """Persist a rename in the directory (not supported on Windows)."""
+    if os.name == "nt":
+        return
+    try:
+        fd = os.open(str(directory), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class JsonDb(DbBackend):
+    """In-memory, id-indexed view of one JSON database file with journaled writes."""
+
+    def __init__(self, db_path: Union[str, Path], load: bool = True):
+        self.db_path = Path(db_path)
+        self.journal_path = journal_path_for(self.db_path)
+        self.lock_path = lock_path_for(self.db_path)
+        self._reset()
+        self._files_signature = None
+        # Guards in-memory state; threads of one process share a cached instance
+        self._lock = threading.RLock()
+        self._transaction_depth = 0
+        self._pending_lines: List[str] = []
+        if load:
+            self._load()
+
+    def _reset(self) -> None:
+        self.exists = False
+        self._document: Dict[str, Any] = {}
+        self._collections: Dict[str, Dict[Any, dict]] = {}
+        # Collection -> entry key -> sequence number (higher is newer), orders query results by file order
+        self._sequence: Dict[str, Dict[Any, int]] = {}
+        self._next_sequence = 0
+        # Collection -> field -> index
+        self._indexes: Dict[str, Dict[str, Any]] = {}
+        # Hash of db_json_schema, computed on first use
+        self._schema_hash: Optional[str] = None
+        self._journal_bytes = 0
+        self._base_bytes = 0
+
+    # --- Locking ---
+
+    def _file_lock(self, exclusive: bool = True):
+        return db_file_lock(self.db_path, exclusive=exclusive)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Group changes into one atomic, durable commit:
+
+            with db.transaction():
+                db.add_entry("notes", {...})
+                db.delete_entry("notes", "abc123")
+
+        All changes are appended to the journal with one fsync when the block
+        ends. If the block raises, none of its changes are written and the
+        database is reloaded from disk. Nested transactions join the outer one.
+        """
+        with self._lock:
+            if self._transaction_depth:
+                self._transaction_depth += 1
+                try:
+                    yield self
+                finally:
+                    self._transaction_depth -= 1
+                return
+
+            with self._file_lock(exclusive=True):
+                if not self.is_current():
+                    # Another process changed the database since we loaded it
+                    self._reset()
+                    self._load(locked=True)
+                self._transaction_depth = 1
+                self._pending_lines = []
+                try:
+                    yield self
+                    self._commit()
+                except BaseException:
+                    self._pending_lines = []
+                    self._reset()
+                    self._load(locked=True)
+                    raise
+                finally:
+                    self._transaction_depth = 0
+
+    # --- Loading ---
+
+    @staticmethod
+    def _index_entries(entries: List[dict]) -> Dict[Any, dict]:
+        """Build `key -> entry` dict (oldest first) from a newest-first entry list."""
+        keys = []
+        seen_ids = set()
+        for position, entry in enumerate(entries):
+            entry_id = entry.get("id") if isinstance(entry, dict) else None
+            if isinstance(entry_id, str) and entry_id not in seen_ids:
+                seen_ids.add(entry_id)
+                keys.append(entry_id)
+            else:
+                # Entries without id and older duplicates of an id are kept (and written back)
+                # under keys no id lookup can match; a lookup finds the newest entry as before
+                keys.append(("__unindexed__", position))
+        return {key: entry for key, entry in zip(reversed(keys), reversed(entries))}
+
+    @staticmethod
+    def _stat_signature(path: Path) -> Optional[Tuple[int, int]]:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def _file_signature(self) -> Optional[Tuple[int, int]]:
+        return self._stat_signature(self.db_path)
+
+    def _current_files_signature(self) -> tuple:
+        return self._file_signature(), self._stat_signature(self.journal_path)
+
+    def is_current(self) -> bool:
+        """Return False if the database file or journal was changed since it was loaded or written here."""
+        return self._files_signature == self._current_files_signature()
+
+    def _load(self, locked: bool = False) -> None:
+        if not locked and self.db_path.exists():
+            with self._file_lock(exclusive=False):
+                self._load(locked=True)
+            return
+        try:
+            with open(self.db_path, "r", encoding="utf-8") as f:
+                document = json.load(f)
+        except FileNotFoundError:
+            self._files_signature = self._current_files_signature()
+            return
+        self.exists = True
+        self._base_bytes = self.db_path.stat().st_size
+        self._set_document(document)
+        self._replay_journal()
+        self._files_signature = self._current_files_signature()
+
+    def _set_document(self, document: dict) -> None:
+        self._document = dict(document)
+        self._schema_hash = None
+        collections = self._document.get("collections")
+        self._collections = {}
+        self._sequence = {}
+        self._next_sequence = 0
+        if isinstance(collections, dict):
+            for name, entries in collections.items():
+                self._collections[name] = self._index_entries(entries if isinstance(entries, list) else [])
+                self._sequence[name] = {}
+                for key in self._collections[name]:
+                    self._sequence[name][key] = self._next_sequence
+                    self._next_sequence += 1
+        self._indexes = {}
+        for collection, fields in (self._document.get("db_indexes") or {}).items():
+            for field, index_type in (fields or {}).items():
+                self._build_index(collection, field, index_type)
+
+    def _build_index(self, collection: str, field: str, index_type: str) -> None:
+        # Sorted indexes order equal values by the sequence numbers of the collection
+        index = create_index(field, index_type, self._sequence.setdefault(collection, {}))
+        index.build((key, entry) for key, entry in self._collections.get(collection, {}).items() if isinstance(entry, dict))
+        self._indexes.setdefault(collection, {})[field] = index
+
+    def _index_add(self, collection: str, key: Any, entry: dict) -> None:
+        for index in self._indexes.get(collection, {}).values():
+            index.add(key, entry)
+
+    def _index_remove(self, collection: str, key: Any, entry: Optional[dict]) -> None:
+        if not isinstance(entry, dict):
+            return
+        for index in self._indexes.get(collection, {}).values():
+            index.remove(key, entry)
+
+    def _replay_journal(self) -> None:
+        operations, self._journal_bytes = read_journal(self.journal_path, self._file_signature())
+        for operation in operations:
+            self._apply(operation)
+
+    # --- Changes ---
+
+    def _apply(self, operation: dict) -> None:
+        op = operation.get("op")
+        collection = operation.get("c")
+        if op == "add":
+            entries = self._collections.setdefault(collection, {})
+            entry = operation["e"]
+            # Re-added id moves to the newest position
+            self._index_remove(collection, entry["id"], entries.pop(entry["id"], None))
+            entries[entry["id"]] = entry
+            self._sequence.setdefault(collection, {})[entry["id"]] = self._next_sequence
+            self._next_sequence += 1
+            self._index_add(collection, entry["id"], entry)
+        elif op == "update":
+            entries = self._collections.get(collection)
+            entry_id = operation["e"]["id"]
+            if entries is not None and entry_id in entries:
+                self._index_remove(collection, entry_id, entries[entry_id])
+                entries[entry_id] = operation["e"]
+                self._index_add(collection, entry_id, operation["e"])
+        elif op == "delete":
+            entries = self._collections.get(collection)
+            if entries is not None:
+                self._index_remove(collection, operation["id"], entries.pop(operation["id"], None))
+                self._sequence.get(collection, {}).pop(operation["id"], None)
+        elif op == "add_collection":
+            self._collections.setdefault(collection, {})
+            self._sequence.setdefault(collection, {})
+        elif op == "index":
+            db_indexes = self._document.setdefault("db_indexes", {})
+            if operation.get("t"):
+                db_indexes.setdefault(collection, {})[operation["f"]] = operation["t"]
+                self._build_index(collection, operation["f"], operation["t"])
+            else:
+                db_indexes.get(collection, {}).pop(operation["f"], None)
+                self._indexes.get(collection, {}).pop(operation["f"], None)
+        if operation.get("updated_at") and isinstance(self._document.get("db_info"), dict):
+            self._document["db_info"]["updated_at"] = operation["updated_at"]
+
+    def _write(self, operation: dict) -> None:
+        """Apply a change in memory and queue it for the journal (in a transaction)."""
+        if not self._transaction_depth:
+            with self.transaction():
+                self._write(operation)
+            return
+        if not self.exists:
+            raise Exception(f"Database file not found: {self.db_path}")
+        self._apply(operation)
+        self._pending_lines.append(json.dumps(operation, ensure_ascii=False))
+
+    def _commit(self) -> None:
+        """Append queued changes to the journal with one fsync (called holding the file lock)."""
+        if not self._pending_lines:
+            return
+        lines = self._pending_lines
+        self._pending_lines = []
+        mode = "a"
+        if self._journal_bytes == 0:
+            # New journal; replaces a stale journal of another database file version
+            size, mtime_ns = self._file_signature()
+            lines.insert(0, json.dumps({"op": "base", "size": size, "mtime_ns": mtime_ns}))
+            mode = "w"
+        content = "\n".join(lines) + "\n"
+        with open(self.journal_path, mode, encoding="utf-8") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        self._journal_bytes += len(content.encode("utf-8"))
+        if self._journal_bytes > max(JOURNAL_COMPACT_MIN_BYTES, self._base_bytes * JOURNAL_COMPACT_RATIO):
+            self._compact_locked()
+        else:
+            self._files_signature = self._current_files_signature()
+
+    def _get_entry(self, collection: str, entry_id: str) -> Optional[dict]:
+        entries = self._collections.get(collection)
+        if entries is None or not isinstance(entry_id, str):
+            return None
+        return entries.get(entry_id)
+
+    def _current_schema_hash(self) -> Optional[str]:
+        with self._lock:
+            if self._schema_hash is None and isinstance(self.db_json_schema, dict):
+                # Hashed once per loaded version of the database
+                self._schema_hash = schema_hash(self.db_json_schema)
+            return self._schema_hash
+
+    def add_entry(self, collection: str, entry: dict, updated_at: Optional[str] = None, validate: bool = True) -> dict:
+        """Add entry (must have an "id") as the newest one of the collection."""
+        if not isinstance(entry.get("id"), str):
+            raise Exception("Entry id (str) is required.")
+        if validate:
+            self.validate_entry(collection, entry)
+        # Stored entries must not change when the caller later modifies its dict
+        self._write({"op": "add", "c": collection, "e": copy.deepcopy(entry), "updated_at": updated_at})
+        return entry
+
+    def update_entry(self, collection: str, entry_id: str, updates: dict, updated_at: Optional[str] = None,
+                     validate: bool = True) -> Optional[dict]:
+        """Merge `updates` into the entry. Returns the updated entry or None if not found."""
+        with self.transaction():
+            entry = self._get_entry(collection, entry_id)
+            if entry is None:
+                return None
+            updated_entry = {**entry, **copy.deepcopy(updates), "id": entry_id}
+            if validate:
+                self.validate_entry(collection, updated_entry)
+            self._write({"op": "update", "c": collection, "e": updated_entry, "updated_at": updated_at})
+            return copy.deepcopy(updated_entry)
+
+    def delete_entry(self, collection: str, entry_id: str, updated_at: Optional[str] = None) -> bool:
+        """Delete entry by id. Returns False if not found."""
+        with self.transaction():
+            if self._get_entry(collection, entry_id) is None:
+                return False
+            self._write({"op": "delete", "c": collection, "id": entry_id, "updated_at": updated_at})
+            return True
+
+    def add_collection(self, collection: str) -> None:
+        with self.transaction():
+            if collection not in self._collections:
+                self._write({"op": "add_collection", "c": collection})
+
+    def define_index(self, collection: str, field: str, index_type: Optional[str]) -> None:
+        """Create (or change) a secondary index on a collection field; index_type None drops it."""
+        if index_type:
+            # Fails on unknown index type before anything is written
+            create_index(field, index_type)
+        with self.transaction():
+            self._write({"op": "index", "c": collection, "f": field, "t": index_type})
+
+    # --- Reading ---
+
+    @property
+    def db_info(self) -> Optional[dict]:
+        return self._document.get("db_info")
+
+    @property
+    def db_json_schema(self) -> Optional[dict]:
+        return self._document.get("db_json_schema")
+
+    def has_collection(self, collection: str) -> bool:
+        return collection in self._collections
+
+    def collection_names(self) -> List[str]:
+        return list(self._collections.keys())
+
+    # Returned entries are copies: the instance may be shared through the process-wide cache
+
+    def get_entry(self, collection: str, entry_id: str) -> Optional[dict]:
+        with self._lock:
+            return copy.deepcopy(self._get_entry(collection, entry_id))
+
+    def get_indexes(self, collection: str) -> Dict[str, str]:
+        """Return {field: index type} of the collection."""
+        return {field: index.type for field, index in self._indexes.get(collection, {}).items()}
+
+    def query(self, collection: str, where: Optional[dict] = None, sort_by: Optional[str] = None,
+              descending: bool = False, limit: Optional[int] = None, offset: int = 0) -> Optional[dict]:
+        """
+        Find entries of a collection.
+
+        Args:
+            where: {field: value} for equality or {field: {"gte": 1, "lt": 5}}, operators
+                eq, in, gt, gte, lt, lte, prefix; all conditions must match
+            sort_by: Field to sort by (entries without it come last), default file order (newest first)
+            descending: Reverse sort order of `sort_by`
+            limit, offset: Page of matching entries to return
+
+        Returns:
+            dict: {"total": number of matching entries, "entries": [...]} or None if no such collection
+        """
+        with self._lock:
+            entries = self._collections.get(collection)
+            if entries is None:
+                return None
+            indexes = self._indexes.get(collection, {})
+
+            # Conditions answered by an index narrow the candidates, the rest are checked per entry
+            candidate_keys = None
+            remaining_conditions = []
+            for field, operator, operand in normalize_conditions(where):
+                index = indexes.get(field)
+                keys = index.lookup(operator, operand) if index is not None else None
+                if keys is None:
+                    remaining_conditions.append((field, operator, operand))
+                else:
+                    candidate_keys = keys if candidate_keys is None else candidate_keys & keys
+
+            sort_index = indexes.get(sort_by) if sort_by else None
+            if isinstance(sort_index, SortedIndex):
+                ordered_keys = sort_index.ordered_keys(descending)
+                indexed_keys = set(ordered_keys)
+                if candidate_keys is not None:
+                    ordered_keys = [key for key in ordered_keys if key in candidate_keys]
+                # Entries without a sortable value are not in the index, they come last
+                unsorted_keys = (candidate_keys if candidate_keys is not None else entries.keys()) - indexed_keys
+                ordered_keys += sorted(unsorted_keys, key=self._sequence[collection].get, reverse=True)
+            elif candidate_keys is not None:
+                ordered_keys = sorted(candidate_keys, key=self._sequence[collection].get, reverse=True)
+            else:
+                ordered_keys = list(reversed(entries.keys()))
+
+            matching = [
+                entries[key] for key in ordered_keys
+                if all(isinstance(entries[key], dict) and matches_condition(entries[key], *condition) for condition in remaining_conditions)
+            ]
+            if sort_by and not isinstance(sort_index, SortedIndex):
+                matching = sort_entries(matching, sort_by, descending)
+
+            page = matching[offset:] if limit is None else matching[offset:offset + limit]
+            return {"total": len(matching), "entries": copy.deepcopy(page)}
+
+    def count_entries(self, collection: str) -> Optional[int]:
+        entries = self._collections.get(collection)
+        return None if entries is None else len(entries)
+
+    def iter_entries(self, collection: str, offset: int = 0) -> Iterator[dict]:
+        """Iterate entries of the collection newest first (file order)."""
+        with self._lock:
+            entries = list(self._collections.get(collection, {}).values())
+        # Newest entries are at the end, the offset skips them
+        entries = entries[:max(len(entries) - offset, 0)]
+        return (copy.deepcopy(entry) for entry in reversed(entries))
+
+    def _document_view(self) -> dict:
+        """Return the database in its file format, sharing entries with the in-memory state."""
+        document = dict(self._document)
+        if "collections" in document or self._collections:
+            document["collections"] = {
+                name: list(reversed(list(entries.values()))) for name, entries in self._collections.items()
+            }
+        return document
+
+    def to_dict(self) -> dict:
+        """Return the whole database in its file format."""
+        with self._lock:
+            return copy.deepcopy(self._document_view())
+
+    # --- Whole file ---
+
+    def replace(self, document: dict) -> None:
+        """Replace the whole database (written to the database file right away)."""
+        with self.transaction():
+            self._set_document(copy.deepcopy(document))
+            self.exists = True
+            self._pending_lines = []
+            self._compact_locked()
+
+    def compact(self) -> None:
+        """Write the database file with all changes and remove the journal."""
+        with self.transaction():
+            if self.exists:
+                self._compact_locked()
+
+    def _compact_locked(self) -> None:
+        """Atomically replace the database file (called holding the file lock)."""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.db_path.with_name(f".{self.db_path.name}.{uuid.uuid4().hex[:8]}.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._document_view(), f, indent=2, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.db_path)
+        except BaseException:
+            try:
+                tmp_path.unlink()
+            except FileNotFoundError:
+                pass
+            raise
+        _fsync_directory(self.db_path.parent)
+        # The journal is already included in the database file; if removing it fails,
+        # its header no longer matches the file and it is ignored
+        try:
+            self.journal_path.unlink()
+        except FileNotFoundError:
+            pass
+        self._journal_bytes = 0
+        self._base_bytes = self.db_path.stat().st_size
+        self._files_signature = self._current_files_signature()
+
+
+# Cache of loaded databases by resolved path
+_json_dbs: "OrderedDict[str, JsonDb]" = OrderedDict()
+_json_dbs_lock = threading.Lock()
+
+
+def _cache_key(db_path: Union[str, Path]) -> str:
+    return str(Path(db_path).resolve())
+
+
+def _remember_json_db(key: str, db: JsonDb) -> None:
+    with _json_dbs_lock:
+        _json_dbs[key] = db
+        _json_dbs.move_to_end(key)
+        while len(_json_dbs) > JSON_DB_CACHE_MAX_DBS:
+            _json_dbs.popitem(last=False)
+
+
+def open_json_db(db_path: Union[str, Path]) -> JsonDb:
+    """
+    Return the loaded database for a file path, shared by all callers in this process.
+
+    A cached database is reused while its file and journal are unchanged,
+    otherwise it is loaded again.
+    """
+    key = _cache_key(db_path)
+    with _json_dbs_lock:
+        db = _json_dbs.get(key)
+    if db is not None and db.is_current():
+        _remember_json_db(key, db)
+        return db
+    db = JsonDb(key)
+    _remember_json_db(key, db)
+    return db
+
+
+def save_json_db(db_path: Union[str, Path], document: dict) -> JsonDb:
+    """Write a whole database file and keep it loaded in the cache."""
+    key = _cache_key(db_path)
+    with _json_dbs_lock:
+        db = _json_dbs.get(key)
+    if db is None:
+        db = JsonDb(key, load=False)
+    db.replace(document)
+    _remember_json_db(key, db)
+    return db
+
+
+def flush_json_dbs(db_path: Optional[Union[str, Path]] = None, evict: bool = False) -> int:
+    """
+    Merge journals of loaded databases into their files (one database or all),
+    so the database files are complete for other readers.
+
+    Args:
+        db_path: Database file path, None = all loaded databases
+        evict: Also drop the databases from the cache
+
+    Returns:
+        int: Number of flushed databases
+    """
+    with _json_dbs_lock:
+        keys = list(_json_dbs.keys()) if db_path is None else [_cache_key(db_path)]
+    flushed = 0
+    for key in keys:
+        db = open_json_db(key)
+        if db.exists:
+            if db.journal_path.exists():
+                db.compact()
+            flushed += 1
+        if evict:
+            with _json_dbs_lock:
+                _json_dbs.pop(key, None)
+    return flushed
+
+
+# Export engine classes
+__all__ = [
+    'JsonDb',
+    'journal_path_for',
+    'lock_path_for',
+    'db_file_lock',
+    'read_journal',
+    'open_json_db',
+    'save_json_db',
+    'flush_json_dbs'
+]
@@ -0,0 +1,267 @@
+"""
+Secondary indexes and query filters for JSON database collections.
+
+Indexes are declared in the database file under the top-level key
+`db_indexes` and maintained by `JsonDb` on every change:
+
+    "db_indexes": {
+        "entries": {"url": "hash", "created_at": "sorted", "tags": "hash"}
+    }
+
+- "hash" index: equality and `in` lookups; a list field is indexed by each
+  of its items (e.g. tags)
+- "sorted" index: equality, range and prefix lookups and ordering by the
+  field; only number and string values are indexed
+
+Query conditions (`where`) map a field to a value (equality) or to a dict
+of operators: {"eq", "in", "gt", "gte", "lt", "lte", "prefix"}.
+"""
+
+import bisect
+import math
+from operator import itemgetter
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+
+INDEX_TYPES = ("hash", "sorted")
+
+QUERY_OPERATORS = ("eq", "in", "gt", "gte", "lt", "lte", "prefix")
+
+# Highest code point, upper bound of all strings with a given prefix
+_MAX_CHAR = "\U0010ffff"
+
+
+def _sort_value(value: Any) -> Optional[tuple]:
+    """Return comparable form of a scalar value (numbers before strings), None if not sortable."""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return (0, value)
+    if isinstance(value, str):
+        return (1, value)
+    return None
+
+
+def _hashable_values(value: Any) -> List[Any]:
+    values = value if isinstance(value, list) else [value]
+    hashable = []
+    for item in values:
+        try:
+            hash(item)
+        except TypeError:
+            continue
+        hashable.append(item)
+    return hashable
+
+
+class HashIndex:
+    """Field value -> set of entry keys."""
+
+    type = "hash"
+
+    def __init__(self, field: str):
+        self.field = field
+        self._keys_by_value: Dict[Any, Set[Any]] = {}
+
+    def add(self, key: Any, entry: dict) -> None:
+        if self.field not in entry:
+            return
+        for value in _hashable_values(entry[self.field]):
+            self._keys_by_value.setdefault(value, set()).add(key)
+
+    def build(self, entries: Iterable[Tuple[Any, dict]]) -> None:
+        """Index all (key, entry) pairs of a collection."""
+        for key, entry in entries:
+            self.add(key, entry)
+
+    def remove(self, key: Any, entry: dict) -> None:
+        if self.field not in entry:
+            return
+        for value in _hashable_values(entry[self.field]):
+            keys = self._keys_by_value.get(value)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_value[value]
+
+    def lookup(self, operator: str, operand: Any) -> Optional[Set[Any]]:
+        """Return keys matching the condition, None if this index can't answer it."""
+        if operator == "eq":
+            operands = [operand]
+        elif operator == "in" and isinstance(operand, list):
+            operands = operand
+        else:
+            return None
+        hashable = _hashable_values(operands)
+        if len(hashable) != len(operands):
+            # Unhashable operands (lists, dicts) are not in the index: a scan compares them
+            return None
+        keys = set()
+        for value in hashable:
+            keys |= self._keys_by_value.get(value, set())
+        return keys
+
+
+class SortedIndex:
+    """
+    Sorted list of (value, -sequence number, entry key) for range lookups and ordering.
+
+    Entries with equal values are ordered newest first (by the sequence numbers of the
+    collection, see `JsonDb`), the same as sorting entries in file order.
+    """
+
+    type = "sorted"
+
+    def __init__(self, field: str, sequence: Optional[Dict[Any, int]] = None):
+        self.field = field
+        # Entry key -> sequence number (higher is newer), shared with the database
+        self._sequence = sequence if sequence is not None else {}
+        self._items: List[Tuple[tuple, int, Any]] = []
+
+    def _item(self, key: Any, entry: dict) -> Optional[tuple]:
+        sort_value = _sort_value(entry.get(self.field))
+        if sort_value is None:
+            return None
+        return (sort_value, -self._sequence.get(key, 0), key)
+
+    def add(self, key: Any, entry: dict) -> None:
+        item = self._item(key, entry)
+        if item is not None:
+            bisect.insort(self._items, item)
+
+    def build(self, entries: Iterable[Tuple[Any, dict]]) -> None:
+        """Index all (key, entry) pairs of a collection with one sort (insort per entry would be O(n^2))."""
+        items = [item for item in (self._item(key, entry) for key, entry in entries) if item is not None]
+        items.sort()
+        self._items = items
+
+    def remove(self, key: Any, entry: dict) -> None:
+        item = self._item(key, entry)
+        if item is None:
+            return
+        position = bisect.bisect_left(self._items, item)
+        if position < len(self._items) and self._items[position] == item:
+            del self._items[position]
+
+    def _range(self, lower: Optional[tuple], lower_inclusive: bool, upper: Optional[tuple], upper_inclusive: bool) -> List[Any]:
+        # Compare on the value only: (value,) sorts before and (value, inf) after all items of that value
+        if lower is None:
+            start = 0
+        else:
+            start = bisect.bisect_left(self._items, (lower,) if lower_inclusive else (lower, math.inf))
+        if upper is None:
+            end = len(self._items)
+        else:
+            end = bisect.bisect_left(self._items, (upper, math.inf) if upper_inclusive else (upper,))
+        return [item[2] for item in self._items[start:end]]
+
+    def lookup(self, operator: str, operand: Any) -> Optional[Set[Any]]:
+        """Return keys matching the condition, None if this index can't answer it."""
+        if operator == "in":
+            if not isinstance(operand, list):
+                return None
+            keys = set()
+            for value in operand:
+                keys |= self.lookup("eq", value) or set()
+            return keys
+        if operator == "prefix":
+            if not isinstance(operand, str):
+                return None
+            return set(self._range((1, operand), True, (1, operand + _MAX_CHAR), False))
+        sort_value = _sort_value(operand)
+        if sort_value is None:
+            return None
+        if operator == "eq":
+            return set(self._range(sort_value, True, sort_value, True))
+        # Ranges stay within one value type: numbers end before the empty string, strings start with it
+        is_string = sort_value[0] == 1
+        if operator in ("gt", "gte"):
+            return set(self._range(sort_value, operator == "gte", None if is_string else (1, ""), False))
+        if operator in ("lt", "lte"):
+            return set(self._range((1, "") if is_string else None, True, sort_value, operator == "lte"))
+        return None
+
+    def ordered_keys(self, descending: bool = False) -> List[Any]:
+        """Return keys by value; equal values stay newest first in both directions."""
+        if not descending:
+            return [item[2] for item in self._items]
+        # Stable sort of the already sorted items: reverses the values only (linear time)
+        return [item[2] for item in sorted(self._items, key=itemgetter(0), reverse=True)]
+
+
+def index_values(index_type: str, value: Any) -> List[Any]:
+    """Return the values an index of the given type stores for a field value (SQLite backend index table)."""
+    if index_type == "hash":
+        return [item for item in _hashable_values(value) if item is None or isinstance(item, (str, int, float))]
+    sort_value = _sort_value(value)
+    return [] if sort_value is None else [sort_value[1]]
+
+
+def create_index(field: str, index_type: str, sequence: Optional[Dict[Any, int]] = None):
+    if index_type == "hash":
+        return HashIndex(field)
+    if index_type == "sorted":
+        return SortedIndex(field, sequence)
+    raise Exception(f"Unknown index type '{index_type}', use one of: {', '.join(INDEX_TYPES)}")
+
+
+def normalize_conditions(where: Optional[dict]) -> List[Tuple[str, str, Any]]:
+    """Return query conditions as (field, operator, operand) tuples."""
+    conditions = []
+    for field, condition in (where or {}).items():
+        if isinstance(condition, dict) and condition and all(op in QUERY_OPERATORS for op in condition):
+            for operator, operand in condition.items():
+                conditions.append((field, operator, operand))
+        else:
+            conditions.append((field, "eq", condition))
+    return conditions
+
+
+def matches_condition(entry: dict, field: str, operator: str, operand: Any) -> bool:
+    """Evaluate one condition on an entry (same semantics as the index lookups)."""
+    if field not in entry:
+        return False
+    value = entry[field]
+    if operator == "eq":
+        return value == operand or (isinstance(value, list) and operand in value)
+    if operator == "in":
+        if not isinstance(operand, list):
+            return False
+        return any(value == item or (isinstance(value, list) and item in value) for item in operand)
+    if operator == "prefix":
+        return isinstance(value, str) and isinstance(operand, str) and value.startswith(operand)
+    value_sort, operand_sort = _sort_value(value), _sort_value(operand)
+    if value_sort is None or operand_sort is None or value_sort[0] != operand_sort[0]:
+        return False
+    if operator == "gt":
+        return value_sort > operand_sort
+    if operator == "gte":
+        return value_sort >= operand_sort
+    if operator == "lt":
+        return value_sort < operand_sort
+    if operator == "lte":
+        return value_sort <= operand_sort
+    raise Exception(f"Unknown query operator '{operator}', use one of: {', '.join(QUERY_OPERATORS)}")
+
+
+def sort_entries(entries: Iterable[dict], field: str, descending: bool = False) -> List[dict]:
+    """Sort entries by a field; entries without a sortable value are always last."""
+    entries = list(entries)
+    with_value = [entry for entry in entries if _sort_value(entry.get(field)) is not None]
+    without_value = [entry for entry in entries if _sort_value(entry.get(field)) is None]
+    with_value.sort(key=lambda entry: _sort_value(entry[field]), reverse=descending)
+    return with_value + without_value
+
+
+# Export index classes and helpers
+__all__ = [
+    'HashIndex',
+    'SortedIndex',
+    'create_index',
+    'index_values',
+    'normalize_conditions',
+    'matches_condition',
+    'sort_entries',
+    'INDEX_TYPES',
+    'QUERY_OPERATORS'
+]
@@ -0,0 +1,295 @@
+"""
+Compiled validation of JSON database entries against `db_json_schema`.
+
+The schema of a collection is the `items` schema found at
+`db_json_schema.properties.collections.properties.<collection>`. It is
+compiled once into nested validator functions, so validating an entry does
+not walk the schema dict again. Compiled schemas are cached by database id
+and schema hash: all loaded versions of a database with an unchanged schema
+share one compiled schema.
+
+Supported JSON Schema keywords (others are ignored):
+- type (incl. list of types), enum, const
+- string: minLength, maxLength, pattern, format ("date-time", "date")
+- number/integer: minimum, maximum, exclusiveMinimum, exclusiveMaximum
+- object: properties, required, additionalProperties (bool or schema)
+- array: items, minItems, maxItems, uniqueItems
+
+Default-fillers set missing `default` values of entry properties and the
+required `created_at` / `updated_at` timestamps.
+"""
+
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+# Maximum number of compiled collection schemas kept per process
+SCHEMA_CACHE_MAX_ITEMS = 128
+
+TIMESTAMP_FIELDS = ("created_at", "updated_at")
+
+# Validator: (value, path) -> list of error messages
+Validator = Callable[[Any, str], List[str]]
+
+
+_TYPE_CHECKS = {
+    "string": lambda value: isinstance(value, str),
+    "integer": lambda value: isinstance(value, int) and not isinstance(value, bool),
+    "number": lambda value: isinstance(value, (int, float)) and not isinstance(value, bool),
+    "boolean": lambda value: isinstance(value, bool),
+    "object": lambda value: isinstance(value, dict),
+    "array": lambda value: isinstance(value, list),
+    "null": lambda value: value is None,
+}
+
+
+def _is_date_time(value: str) -> bool:
+    try:
+        # fromisoformat() of Python < 3.11 does not accept "Z"
+        datetime.fromisoformat(value[:-1] + "+00:00" if value.endswith("Z") else value)
+        return True
+    except ValueError:
+        return False
+
+
+def _is_date(value: str) -> bool:
+    try:
+        date.fromisoformat(value)
+        return True
+    except ValueError:
+        return False
+
+
+_FORMAT_CHECKS = {
+    "date-time": _is_date_time,
+    "date": _is_date,
+}
+
+
+def _compile(schema: Any) -> Validator:
+    """Compile a (sub)schema into a validator function."""
+    if not isinstance(schema, dict) or not schema:
+        return lambda value, path: []
+
+    checks: List[Validator] = []
+
+    schema_type = schema.get("type")
+    if schema_type is not None:
+        type_names = schema_type if isinstance(schema_type, list) else [schema_type]
+        type_checks = [_TYPE_CHECKS[name] for name in type_names if name in _TYPE_CHECKS]
+        if type_checks:
+            expected = " or ".join(type_names)
+
+            def check_type(value, path):
+                if any(type_check(value) for type_check in type_checks):
+                    return []
+                return [f"{path}: expected {expected}, got {type(value).__name__}"]
+            checks.append(check_type)
+
+    if "enum" in schema:
+        allowed = schema["enum"]
+        checks.append(lambda value, path: [] if value in allowed else [f"{path}: must be one of {allowed}"])
+
+    if "const" in schema:
+        constant = schema["const"]
+        checks.append(lambda value, path: [] if value == constant else [f"{path}: must be {constant!r}"])
+
+    # String keywords
+    min_length, max_length = schema.get("minLength"), schema.get("maxLength")
+    pattern = re.compile(schema["pattern"]) if isinstance(schema.get("pattern"), str) else None
+    format_check = _FORMAT_CHECKS.get(schema.get("format"))
+    if min_length is not None or max_length is not None or pattern is not None or format_check is not None:
+        format_name = schema.get("format")
+
+        def check_string(value, path):
+            if not isinstance(value, str):
+                return []
+            errors = []
+            if min_length is not None and len(value) < min_length:
+                errors.append(f"{path}: shorter than {min_length} characters")
+            if max_length is not None and len(value) > max_length:
+                errors.append(f"{path}: longer than {max_length} characters")
+            if pattern is not None and not pattern.search(value):
+                errors.append(f"{path}: does not match pattern '{pattern.pattern}'")
+            if format_check is not None and not format_check(value):
+                errors.append(f"{path}: not a valid {format_name}")
+            return errors
+        checks.append(check_string)
+
+    # Number keywords
+    bounds = [
+        (schema.get("minimum"), lambda value, bound: value >= bound, "less than"),
+        (schema.get("maximum"), lambda value, bound: value <= bound, "greater than"),
+        (schema.get("exclusiveMinimum"), lambda value, bound: value > bound, "less than or equal to"),
+        (schema.get("exclusiveMaximum"), lambda value, bound: value < bound, "greater than or equal to"),
+    ]
+    bounds = [(bound, compare, text) for bound, compare, text in bounds if isinstance(bound, (int, float)) and not isinstance(bound, bool)]
+    if bounds:
+        def check_number(value, path):
+            if not _TYPE_CHECKS["number"](value):
+                return []
+            return [f"{path}: {text} {bound}" for bound, compare, text in bounds if not compare(value, bound)]
+        checks.append(check_number)
+
+    # Object keywords
+    properties = {name: _compile(subschema) for name, subschema in (schema.get("properties") or {}).items()}
+    required = list(schema.get("required") or [])
+    additional = schema.get("additionalProperties", True)
+    additional_validator = _compile(additional) if isinstance(additional, dict) else None
+    if properties or required or additional is not True:
+        def check_object(value, path):
+            if not isinstance(value, dict):
+                return []
+            errors = [f"{path}: missing required field '{name}'" for name in required if name not in value]
+            for name, item in value.items():
+                validator = properties.get(name)
+                if validator is not None:
+                    errors.extend(validator(item, f"{path}.{name}"))
+                elif additional is False:
+                    errors.append(f"{path}: field '{name}' is not allowed")
+                elif additional_validator is not None:
+                    errors.extend(additional_validator(item, f"{path}.{name}"))
+            return errors
+        checks.append(check_object)
+
+    # Array keywords
+    items_validator = _compile(schema["items"]) if isinstance(schema.get("items"), dict) else None
+    min_items, max_items = schema.get("minItems"), schema.get("maxItems")
+    unique_items = schema.get("uniqueItems") is True
+    if items_validator is not None or min_items is not None or max_items is not None or unique_items:
+        def check_array(value, path):
+            if not isinstance(value, list):
+                return []
+            errors = []
+            if min_items is not None and len(value) < min_items:
+                errors.append(f"{path}: fewer than {min_items} items")
+            if max_items is not None and len(value) > max_items:
+                errors.append(f"{path}: more than {max_items} items")
+            if unique_items and len({json.dumps(item, sort_keys=True) for item in value}) != len(value):
+                errors.append(f"{path}: items are not unique")
+            if items_validator is not None:
+                for position, item in enumerate(value):
+                    errors.extend(items_validator(item, f"{path}[{position}]"))
+            return errors
+        checks.append(check_array)
+
+    if len(checks) == 1:
+        return checks[0]
+
+    def validate(value, path):
+        errors = []
+        for check in checks:
+            errors.extend(check(value, path))
+        return errors
+    return validate
+
+
+class CollectionSchema:
+    """Compiled validator and default-filler of the entries of one collection."""
+
+    def __init__(self, items_schema: dict):
+        self._validator = _compile(items_schema)
+        required = set(items_schema.get("required") or [])
+        self.timestamp_fields = [name for name in TIMESTAMP_FIELDS if name in required]
+        self.defaults = {
+            name: subschema["default"]
+            for name, subschema in (items_schema.get("properties") or {}).items()
+            if isinstance(subschema, dict) and "default" in subschema
+        }
+
+    def fill_defaults(self, entry: dict, entry_datetime: str) -> dict:
+        """Set missing default values and required timestamps (in place). Returns the entry."""
+        for name in self.timestamp_fields:
+            if name not in entry:
+                entry[name] = entry_datetime
+        for name, default in self.defaults.items():
+            if name not in entry:
+                entry[name] = json.loads(json.dumps(default))
+        return entry
+
+    def validate(self, entry: Any) -> List[str]:
+        """Return validation errors of an entry (empty list if valid)."""
+        return self._validator(entry, "entry")
+
+    def validate_batch(self, entries: List[Any]) -> Dict[int, List[str]]:
+        """Return {position in batch: errors} of invalid entries."""
+        invalid = {}
+        for position, entry in enumerate(entries):
+            errors = self._validator(entry, "entry")
+            if errors:
+                invalid[position] = errors
+        return invalid
+
+
+def collection_items_schema(db_json_schema: Optional[dict], collection: str) -> Optional[dict]:
+    """Return the `items` schema of a collection from the database schema, None if there is none."""
+    if not isinstance(db_json_schema, dict):
+        return None
+    collections_schema = (db_json_schema.get("properties") or {}).get("collections")
+    if not isinstance(collections_schema, dict):
+        return None
+    collection_schema = (collections_schema.get("properties") or {}).get(collection)
+    if not isinstance(collection_schema, dict) or not isinstance(collection_schema.get("items"), dict):
+        return None
+    return collection_schema["items"]
+
+
+def schema_hash(db_json_schema: Any) -> str:
+    canonical = json.dumps(db_json_schema, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+_compiled_schemas: "OrderedDict[Tuple[Any, str, str], Optional[CollectionSchema]]" = OrderedDict()
+_compiled_schemas_lock = threading.Lock()
+
+
+def get_collection_schema(db_id: Any, db_json_schema: Optional[dict], collection: str,
+                          db_schema_hash: Optional[str] = None) -> Optional[CollectionSchema]:
+    """
+    Return the compiled schema of a collection, None if the collection has no schema.
+
+    Args:
+        db_id: Database id (`db_info.id`)
+        db_json_schema: The `db_json_schema` of the database
+        collection: Collection name
+        db_schema_hash: `schema_hash(db_json_schema)` if already known
+    """
+    if not isinstance(db_json_schema, dict):
+        return None
+    key = (db_id, db_schema_hash or schema_hash(db_json_schema), collection)
+    with _compiled_schemas_lock:
+        if key in _compiled_schemas:
+            _compiled_schemas.move_to_end(key)
+            return _compiled_schemas[key]
+
+    items_schema = collection_items_schema(db_json_schema, collection)
+    compiled = CollectionSchema(items_schema) if items_schema is not None else None
+
+    with _compiled_schemas_lock:
+        _compiled_schemas[key] = compiled
+        while len(_compiled_schemas) > SCHEMA_CACHE_MAX_ITEMS:
+            _compiled_schemas.popitem(last=False)
+    return compiled
+
+
+def format_validation_errors(errors: List[str], max_errors: int = 10) -> str:
+    shown = "; ".join(errors[:max_errors])
+    if len(errors) > max_errors:
+        shown += f"; ... ({len(errors) - max_errors} more)"
+    return shown
+
+
+# Export schema classes and helpers
+__all__ = [
+    'CollectionSchema',
+    'collection_items_schema',
+    'schema_hash',
+    'get_collection_schema',
+    'format_validation_errors',
+    'TIMESTAMP_FIELDS'
+]
@@ -0,0 +1,247 @@
+"""
+Streaming reader of one collection of a JSON database file.
+
+`iter_collection()` reads the database file in chunks and decodes entries
+one at a time with the C JSON decoder; entries of other collections are
+decoded and dropped right away. Memory use is bounded by the largest single
+entry (plus the journal), not by the file size.
+
+Changes still in the journal sidecar (see `json_db`) are applied on the fly:
+entries added since the last compaction come first (newest first, as in the
+file), updated entries are replaced and deleted ones are left out.
+
+The reader takes a consistent snapshot: the file and journal are opened
+under the shared database lock, and a later compaction replaces the file by
+rename, so an open file keeps its content until iteration ends.
+"""
+
+import json
+import os
+import re
+from collections import OrderedDict
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Set, TextIO, Union
+
+from app.storage.json_db import db_file_lock, journal_path_for, read_journal
+
+
+# Characters read from the file at once
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+_decoder = json.JSONDecoder()
+
+
+class _JsonScanner:
+    """Pull parser over a text file, decoding or skipping one JSON value at a time."""
+
+    def __init__(self, f: TextIO, chunk_size: int = STREAM_CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        """Append the next chunk (dropping what was consumed). Returns False at end of file."""
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def _error(self, message: str) -> Exception:
+        return Exception(f"Invalid JSON database file: {message}")
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character ("" at end of file)."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise self._error(f"expected '{char}', found '{found or 'end of file'}'")
+        self.pos += 1
+
+    def decode_value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                if not self._fill():
+                    raise self._error(str(e))
+                continue
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(self.buffer) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def skip_value(self) -> None:
+        """Move past the next value; arrays item by item, so a skipped collection is never held in memory at once."""
+        if self.peek() == "[":
+            for _ in self.iter_array_items():
+                pass
+        else:
+            self.decode_value()
+
+    def iter_object_keys(self) -> Iterator[str]:
+        """Yield keys of the next object; the caller must decode or skip each value before continuing."""
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.decode_value()
+            self.expect(":")
+            yield key
+            char = self.peek()
+            self.pos += 1
+            if char == "}":
+                return
+            if char != ",":
+                raise self._error(f"expected ',' or '}}', found '{char or 'end of file'}'")
+
+    def iter_array_items(self) -> Iterator[Any]:
+        """Yield decoded items of the next array."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.decode_value()
+            char = self.peek()
+            self.pos += 1
+            if char == "]":
+                return
+            if char != ",":
+                raise self._error(f"expected ',' or ']', found '{char or 'end of file'}'")
+
+
+def _seek_collection(scanner: _JsonScanner, collection: str) -> bool:
+    """Move the scanner to the entry list of a collection. Returns False if there is none."""
+    for key in scanner.iter_object_keys():
+        if key != "collections" or scanner.peek() != "{":
+            scanner.skip_value()
+            continue
+        for name in scanner.iter_object_keys():
+            if name == collection and scanner.peek() == "[":
+                return True
+            scanner.skip_value()
+        return False
+    return False
+
+
+class _JournalOverlay:
+    """Changes of one collection from the journal, to be merged into the entries read from the file."""
+
+    def __init__(self, operations: list, collection: str):
+        self.collection_added = False
+        # Entries added (or re-added) since compaction, oldest first
+        self.added: "OrderedDict[str, dict]" = OrderedDict()
+        # Entries of the file replaced by an update
+        self.updated: Dict[str, dict] = {}
+        # Ids whose entry in the file was deleted or moved to `added`
+        self.removed: Set[str] = set()
+        for operation in operations:
+            if operation.get("c") != collection:
+                continue
+            op = operation.get("op")
+            if op == "add_collection":
+                self.collection_added = True
+            elif op == "add":
+                entry = operation["e"]
+                self.added.pop(entry["id"], None)
+                self.added[entry["id"]] = entry
+                self.removed.add(entry["id"])
+                self.updated.pop(entry["id"], None)
+            elif op == "update":
+                entry = operation["e"]
+                if entry["id"] in self.added:
+                    self.added[entry["id"]] = entry
+                elif entry["id"] not in self.removed:
+                    self.updated[entry["id"]] = entry
+            elif op == "delete":
+                self.added.pop(operation["id"], None)
+                self.updated.pop(operation["id"], None)
+                self.removed.add(operation["id"])
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.updated or self.removed)
+
+    def merge(self, file_entries: Iterator[Any]) -> Iterator[Any]:
+        yield from reversed(self.added.values())
+        # Like JsonDb, changes by id apply to the newest (first) entry with that id only
+        seen_ids = set()
+        for entry in file_entries:
+            entry_id = entry.get("id") if isinstance(entry, dict) else None
+            if not isinstance(entry_id, str) or entry_id in seen_ids:
+                yield entry
+                continue
+            seen_ids.add(entry_id)
+            if entry_id in self.removed:
+                continue
+            yield self.updated.get(entry_id, entry)
+
+
+def iter_collection(db_path: Union[str, Path], collection: str, offset: int = 0) -> Optional[Iterator[Any]]:
+    """
+    Stream entries of one collection (newest first) without loading the database.
+
+    Args:
+        db_path: Database file path
+        collection: Collection name
+        offset: Number of entries to skip
+
+    Returns:
+        Iterator over entries, or None if the database file or collection does not exist
+    """
+    db_path = Path(db_path)
+    if not db_path.exists():
+        return None
+    with db_file_lock(db_path, exclusive=False):
+        try:
+            f = open(db_path, "r", encoding="utf-8")
+        except FileNotFoundError:
+            return None
+        stat = os.fstat(f.fileno())
+        operations, _ = read_journal(journal_path_for(db_path), (stat.st_size, stat.st_mtime_ns))
+
+    overlay = _JournalOverlay(operations, collection)
+    try:
+        scanner = _JsonScanner(f)
+        found = _seek_collection(scanner, collection)
+    except BaseException:
+        f.close()
+        raise
+    if not found and not overlay.collection_added and not overlay.added:
+        f.close()
+        return None
+    return _iter_entries(f, scanner if found else None, overlay, offset)
+
+
+def _iter_entries(f: TextIO, scanner: Optional[_JsonScanner], overlay: _JournalOverlay, offset: int) -> Iterator[Any]:
+    with f:
+        file_entries = scanner.iter_array_items() if scanner is not None else iter(())
+        if overlay:
+            file_entries = overlay.merge(file_entries)
+        yield from islice(file_entries, offset, None)
+
+
+# Export streaming reader
+__all__ = [
+    'iter_collection',
+    'STREAM_CHUNK_SIZE'
+]
@@ -1,68 +1,197 @@
 import os
+import base64
 import hashlib
+import json
+import threading
+import time
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Union
+from typing import Any, Dict, List, Optional, Set, Union
 from .models import FileSystemItem
+from .paths import resolve_sandboxed_path
+
+# A directory modified this shortly before it was scanned may change again within
+# the same mtime tick (coarse file system timestamps), so it is scanned again next time
+MTIME_SETTLE_NS = 2 * 1_000_000_000
+
+# Sort fields of list_folder(); "mtime" and "size" need a stat of every entry
+FOLDER_SORT_FIELDS = ("name", "mtime", "size")
+
+# Sidecar files kept next to user files (`.<file name>.<suffix>`): record index, prepend log,
+# database journal, lock and temporary files; not listed
+SIDECAR_SUFFIXES = (".records", ".prepend", ".journal", ".lock", ".tmp")
+
+
+def _is_sidecar(name: str) -> bool:
+    return name.startswith(".") and name.endswith(SIDECAR_SUFFIXES)
+
+
+def _encode_cursor(key: list) -> str:
+    return base64.urlsafe_b64encode(json.dumps(key, separators=(",", ":")).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> list:
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except ValueError:
+        raise ValueError("Invalid cursor")
+    if not isinstance(key, list):
+        raise ValueError("Invalid cursor")
+    return key
+
+
+class _DirectoryNode:
+    """Cached listing of one directory of the tree index."""
+
+    __slots__ = ('path', 'item', 'is_symlink', 'mtime_ns', 'settled', 'folders', 'files', 'children')
+
+    def __init__(self, path: Path, item: Optional[FileSystemItem], is_symlink: bool = False):
+        self.path = path
+        self.item = item  # None for the base directory
+        self.is_symlink = is_symlink
+        self.mtime_ns: Optional[int] = None
+        self.settled = False
+        self.folders: Dict[str, '_DirectoryNode'] = {}
+        self.files: Dict[str, FileSystemItem] = {}
+        # Sorted folders + files, built on first use after a change
+        self.children: Optional[List[FileSystemItem]] = None
+
 
 class FileStorageManager:
+    """
+    File tree of the user data folder for the file browser.
+
+    The tree is indexed once and kept in memory; each request only compares the
+    mtime of every directory with the indexed one and lists again (os.scandir)
+    just the directories whose entries changed. Files are never stat'ed.
+    Sidecar files of the storage modules (record indexes, logs, locks) are left out.
+
+    get_item() / get_children() look items up by id and only check the directory
+    they need, so browsing one folder does not walk the whole tree.
+    """
+
     def __init__(self, base_path: Union[str, Path], skip_folders: Optional[List[str]] = None):
         self.base_path = Path(base_path).resolve()
         # Store skip_folders as a set of lowercase names for fast lookup
         self.skip_folders: Set[str] = set(f.lower() for f in (skip_folders or []))
+        self._root = _DirectoryNode(self.base_path, None)
+        self._lock = threading.Lock()
+        # Incremented whenever a directory listing changes, invalidates the sorted item list
+        self._version = 0
+        self._sorted_version = -1
+        self._sorted_items: Dict[str, FileSystemItem] = {}
+        # id -> item / node of a folder / node of the directory listing an item,
+        # updated for just the entries of a listing that changed
+        self._items: Dict[str, FileSystemItem] = {}
+        self._folder_nodes: Dict[str, _DirectoryNode] = {}
+        self._item_parents: Dict[str, _DirectoryNode] = {}
 
     def _generate_id(self, path: Union[str, Path]) -> str:
         """Generate a unique ID for a file/folder based on its path"""
         return hashlib.md5(str(path).encode()).hexdigest()[:12]
 
-    def scan_directory(self) -> Dict[str, FileSystemItem]:
-        items: Dict[str, FileSystemItem] = {}
-        folders: List[tuple] = []
-        files: List[tuple] = []
-        
-        for root_path in self.base_path.rglob('*'):
-            root = str(root_path)
-            
-            # Skip if this is a skipped folder or inside one
-            if any(part.lower() in self.skip_folders for part in root_path.parts):
+    def _make_item(self, path: Path, is_dir: bool, parent: _DirectoryNode) -> FileSystemItem:
+        parent_id = parent.item.id if parent.item is not None else None
+        return FileSystemItem.from_path(self.base_path, path, self._generate_id(path), parent_id, is_dir=is_dir)
+
+    def _refresh_node(self, node: _DirectoryNode, recursive: bool = True) -> bool:
+        """Bring a directory (and its subdirectories if recursive) up to date. Returns False if the directory is gone."""
+        try:
+            mtime_ns = os.stat(node.path).st_mtime_ns
+        except OSError:
+            return False
+
+        if mtime_ns != node.mtime_ns or not node.settled:
+            scan_started_ns = time.time_ns()
+            folders: Dict[str, _DirectoryNode] = {}
+            files: Dict[str, FileSystemItem] = {}
+            try:
+                with os.scandir(node.path) as entries:
+                    for entry in entries:
+                        if entry.name.lower() in self.skip_folders:
+                            continue
+                        try:
+                            is_dir = entry.is_dir()
+                        except OSError:
+                            continue
+                        if is_dir:
+                            # Unchanged subdirectories keep their cached listing
+                            folders[entry.name] = node.folders.get(entry.name) or _DirectoryNode(
+                                Path(entry.path), self._make_item(Path(entry.path), True, node), entry.is_symlink()
+                            )
+                        elif entry.is_file() and not _is_sidecar(entry.name):
+                            files[entry.name] = node.files.get(entry.name) or self._make_item(Path(entry.path), False, node)
+            except OSError:
+                return False
+            if folders.keys() != node.folders.keys() or files.keys() != node.files.keys():
+                node.children = None
+                self._version += 1
+                # Removed entries first: a file replaced by a folder of the same name keeps its id
+                for name in node.folders.keys() - folders.keys():
+                    self._unindex_folder(node.folders[name])
+                for name in node.files.keys() - files.keys():
+                    self._unindex_item(node.files[name].id)
+                for name in folders.keys() - node.folders.keys():
+                    self._index_item(folders[name].item, node)
+                    self._folder_nodes[folders[name].item.id] = folders[name]
+                for name in files.keys() - node.files.keys():
+                    self._index_item(files[name], node)
+            node.folders, node.files = folders, files
+            node.mtime_ns = mtime_ns
+            node.settled = scan_started_ns - mtime_ns > MTIME_SETTLE_NS
+
+        if not recursive:
+            return True
+        for name, folder in list(node.folders.items()):
+            # Like rglob(), symlinked directories are listed but not descended into
+            if folder.is_symlink:
                 continue
+            if not self._refresh_node(folder):
+                del node.folders[name]
+                self._unindex_folder(folder)
+                node.children = None
+                self._version += 1
+        return True
 
-            if root_path.is_dir():
-                # Process directory
-                if root_path != self.base_path:  # Skip base directory itself
-                    dir_id = self._generate_id(root_path)
-                    parent_dir = root_path.parent
-                    parent_id = self._generate_id(parent_dir) if parent_dir != self.base_path else None
-                    folder_item = FileSystemItem.from_path(
-                        str(self.base_path), str(root_path), dir_id, parent_id
-                    )
-                    # Use folder name for sorting instead of full path
-                    folder_name = root_path.name.lower()
-                    folders.append((folder_name, dir_id, folder_item))
-            
-            elif root_path.is_file():
-                # Process file
-                file_id = self._generate_id(root_path)
-                parent_dir = root_path.parent
-                parent_id = None if parent_dir == self.base_path else self._generate_id(parent_dir)
-                file_item = FileSystemItem.from_path(
-                    str(self.base_path), str(root_path), file_id, parent_id
-                )
-                # Use filename for sorting instead of full path
-                files.append((root_path.name.lower(), file_id, file_item))
-
-        # Sort folders and files by their names
-        folders.sort(key=lambda x: x[0])
-        files.sort(key=lambda x: x[0])
-        
-        # Add folders first
-        for _, dir_id, folder_item in folders:
-            items[dir_id] = folder_item
-            
-        # Then add files
-        for _, file_id, file_item in files:
-            items[file_id] = file_item
-
-        return items
+    def _index_item(self, item: FileSystemItem, parent: _DirectoryNode) -> None:
+        self._items[item.id] = item
+        self._item_parents[item.id] = parent
+
+    def _unindex_item(self, item_id: str) -> None:
+        self._items.pop(item_id, None)
+        self._item_parents.pop(item_id, None)
+
+    def _unindex_folder(self, folder: _DirectoryNode) -> None:
+        """Drop a removed folder and everything listed below it from the id lookups."""
+        self._unindex_item(folder.item.id)
+        self._folder_nodes.pop(folder.item.id, None)
+        for subfolder in folder.folders.values():
+            self._unindex_folder(subfolder)
+        for item in folder.files.values():
+            self._unindex_item(item.id)
+
+    def _sorted(self) -> Dict[str, FileSystemItem]:
+        """Return all items sorted by name, folders first; sorted again only if a listing changed since the last call."""
+        if self._sorted_version != self._version:
+            items = sorted(
+                self._items.values(),
+                key=lambda item: (item.type != 'folder', item.title.lower(), item.file_path)
+            )
+            self._sorted_items = {item.id: item for item in items}
+            self._sorted_version = self._version
+        return self._sorted_items
+
+    def _find(self, item_id: str) -> Optional[FileSystemItem]:
+        """Look up an item, checking only the directory that lists it; unknown ids fall back to a full refresh."""
+        parent = self._item_parents.get(item_id)
+        if parent is None or not self._refresh_node(parent, recursive=False):
+            self._refresh_node(self._root)
+        return self._items.get(item_id)
+
+    def scan_directory(self) -> Dict[str, FileSystemItem]:
+        with self._lock:
+            self._refresh_node(self._root)
+            return self._sorted()
 
     def get_structure(self) -> Dict:
         """Returns a JSON-serializable structure of the file system"""
@@ -71,3 +200,119 @@ class FileStorageManager:
             'items': list(items.values()),
             'total': len(items)
         }
+
+    def get_item(self, item_id: str) -> Optional[FileSystemItem]:
+        """Return the file or folder with the given id, None if it does not exist"""
+        with self._lock:
+            return self._find(item_id)
+
+    def get_children(self, folder_id: Optional[str] = None) -> Optional[List[FileSystemItem]]:
+        """Return items of a folder (folders first, by name), None if there is no such folder"""
+        with self._lock:
+            if folder_id is None:
+                node = self._root
+            else:
+                item = self._find(folder_id)
+                if item is None or item.type != 'folder':
+                    return None
+                node = self._folder_nodes[folder_id]
+                if node.is_symlink:
+                    return []
+            if not self._refresh_node(node, recursive=False):
+                return None
+            if node.children is None:
+                node.children = (
+                    [node.folders[name].item for name in sorted(node.folders, key=str.lower)] +
+                    [node.files[name] for name in sorted(node.files, key=str.lower)]
+                )
+            return node.children
+
+    def get_ancestors(self, item: FileSystemItem) -> List[FileSystemItem]:
+        """Return the folders containing an item, outermost first"""
+        ancestors = []
+        with self._lock:
+            parent_id = getattr(item, 'parent', None)
+            while parent_id and parent_id in self._items:
+                parent = self._items[parent_id]
+                ancestors.insert(0, parent)
+                parent_id = getattr(parent, 'parent', None)
+        return ancestors
+
+    def list_folder(self, folder_path: str = "", sort_by: str = "name", descending: bool = False,
+                    limit: int = 100, cursor: Optional[str] = None, with_stat: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        List one page of a folder's items (folders first), scanning only that directory.
+
+        Args:
+            folder_path: Folder path relative to the base path ("" for the base folder)
+            sort_by: "name", "mtime" or "size"
+            descending: Sort order within folders and within files
+            limit: Items per page
+            cursor: `next_cursor` of the previous page
+            with_stat: Add "size" and "modified_at" to the items
+
+        Returns:
+            dict: {"items": [...], "next_cursor": str or None}, None if the folder does not exist
+        """
+        if sort_by not in FOLDER_SORT_FIELDS:
+            raise ValueError(f"Invalid sort field '{sort_by}', expected one of {', '.join(FOLDER_SORT_FIELDS)}")
+        after = _decode_cursor(cursor) if cursor else None
+
+        folder = resolve_sandboxed_path(folder_path, root=self.base_path)
+        rel_parts = folder.relative_to(self.base_path).parts
+        if any(part.lower() in self.skip_folders for part in rel_parts) or not folder.is_dir():
+            return None
+        parent_id = self._generate_id(folder) if folder != self.base_path else None
+
+        need_stat = with_stat or sort_by != "name"
+        entries = []
+        with os.scandir(folder) as scanned:
+            for entry in scanned:
+                if entry.name.lower() in self.skip_folders:
+                    continue
+                try:
+                    is_dir = entry.is_dir()
+                    if not is_dir and (not entry.is_file() or _is_sidecar(entry.name)):
+                        continue
+                    stat = entry.stat() if need_stat else None
+                except OSError:
+                    continue
+                # Sort key: folders first, then the sort field, then the name as tie-breaker
+                key = [0 if is_dir else 1]
+                if sort_by == "mtime":
+                    key.append(stat.st_mtime_ns)
+                elif sort_by == "size":
+                    key.append(0 if is_dir else stat.st_size)
+                key += [entry.name.lower(), entry.name]
+                entries.append((key, entry, is_dir, stat))
+
+        # Folders always come first, descending only reverses the order inside each group
+        if descending:
+            entries.sort(key=lambda x: x[0][1:], reverse=True)
+            entries.sort(key=lambda x: x[0][0])
+        else:
+            entries.sort(key=lambda x: x[0])
+
+        if after is not None:
+            def is_after(key):
+                if key[0] != after[0]:
+                    return key[0] > after[0]
+                return key[1:] < after[1:] if descending else key[1:] > after[1:]
+            try:
+                entries = [entry for entry in entries if is_after(entry[0])]
+            except TypeError:
+                raise ValueError("Invalid cursor")
+
+        page = entries[:limit]
+        items = []
+        for key, entry, is_dir, stat in page:
+            path = Path(entry.path)
+            item = vars(FileSystemItem.from_path(self.base_path, path, self._generate_id(path), parent_id, is_dir=is_dir))
+            if with_stat:
+                item['size'] = None if is_dir else stat.st_size
+                item['modified_at'] = datetime.fromtimestamp(stat.st_mtime).isoformat()
+            items.append(item)
+        return {
+            'items': items,
+            'next_cursor': _encode_cursor(page[-1][0]) if len(entries) > limit else None
+        }
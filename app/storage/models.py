@@ -10,14 +10,18 @@ class FileSystemItem:
     file_path: str
 
     @classmethod
-    def from_path(cls, base_path: Union[str, Path], full_path: Union[str, Path], item_id: str, parent_id: Optional[str] = None) -> 'FileSystemItem':
+    def from_path(cls, base_path: Union[str, Path], full_path: Union[str, Path], item_id: str, parent_id: Optional[str] = None,
+                  is_dir: Optional[bool] = None) -> 'FileSystemItem':
         base_path = Path(base_path)
         full_path = Path(full_path)
         
         rel_path = full_path.relative_to(base_path)
+        # Callers listing a directory already know the entry type, no need to stat again
+        if is_dir is None:
+            is_dir = full_path.is_dir()
         item = cls(
             id=item_id,
-            type='folder' if full_path.is_dir() else 'file',
+            type='folder' if is_dir else 'file',
             title=full_path.name,
             file_path=str(rel_path).replace('\\', '/')
         )
@@ -0,0 +1,71 @@
+"""
+Sandboxed resolution of file paths used by the file tools.
+
+Every tool reading or writing user files resolves its path through
+`resolve_sandboxed_path()`: relative paths are joined with the root (the
+user data files folder by default), absolute paths are taken as they are,
+and the resolved path must be inside the resolved root. The check is one
+`relative_to()` on resolved paths, so `..` segments and symlinks leading out
+of the root are rejected the same way by all tools.
+
+Roots are resolved once per process and cached.
+"""
+
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Union
+
+from app.configs.app_config import APP_SETTINGS
+
+
+PATH_TRAVERSAL_ERROR = "Invalid filepath: Path traversal not allowed"
+
+
+@lru_cache(maxsize=None)
+def _resolved_root(root: str) -> Path:
+    return Path(root).resolve()
+
+
+def resolve_root(root: Union[str, Path, None] = None) -> Path:
+    """Return the resolved root (default: user data files path), cached for the process."""
+    return _resolved_root(str(root if root is not None else APP_SETTINGS.USER_DATA_FILES_PATH))
+
+
+def resolve_sandboxed_path(filepath: Union[str, Path], root: Union[str, Path, None] = None) -> Path:
+    """
+    Resolve a file path within a root folder.
+
+    Args:
+        filepath: Path relative to the root, or absolute path inside the root
+        root: Root folder (default: user data files path)
+
+    Returns:
+        Path: Resolved absolute path
+
+    Raises:
+        ValueError: If the path is outside of the root
+    """
+    root_path = resolve_root(root)
+    full_path = (root_path / filepath).resolve()
+    try:
+        full_path.relative_to(root_path)
+    except ValueError:
+        raise ValueError(PATH_TRAVERSAL_ERROR)
+    return full_path
+
+
+def sandboxed_path_or_none(filepath: Union[str, Path], root: Union[str, Path, None] = None) -> Optional[Path]:
+    """Like `resolve_sandboxed_path()`, but return None for a path outside of the root."""
+    try:
+        return resolve_sandboxed_path(filepath, root)
+    except ValueError:
+        return None
+
+
+# Export path resolution helpers
+__all__ = [
+    'resolve_root',
+    'resolve_sandboxed_path',
+    'sandboxed_path_or_none',
+    'PATH_TRAVERSAL_ERROR'
+]
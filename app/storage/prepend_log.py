@@ -0,0 +1,281 @@
+"""
+Prepending to text files without rewriting them.
+
+`save_to_file(prepend=True)` keeps ever-growing files newest first. Instead
+of rewriting the whole file on every prepend, `prepend_to_file()` appends the
+new text as one JSON line to a log sidecar (`.<file name>.prepend`).
+`materialize_prepends()` later writes all pending texts (newest first) in
+front of the file in one pass, so each prepend costs O(text) and the file is
+rewritten once per read instead of once per write.
+
+The file is materialized lazily: readers of the file (`open_file`, the file
+browser) call `materialize_prepends()` first, and prepends merge the log on
+their own once it grows as big as the file itself. So that editors and
+other programs do not see a stale file for long, a log is also merged once
+its first pending text is `PREPEND_LOG_MAX_AGE_SECONDS` old: by the next
+prepend, or by `materialize_stale_prepends()`, which the task executor runs
+periodically. Appending to the end of the file does not need the log to be
+merged first: pending texts go in front of everything that is in the file.
+
+Materializing writes a temporary file and renames it over the file. Before
+the rename, a "merged" line with size and mtime of the new file is added to
+the log, so a crash between the rename and removing the log does not prepend
+the texts twice.
+
+Writers and materializing hold the `.<file name>.lock` sidecar lock (see
+`json_db.db_file_lock`). After a merge, record indexes of the file are
+shifted by the prepended bytes (`records.shift_record_index`).
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from app.storage.json_db import db_file_lock
+from app.storage.records import shift_record_index
+
+
+# The log is merged into the file on prepend once it is this big and bigger than the file
+PREPEND_LOG_MIN_MERGE_BYTES = 1024 * 1024
+
+# The log is merged once its oldest pending text is this old
+PREPEND_LOG_MAX_AGE_SECONDS = 60
+
+# Threads of one process (file locks are a no-op on Windows)
+_prepend_lock = threading.RLock()
+
+# File path -> time of the oldest pending text, for logs written by this process
+_pending_since: Dict[str, float] = {}
+
+
+def prepend_log_path_for(file_path: Union[str, Path]) -> Path:
+    """Return path of the prepend log sidecar of a file."""
+    file_path = Path(file_path)
+    return file_path.with_name(f".{file_path.name}.prepend")
+
+
+def _file_signature(file_path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _read_log(log_path: Path) -> List[str]:
+    """Return pending texts of the log, oldest first."""
+    texts = []
+    try:
+        with open(log_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Line torn by a crash during append, later lines are intact
+                    continue
+                if isinstance(record, dict) and record.get("op") == "prepend":
+                    texts.append(record["text"])
+    except FileNotFoundError:
+        pass
+    return texts
+
+
+def _interrupted_merge(log_path: Path) -> Optional[Tuple[int, int]]:
+    """Return (size, mtime_ns) of the merged file if a merge stopped before removing the log."""
+    # The "merged" line is short and always the last one
+    try:
+        with open(log_path, "rb") as f:
+            f.seek(max(os.fstat(f.fileno()).st_size - 256, 0))
+            last_line = f.read().rstrip(b"\n").rsplit(b"\n", 1)[-1]
+    except FileNotFoundError:
+        return None
+    try:
+        record = json.loads(last_line)
+    except ValueError:
+        return None
+    if not isinstance(record, dict) or record.get("op") != "merged":
+        return None
+    return record["size"], record["mtime_ns"]
+
+
+def _recover(file_path: Path, log_path: Path) -> int:
+    """Finish a merge interrupted by a crash (called holding the lock). Returns bytes put in front of the file."""
+    merged = _interrupted_merge(log_path)
+    if merged is None:
+        return 0
+    if _file_signature(file_path) == merged:
+        # The file was already replaced, the texts are in it
+        log_path.unlink()
+        _pending_since.pop(str(file_path), None)
+        return 0
+    return _materialize(file_path, log_path)
+
+
+def _append_log(log_path: Path, record: dict) -> None:
+    line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+    with open(log_path, "a+b") as f:
+        size = f.seek(0, os.SEEK_END)
+        if size:
+            f.seek(size - 1)
+            if f.read(1) != b"\n":
+                # Torn last line after a crash: start a new line instead of continuing it
+                line = b"\n" + line
+        f.write(line)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _materialize(file_path: Path, log_path: Path) -> int:
+    """Merge the log into the file (called holding the lock). Returns bytes put in front of the file (0 = nothing to merge)."""
+    texts = _read_log(log_path)
+    if not texts:
+        if log_path.exists():
+            log_path.unlink()
+        _pending_since.pop(str(file_path), None)
+        return 0
+
+    previous_signature = _file_signature(file_path)
+    prepended_size = 0
+    tmp_path = file_path.with_name(f".{file_path.name}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        with open(tmp_path, "wb") as out:
+            for text in reversed(texts):
+                prepended_size += out.write(text.encode("utf-8"))
+            try:
+                with open(file_path, "rb") as f:
+                    shutil.copyfileobj(f, out)
+            except FileNotFoundError:
+                pass
+            out.flush()
+            os.fsync(out.fileno())
+        stat = os.stat(tmp_path)
+        _append_log(log_path, {"op": "merged", "size": stat.st_size, "mtime_ns": stat.st_mtime_ns})
+        os.replace(tmp_path, file_path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+    log_path.unlink()
+    _pending_since.pop(str(file_path), None)
+
+    if previous_signature is not None:
+        # Record indexes of the file shift by the prepended bytes instead of being built again
+        try:
+            shift_record_index(file_path, prepended_size, previous_signature)
+        except OSError as e:
+            print(f"Warning: Could not update record index of {file_path}: {e}")
+    return prepended_size
+
+
+def materialize_prepends(file_path: Union[str, Path]) -> int:
+    """
+    Write pending prepended texts in front of the file.
+
+    Args:
+        file_path: Path of the file
+
+    Returns:
+        int: Number of bytes put in front of the file (0 if nothing was pending)
+    """
+    file_path = Path(file_path)
+    log_path = prepend_log_path_for(file_path)
+    if not log_path.exists():
+        return 0
+    with _prepend_lock, db_file_lock(file_path, exclusive=True):
+        if _interrupted_merge(log_path) is not None:
+            return _recover(file_path, log_path)
+        return _materialize(file_path, log_path)
+
+
+def prepend_to_file(file_path: Union[str, Path], text: str) -> None:
+    """
+    Put text at the beginning of a file (created if missing).
+
+    The text is written to the prepend log; it shows up in the file once the
+    file is materialized (see `materialize_prepends`).
+    """
+    file_path = Path(file_path)
+    log_path = prepend_log_path_for(file_path)
+    with _prepend_lock, db_file_lock(file_path, exclusive=True):
+        if not log_path.exists():
+            signature = _file_signature(file_path)
+            if signature is None or signature[0] == 0:
+                # Nothing to prepend to
+                with open(file_path, "w", encoding="utf-8") as f:
+                    f.write(text)
+                return
+        else:
+            _recover(file_path, log_path)
+
+        _append_log(log_path, {"op": "prepend", "text": text})
+        pending_since = _pending_since.setdefault(str(file_path), time.time())
+        log_size = log_path.stat().st_size
+        if log_size >= PREPEND_LOG_MIN_MERGE_BYTES and log_size >= (_file_signature(file_path) or (0, 0))[0]:
+            _materialize(file_path, log_path)
+        elif time.time() - pending_since >= PREPEND_LOG_MAX_AGE_SECONDS:
+            _materialize(file_path, log_path)
+
+
+def materialize_stale_prepends(max_age_seconds: float = PREPEND_LOG_MAX_AGE_SECONDS) -> int:
+    """
+    Merge the logs (written by this process) whose oldest pending text is at least max_age_seconds old.
+
+    Returns:
+        int: Number of merged files
+    """
+    cutoff = time.time() - max_age_seconds
+    with _prepend_lock:
+        stale_paths = [path for path, since in _pending_since.items() if since <= cutoff]
+    merged = 0
+    for path in stale_paths:
+        try:
+            changed = materialize_prepends(path)
+        except OSError as e:
+            print(f"Warning: Could not merge prepend log of {path}: {e}")
+            changed = 0
+        if changed:
+            merged += 1
+        else:
+            # Merged by another process, or not mergeable: do not retry every run
+            with _prepend_lock:
+                _pending_since.pop(path, None)
+    return merged
+
+
+def append_to_file(file_path: Union[str, Path], text: str) -> int:
+    """
+    Put text at the end of a file (created if missing), after any pending prepended texts.
+
+    Returns:
+        int: Size of the file before the text was appended
+    """
+    file_path = Path(file_path)
+    log_path = prepend_log_path_for(file_path)
+    if not log_path.exists():
+        with open(file_path, "a", encoding="utf-8") as f:
+            appended_at = f.tell()
+            f.write(text)
+        return appended_at
+    # Do not append to a file that is being replaced by a merge
+    with _prepend_lock, db_file_lock(file_path, exclusive=True):
+        _recover(file_path, log_path)
+        with open(file_path, "a", encoding="utf-8") as f:
+            appended_at = f.tell()
+            f.write(text)
+        return appended_at
+
+
+# Export prepend log functions
+__all__ = [
+    'prepend_log_path_for',
+    'prepend_to_file',
+    'append_to_file',
+    'materialize_prepends',
+    'materialize_stale_prepends',
+    'PREPEND_LOG_MIN_MERGE_BYTES',
+    'PREPEND_LOG_MAX_AGE_SECONDS'
+]
@@ -0,0 +1,575 @@
+"""
+Lazy readers of large text files made of delimiter-separated records.
+
+Text files of the app keep one item per record, separated by a delimiter
+line (`-----`). `iter_records()` yields the records one at a time instead of
+reading the whole file and splitting it: the delimiter is searched with a
+bytes regex directly in a memory map of the file, and only the current
+record is decoded. Files which cannot be mapped (empty files, special file
+systems) are read in chunks instead. Records are the same as
+`split_clean(open_file(path), delimiter)` returns: stripped, empty ones left
+out, runs of delimiters count as one.
+
+`update_record_index()` keeps a sidecar (`.<file name>.records`) with the
+byte offset, length and content hash of every record; `save_to_file` creates
+it on request (`record_index=True`) and keeps an existing one up to date.
+Appends are indexed incrementally (from the last delimiter on), prepends
+merged by the prepend log shift the index (`shift_record_index()`), other
+changes rebuild it. `read_record()` and `find_record()` then seek to a
+record by position or hash.
+
+`sample_records()` picks random records. It uses the record index (kept in
+memory per process, rebuilt when the file size or mtime changes), so repeated
+sampling of an unchanged file reads just the picked records; without the
+index it makes one reservoir-sampling pass over the records.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import random
+import re
+import threading
+import uuid
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+
+from app.storage.json_db import db_file_lock
+
+
+# Bytes read at once by the buffered reader
+READ_CHUNK_SIZE = 1024 * 1024
+
+DEFAULT_RECORD_DELIMITER = "-----"
+
+# Maximum number of record indexes kept per process
+RECORD_INDEX_CACHE_MAX_ITEMS = 64
+
+
+def _delimiter_pattern(delimiter: str) -> "re.Pattern[bytes]":
+    if not delimiter:
+        raise ValueError("Delimiter cannot be empty")
+    # Same pattern as split_clean()
+    return re.compile(re.escape(delimiter.encode("utf-8")) + b"+")
+
+
+def _clean(record: bytes) -> str:
+    return record.decode("utf-8").strip()
+
+
+def _iter_raw_mapped(f: BinaryIO, pattern: "re.Pattern[bytes]", start: int) -> Iterator[Tuple[int, bytes]]:
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        for match in pattern.finditer(mapped, start):
+            yield start, mapped[start:match.start()]
+            start = match.end()
+        yield start, mapped[start:]
+
+
+def _iter_raw_buffered(f: BinaryIO, pattern: "re.Pattern[bytes]", chunk_size: int, start: int) -> Iterator[Tuple[int, bytes]]:
+    f.seek(start)
+    buffer = b""
+    # File offset of the buffer start
+    buffer_offset = start
+    eof = False
+    while not eof:
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        buffer += chunk
+        start = 0
+        for match in pattern.finditer(buffer):
+            # A delimiter at the end of the buffer may continue in the next chunk
+            if match.end() == len(buffer) and not eof:
+                break
+            yield buffer_offset + start, buffer[start:match.start()]
+            start = match.end()
+        buffer = buffer[start:]
+        buffer_offset += start
+    yield buffer_offset, buffer
+
+
+def _iter_raw(f: BinaryIO, pattern: "re.Pattern[bytes]", chunk_size: int, start: int = 0) -> Iterator[Tuple[int, bytes]]:
+    """Yield (file offset, bytes) of the raw records between delimiters from `start` on, from an mmap if possible."""
+    try:
+        raw_records = _iter_raw_mapped(f, pattern, start)
+        # mmap fails on the first step for empty or unmappable files
+        first = next(raw_records)
+    except (ValueError, OSError):
+        yield from _iter_raw_buffered(f, pattern, chunk_size, start)
+        return
+    yield first
+    yield from raw_records
+
+
+def _iter_file_records(f: BinaryIO, pattern: "re.Pattern[bytes]", chunk_size: int) -> Iterator[str]:
+    with f:
+        for _, raw_record in _iter_raw(f, pattern, chunk_size):
+            record = _clean(raw_record)
+            if record:
+                yield record
+
+
+def iter_records(file_path: Union[str, Path], delimiter: str = DEFAULT_RECORD_DELIMITER,
+                 chunk_size: int = READ_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Iterate records of a text file one at a time.
+
+    Args:
+        file_path: Path of the file (must exist)
+        delimiter: Record delimiter
+        chunk_size: Bytes read at once if the file cannot be memory-mapped
+
+    Returns:
+        Iterator over stripped, non-empty records
+    """
+    pattern = _delimiter_pattern(delimiter)
+    # Opened right away, so a missing file fails on the call, not on first iteration
+    f = open(file_path, "rb")
+    return _iter_file_records(f, pattern, chunk_size)
+
+
+def record_hash(record: str) -> str:
+    """Content hash of a record (SHA-256 of the stripped text), as stored in the record index."""
+    return hashlib.sha256(record.strip().encode("utf-8")).hexdigest()
+
+
+def record_index_path_for(file_path: Union[str, Path]) -> Path:
+    """Return path of the record index sidecar of a file."""
+    file_path = Path(file_path)
+    return file_path.with_name(f".{file_path.name}.records")
+
+
+class RecordIndex:
+    """Byte offsets, lengths and content hashes of the (non-empty) records of one version of a file."""
+
+    def __init__(self, delimiter: str, signature: Tuple[int, int]):
+        self.delimiter = delimiter
+        # (size, mtime_ns) of the indexed file
+        self.signature = signature
+        self.offsets = array("q")
+        self.lengths = array("q")
+        self.hashes: List[str] = []
+        # Start of the last delimiter: appended text is indexed from here on
+        self.tail = 0
+        # Byte position in the sidecar of the first record at or after `tail`
+        self.tail_position = 0
+        self._positions_by_hash: Optional[Dict[str, int]] = None
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def read(self, f: BinaryIO, position: int) -> str:
+        """Read the record at a position (0 = first record of the file) from the open file."""
+        f.seek(self.offsets[position])
+        return _clean(f.read(self.lengths[position]))
+
+    def find(self, hash_value: str) -> Optional[int]:
+        """Return position of the first record with the given content hash, None if there is none."""
+        if self._positions_by_hash is None:
+            positions: Dict[str, int] = {}
+            for position, hash_item in enumerate(self.hashes):
+                positions.setdefault(hash_item, position)
+            self._positions_by_hash = positions
+        return self._positions_by_hash.get(hash_value)
+
+    def copy(self) -> "RecordIndex":
+        index = RecordIndex(self.delimiter, self.signature)
+        index.offsets = array("q", self.offsets)
+        index.lengths = array("q", self.lengths)
+        index.hashes = list(self.hashes)
+        index.tail = self.tail
+        index.tail_position = self.tail_position
+        return index
+
+    def _add(self, offset: int, raw_record: bytes) -> None:
+        record = _clean(raw_record)
+        if record:
+            self.offsets.append(offset)
+            self.lengths.append(len(raw_record))
+            self.hashes.append(record_hash(record))
+
+    def _truncate(self, offset: int) -> None:
+        """Drop records starting at or after offset."""
+        count = len(self.offsets)
+        while count and self.offsets[count - 1] >= offset:
+            count -= 1
+        del self.offsets[count:], self.lengths[count:], self.hashes[count:]
+        self._positions_by_hash = None
+
+    def scan(self, f: BinaryIO, start: int) -> None:
+        """Index the records of the open file from offset `start` (a delimiter start or 0) to the end."""
+        pattern = _delimiter_pattern(self.delimiter)
+        previous_end = None
+        for offset, raw_record in _iter_raw(f, pattern, READ_CHUNK_SIZE, start):
+            if previous_end is not None:
+                self.tail = previous_end
+            self._add(offset, raw_record)
+            previous_end = offset + len(raw_record)
+
+    def prepended(self, f: BinaryIO, size: int, signature: Tuple[int, int]) -> Optional["RecordIndex"]:
+        """
+        Return the index of the open file after `size` bytes were put in front of the indexed version:
+        only the new beginning is scanned, the indexed records are shifted. None if the index has to be
+        built again (the new text does not end in a record boundary of the old file).
+        """
+        if self.tail == 0:
+            # No delimiter after the first byte: the old beginning may join with the new text
+            return None
+        index = RecordIndex(self.delimiter, signature)
+        position = 0
+        for offset, raw_record in _iter_raw(f, _delimiter_pattern(self.delimiter), READ_CHUNK_SIZE):
+            while position < len(self) and self.offsets[position] + size < offset:
+                position += 1
+            if position < len(self) and self.offsets[position] + size == offset:
+                # Scanning reached an indexed record, the rest of the file is as indexed
+                break
+            index._add(offset, raw_record)
+        else:
+            return None
+        index.offsets.extend(offset + size for offset in self.offsets[position:])
+        index.lengths.extend(self.lengths[position:])
+        index.hashes.extend(self.hashes[position:])
+        index.tail = self.tail + size
+        return index
+
+
+def _file_signature(f: BinaryIO) -> Tuple[int, int]:
+    stat = os.fstat(f.fileno())
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _build_record_index(f: BinaryIO, delimiter: str) -> RecordIndex:
+    index = RecordIndex(delimiter, _file_signature(f))
+    index.scan(f, 0)
+    return index
+
+
+# --- Sidecar ---
+# One JSON line [offset, length, hash] per record, then a state line with
+# delimiter, size and mtime of the indexed file. A missing or torn state
+# line (crash during a write) makes the sidecar invalid, it is then rebuilt.
+
+def _load_sidecar(file_path: Path, delimiter: Optional[str]) -> Optional[RecordIndex]:
+    """Load the sidecar index (None if missing, invalid or for another delimiter; delimiter None accepts any)."""
+    try:
+        with open(record_index_path_for(file_path), "rb") as f:
+            lines = f.readlines()
+    except FileNotFoundError:
+        return None
+    try:
+        state = json.loads(lines[-1]) if lines else None
+        if not isinstance(state, dict) or (delimiter is not None and state.get("delimiter") != delimiter):
+            return None
+        index = RecordIndex(state["delimiter"], (state["size"], state["mtime_ns"]))
+        index.tail = state["tail"]
+        index.tail_position = state["tail_position"]
+        for line in lines[:-1]:
+            offset, length, hash_value = json.loads(line)
+            index.offsets.append(offset)
+            index.lengths.append(length)
+            index.hashes.append(hash_value)
+    except (ValueError, KeyError, TypeError):
+        return None
+    return index
+
+
+def _sidecar_delimiter(file_path: Path) -> Optional[str]:
+    """Return the delimiter of the sidecar from its state line, without loading the records."""
+    try:
+        with open(record_index_path_for(file_path), "rb") as f:
+            f.seek(max(os.fstat(f.fileno()).st_size - 4096, 0))
+            last_line = f.read().rstrip(b"\n").rsplit(b"\n", 1)[-1]
+    except FileNotFoundError:
+        return None
+    try:
+        state = json.loads(last_line)
+    except ValueError:
+        return None
+    return state.get("delimiter") if isinstance(state, dict) else None
+
+
+def _record_lines(index: RecordIndex, first: int, position: int) -> Tuple[bytes, int]:
+    """Return (sidecar lines of records from `first` on, sidecar position of the first record at or after tail)."""
+    lines = []
+    tail_position = None
+    for record_position in range(first, len(index)):
+        if tail_position is None and index.offsets[record_position] >= index.tail:
+            tail_position = position
+        # Same text as json.dumps([offset, length, hash]), hashes are hex digits
+        line = f'[{index.offsets[record_position]}, {index.lengths[record_position]}, "{index.hashes[record_position]}"]\n'.encode()
+        lines.append(line)
+        position += len(line)
+    return b"".join(lines), tail_position if tail_position is not None else position
+
+
+def _state_line(index: RecordIndex) -> bytes:
+    return json.dumps({
+        "delimiter": index.delimiter,
+        "size": index.signature[0],
+        "mtime_ns": index.signature[1],
+        "tail": index.tail,
+        "tail_position": index.tail_position
+    }, ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+def _write_sidecar(file_path: Path, index: RecordIndex) -> None:
+    """Write the whole sidecar (temporary file renamed over the old one)."""
+    sidecar_path = record_index_path_for(file_path)
+    records, index.tail_position = _record_lines(index, 0, 0)
+    tmp_path = sidecar_path.with_name(f"{sidecar_path.name}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(records)
+            f.write(_state_line(index))
+        os.replace(tmp_path, sidecar_path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def _append_sidecar(file_path: Path, index: RecordIndex, first: int, truncate_at: int) -> None:
+    """Replace sidecar lines from `truncate_at` on with records from position `first` and a new state line."""
+    with open(record_index_path_for(file_path), "r+b") as f:
+        f.truncate(truncate_at)
+        f.seek(truncate_at)
+        records, index.tail_position = _record_lines(index, first, truncate_at)
+        f.write(records)
+        f.write(_state_line(index))
+
+
+# --- In-memory cache ---
+
+_record_indexes: "OrderedDict[Tuple[str, str], RecordIndex]" = OrderedDict()
+_record_indexes_lock = threading.Lock()
+
+
+def _cache_key(file_path: Union[str, Path], delimiter: str) -> Tuple[str, str]:
+    return str(Path(file_path).resolve()), delimiter
+
+
+def _cached_index(key: Tuple[str, str]) -> Optional[RecordIndex]:
+    with _record_indexes_lock:
+        index = _record_indexes.get(key)
+        if index is not None:
+            _record_indexes.move_to_end(key)
+        return index
+
+
+def _cache_index(key: Tuple[str, str], index: RecordIndex) -> None:
+    with _record_indexes_lock:
+        _record_indexes[key] = index
+        _record_indexes.move_to_end(key)
+        while len(_record_indexes) > RECORD_INDEX_CACHE_MAX_ITEMS:
+            _record_indexes.popitem(last=False)
+
+
+def _get_record_index(f: BinaryIO, file_path: Union[str, Path], delimiter: str) -> RecordIndex:
+    """
+    Return the index of the open file: from memory or the sidecar if the file did not
+    change since it was built, otherwise built again (and the sidecar, if any, rewritten).
+    """
+    key = _cache_key(file_path, delimiter)
+    signature = _file_signature(f)
+    index = _cached_index(key)
+    if index is not None and index.signature == signature:
+        return index
+
+    index = _load_sidecar(Path(file_path), delimiter)
+    if index is None or index.signature != signature:
+        has_sidecar = record_index_path_for(file_path).exists()
+        index = _build_record_index(f, delimiter)
+        if has_sidecar:
+            with db_file_lock(file_path, exclusive=True):
+                _write_sidecar(Path(file_path), index)
+    _cache_index(key, index)
+    return index
+
+
+def update_record_index(file_path: Union[str, Path], delimiter: str, appended_at: Optional[int] = None,
+                        create: bool = True) -> None:
+    """
+    Bring the record index sidecar of a file up to date after a write.
+
+    Args:
+        file_path: Path of the file
+        delimiter: Record delimiter
+        appended_at: File size before the write if it only appended to the file; the records
+            are then indexed from the last delimiter on instead of from the start
+        create: Create the sidecar if it is missing (otherwise only an existing one is updated)
+    """
+    file_path = Path(file_path)
+    key = _cache_key(file_path, delimiter)
+    sidecar_exists = record_index_path_for(file_path).exists()
+    if not sidecar_exists and not create:
+        return
+    with db_file_lock(file_path, exclusive=True), open(file_path, "rb") as f:
+        signature = _file_signature(f)
+        index = _cached_index(key)
+        if not sidecar_exists or index is None or index.signature[0] != (appended_at if appended_at is not None else signature[0]):
+            index = _load_sidecar(file_path, delimiter) if sidecar_exists else None
+        if index is not None and index.signature == signature:
+            _cache_index(key, index)
+            return
+
+        if index is not None and appended_at is not None and index.signature[0] == appended_at:
+            # Only the records from the last delimiter on can change; cached indexes are shared, so update a copy
+            index = index.copy()
+            truncate_at = index.tail_position
+            index._truncate(index.tail)
+            first = len(index)
+            index.signature = signature
+            index.scan(f, index.tail)
+            _append_sidecar(file_path, index, first, truncate_at)
+        else:
+            index = _build_record_index(f, delimiter)
+            _write_sidecar(file_path, index)
+    _cache_index(key, index)
+
+
+def shift_record_index(file_path: Union[str, Path], size: int, previous_signature: Tuple[int, int]) -> None:
+    """
+    Update the record indexes of a file (in memory and the sidecar) after `size` bytes were put
+    in front of it; called holding the file lock.
+
+    Indexes of the previous version (`previous_signature`) are shifted instead of built again,
+    so only the prepended records are read and hashed. Other indexes are left to be rebuilt on use.
+    """
+    file_path = Path(file_path)
+    resolved = str(file_path.resolve())
+    with _record_indexes_lock:
+        indexes = {key[1]: index for key, index in _record_indexes.items()
+                   if key[0] == resolved and index.signature == previous_signature}
+    sidecar_delimiter = _sidecar_delimiter(file_path)
+    if sidecar_delimiter is not None and sidecar_delimiter not in indexes:
+        sidecar_index = _load_sidecar(file_path, sidecar_delimiter)
+        if sidecar_index is not None and sidecar_index.signature == previous_signature:
+            indexes[sidecar_delimiter] = sidecar_index
+    if not indexes:
+        return
+
+    with open(file_path, "rb") as f:
+        signature = _file_signature(f)
+        for delimiter, index in indexes.items():
+            index = index.prepended(f, size, signature)
+            if index is None:
+                continue
+            if delimiter == sidecar_delimiter:
+                _write_sidecar(file_path, index)
+            _cache_index((resolved, delimiter), index)
+
+
+def read_record(file_path: Union[str, Path], position: Optional[int] = None, hash_value: Optional[str] = None,
+                delimiter: str = DEFAULT_RECORD_DELIMITER) -> Optional[str]:
+    """
+    Read one record of a file by position (0 = first, negative from the end) or by content hash.
+
+    Returns:
+        str: The record, or None if there is no such record
+    """
+    with open(file_path, "rb") as f:
+        index = _get_record_index(f, file_path, delimiter)
+        if hash_value is not None:
+            position = index.find(hash_value)
+            if position is None:
+                return None
+        if position is None or not -len(index) <= position < len(index):
+            return None
+        return index.read(f, position % len(index))
+
+
+def find_record(file_path: Union[str, Path], record: Optional[str] = None, hash_value: Optional[str] = None,
+                delimiter: str = DEFAULT_RECORD_DELIMITER) -> Optional[int]:
+    """Return position of the first record with the given text or content hash, None if not found."""
+    if hash_value is None:
+        if record is None:
+            raise ValueError("Record or hash must be given")
+        hash_value = record_hash(record)
+    with open(file_path, "rb") as f:
+        return _get_record_index(f, file_path, delimiter).find(hash_value)
+
+
+def count_records(file_path: Union[str, Path], delimiter: str = DEFAULT_RECORD_DELIMITER) -> int:
+    """Return the number of records of a file (uses the cached record index)."""
+    with open(file_path, "rb") as f:
+        return len(_get_record_index(f, file_path, delimiter))
+
+
+def sample_records(file_path: Union[str, Path], k: int, delimiter: str = DEFAULT_RECORD_DELIMITER,
+                   use_index: bool = True, rng: Optional[random.Random] = None) -> List[str]:
+    """
+    Pick k random records of a file (all of them, in random order, if it has fewer).
+
+    With `use_index` the record offsets of the file are indexed once and kept in
+    memory until the file changes, so sampling again only reads the k picked
+    records. Without it, records are streamed once through a reservoir sample.
+
+    Args:
+        file_path: Path of the file (must exist)
+        k: Number of records
+        delimiter: Record delimiter
+        use_index: Use (and build) the cached record index
+        rng: Random generator (default: the `random` module)
+
+    Returns:
+        list: Picked records, in random order
+    """
+    rng = rng or random
+    if k <= 0:
+        return []
+    with open(file_path, "rb") as f:
+        if use_index:
+            index = _get_record_index(f, file_path, delimiter)
+            positions = rng.sample(range(len(index)), min(k, len(index)))
+            return [index.read(f, position) for position in positions]
+
+        reservoir: List[str] = []
+        seen = 0
+        for _, raw_record in _iter_raw(f, _delimiter_pattern(delimiter), READ_CHUNK_SIZE):
+            record = _clean(raw_record)
+            if not record:
+                continue
+            if seen < k:
+                reservoir.append(record)
+            else:
+                position = rng.randint(0, seen)
+                if position < k:
+                    reservoir[position] = record
+            seen += 1
+    # The reservoir keeps file order for the first k records
+    rng.shuffle(reservoir)
+    return reservoir
+
+
+def iter_text_chunks(file_path: Union[str, Path], chunk_size: int = READ_CHUNK_SIZE) -> Iterator[str]:
+    """Iterate the text of a file in chunks of `chunk_size` characters."""
+    f = open(file_path, "r", encoding="utf-8")
+    return _iter_text_chunks(f, chunk_size)
+
+
+def _iter_text_chunks(f, chunk_size: int) -> Iterator[str]:
+    with f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+# Export record readers
+__all__ = [
+    'iter_records',
+    'iter_text_chunks',
+    'sample_records',
+    'count_records',
+    'read_record',
+    'find_record',
+    'record_hash',
+    'update_record_index',
+    'shift_record_index',
+    'record_index_path_for',
+    'RecordIndex',
+    'DEFAULT_RECORD_DELIMITER',
+    'READ_CHUNK_SIZE'
+]
@@ -0,0 +1,515 @@
+"""
+SQLite storage backend for JSON databases (`.sqlite` / `.sqlite3` / `.db` files).
+
+Same data model and operations as `JsonDb`, for databases too large to keep
+in memory or to rewrite as one file. Only the Python standard library
+(`sqlite3`) is used; the file runs in WAL mode, so readers in all app
+processes work concurrently with one writer.
+
+Tables:
+- `meta`: top-level keys of the database document (`db_info`,
+  `db_json_schema`, `db_indexes`, ...) as JSON, in document order
+- `collections`: collection names; entries of each collection are in their
+  own table `collection_<n>` (`seq` = insertion order, `id` = indexed entry
+  id, `entry` = the entry as JSON)
+- `entry_index`: values of secondary indexes declared in `db_indexes`
+
+Entries without an id and older duplicates of an id are stored with a NULL
+`id` column, so `to_dict()` returns exactly the document given to `replace()`.
+"""
+
+import copy
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from app.storage.db_backend import DbBackend
+from app.storage.json_db_indexes import (
+    INDEX_TYPES, index_values, matches_condition, normalize_conditions, sort_entries
+)
+
+
+# File name suffixes of SQLite databases
+SQLITE_DB_SUFFIXES = (".sqlite", ".sqlite3", ".db")
+
+# Highest code point, upper bound of all strings with a given prefix
+_MAX_CHAR = "\U0010ffff"
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False)
+
+
+class SqliteDb(DbBackend):
+    """
+    JSON database stored in SQLite.
+
+    Every thread uses its own connection. Changes outside of `transaction()`
+    are committed one by one.
+    """
+
+    def __init__(self, db_path: Union[str, Path]):
+        self.db_path = Path(db_path).resolve()
+        self._local = threading.local()
+        self.exists = self.db_path.exists() and self._has_tables()
+
+    # --- Connection and transactions ---
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return the connection of the current thread (created on first use)."""
+        connection = getattr(self._local, "connection", None)
+        # SQLite connections must not be shared with a forked child process
+        if connection is None or self._local.process_id != os.getpid():
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(str(self.db_path), timeout=10, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            self._local.process_id = os.getpid()
+            self._local.depth = 0
+            self._local.updated_at = None
+        return connection
+
+    def _has_tables(self) -> bool:
+        row = self._connection().execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'meta'").fetchone()
+        return row is not None
+
+    def _create_tables(self) -> None:
+        connection = self._connection()
+        connection.execute("CREATE TABLE IF NOT EXISTS meta (position INTEGER NOT NULL, key TEXT PRIMARY KEY, value TEXT)")
+        connection.execute("CREATE TABLE IF NOT EXISTS collections (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL UNIQUE)")
+        connection.execute("""
+            CREATE TABLE IF NOT EXISTS entry_index (
+                collection_id INTEGER NOT NULL,
+                field TEXT NOT NULL,
+                value,
+                seq INTEGER NOT NULL
+            )
+        """)
+        connection.execute("CREATE INDEX IF NOT EXISTS entry_index_lookup ON entry_index (collection_id, field, value)")
+        connection.execute("CREATE INDEX IF NOT EXISTS entry_index_seq ON entry_index (collection_id, seq)")
+
+    @contextmanager
+    def transaction(self):
+        """
+        Group changes into one atomic commit:
+
+            with db.transaction():
+                db.add_entry("notes", {...})
+                db.delete_entry("notes", "abc123")
+
+        If the block raises, none of its changes are stored. Nested transactions join the outer one.
+        """
+        connection = self._connection()
+        if self._local.depth:
+            self._local.depth += 1
+            try:
+                yield self
+            finally:
+                self._local.depth -= 1
+            return
+
+        # IMMEDIATE takes the write lock up front, so reads in the block see the state it changes
+        connection.execute("BEGIN IMMEDIATE")
+        self._local.depth = 1
+        self._local.updated_at = None
+        try:
+            yield self
+            if self._local.updated_at is not None:
+                self._set_db_info_updated_at(self._local.updated_at)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        finally:
+            self._local.depth = 0
+            self._local.updated_at = None
+
+    def _require_exists(self) -> None:
+        if not self.exists:
+            # Created by another process since this instance was made
+            self.exists = self.db_path.exists() and self._has_tables()
+        if not self.exists:
+            raise Exception(f"Database file not found: {self.db_path}")
+
+    def _touch(self, updated_at: Optional[str]) -> None:
+        """Remember `db_info.updated_at` to be written once when the transaction commits."""
+        if updated_at:
+            self._local.updated_at = updated_at
+
+    def _set_db_info_updated_at(self, updated_at: str) -> None:
+        db_info = self._meta_value("db_info")
+        if isinstance(db_info, dict):
+            db_info["updated_at"] = updated_at
+            self._connection().execute("UPDATE meta SET value = ? WHERE key = 'db_info'", (_dumps(db_info),))
+
+    # --- Meta and collections ---
+
+    def _meta_value(self, key: str) -> Any:
+        if not self.exists:
+            return None
+        row = self._connection().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row is not None and row[0] is not None else None
+
+    def _set_meta_value(self, key: str, value: Any) -> None:
+        connection = self._connection()
+        updated = connection.execute("UPDATE meta SET value = ? WHERE key = ?", (_dumps(value), key)).rowcount
+        if not updated:
+            connection.execute(
+                "INSERT INTO meta (position, key, value) VALUES ((SELECT COALESCE(MAX(position), -1) + 1 FROM meta), ?, ?)",
+                (key, _dumps(value))
+            )
+
+    def _collection_table(self, collection: str, create: bool = False) -> Optional[Tuple[int, str]]:
+        """Return (collection id, table name) of a collection, None if it does not exist (and create is False)."""
+        if not self.exists:
+            return None
+        connection = self._connection()
+        row = connection.execute("SELECT id FROM collections WHERE name = ?", (collection,)).fetchone()
+        if row is None:
+            if not create:
+                return None
+            collection_id = connection.execute("INSERT INTO collections (name) VALUES (?)", (collection,)).lastrowid
+            table = f"collection_{int(collection_id)}"
+            connection.execute(f"CREATE TABLE {table} (seq INTEGER PRIMARY KEY AUTOINCREMENT, id TEXT, entry TEXT NOT NULL)")
+            connection.execute(f"CREATE UNIQUE INDEX {table}_id ON {table} (id)")
+            return collection_id, table
+        return row[0], f"collection_{int(row[0])}"
+
+    # --- Secondary indexes ---
+
+    def _index_entry(self, collection_id: int, seq: int, entry: Any, indexes: Dict[str, str]) -> None:
+        if not indexes or not isinstance(entry, dict):
+            return
+        rows = [
+            (collection_id, field, value, seq)
+            for field, index_type in indexes.items() if field in entry
+            for value in index_values(index_type, entry[field])
+        ]
+        if rows:
+            self._connection().executemany("INSERT INTO entry_index (collection_id, field, value, seq) VALUES (?, ?, ?, ?)", rows)
+
+    def _unindex_entry(self, collection_id: int, seq: int) -> None:
+        self._connection().execute("DELETE FROM entry_index WHERE collection_id = ? AND seq = ?", (collection_id, seq))
+
+    @staticmethod
+    def _index_condition(index_type: Optional[str], operator: str, operand: Any) -> Optional[Tuple[str, list]]:
+        """Return (SQL condition on entry_index.value, params) answering a query condition, None if the index can't."""
+        def is_scalar(value):
+            return value is None or isinstance(value, (str, int, float))
+
+        if index_type == "hash":
+            if operator == "eq" and is_scalar(operand):
+                return "value IS ?", [operand]
+            if operator == "in" and isinstance(operand, list) and all(is_scalar(item) for item in operand):
+                values = [item for item in operand if item is not None]
+                sql = f"value IN ({', '.join('?' * len(values))})"
+                return (f"({sql} OR value IS NULL)" if None in operand else sql), values
+            return None
+
+        if index_type == "sorted":
+            if operator == "in":
+                if not isinstance(operand, list):
+                    return None
+                values = [item for item in operand if index_values("sorted", item)]
+                return f"value IN ({', '.join('?' * len(values))})", values
+            if operator == "prefix":
+                if not isinstance(operand, str):
+                    return None
+                return "value >= ? AND value < ?", [operand, operand + _MAX_CHAR]
+            if not index_values("sorted", operand):
+                return None
+            if operator == "eq":
+                return "value = ?", [operand]
+            # Ranges stay within one value type: SQLite sorts all numbers before the empty string
+            is_string = isinstance(operand, str)
+            comparison = {"gt": ">", "gte": ">=", "lt": "<", "lte": "<="}.get(operator)
+            if comparison is None:
+                return None
+            if operator in ("gt", "gte"):
+                return (f"value {comparison} ?" + ("" if is_string else " AND value < ''")), [operand]
+            return (f"value {comparison} ?" + (" AND value >= ''" if is_string else "")), [operand]
+        return None
+
+    # --- Changes ---
+
+    def _get_row(self, table: str, entry_id: str) -> Optional[Tuple[int, dict]]:
+        if not isinstance(entry_id, str):
+            return None
+        row = self._connection().execute(f"SELECT seq, entry FROM {table} WHERE id = ?", (entry_id,)).fetchone()
+        return None if row is None else (row[0], json.loads(row[1]))
+
+    def add_entry(self, collection: str, entry: dict, updated_at: Optional[str] = None, validate: bool = True) -> dict:
+        """Add entry (must have an "id") as the newest one of the collection."""
+        if not isinstance(entry.get("id"), str):
+            raise Exception("Entry id (str) is required.")
+        if validate:
+            self.validate_entry(collection, entry)
+        with self.transaction():
+            self._require_exists()
+            collection_id, table = self._collection_table(collection, create=True)
+            connection = self._connection()
+            # Re-added id moves to the newest position
+            existing = self._get_row(table, entry["id"])
+            if existing is not None:
+                connection.execute(f"DELETE FROM {table} WHERE seq = ?", (existing[0],))
+                self._unindex_entry(collection_id, existing[0])
+            seq = connection.execute(f"INSERT INTO {table} (id, entry) VALUES (?, ?)", (entry["id"], _dumps(entry))).lastrowid
+            self._index_entry(collection_id, seq, entry, self.get_indexes(collection))
+            self._touch(updated_at)
+        return entry
+
+    def update_entry(self, collection: str, entry_id: str, updates: dict, updated_at: Optional[str] = None,
+                     validate: bool = True) -> Optional[dict]:
+        """Merge `updates` into the entry. Returns the updated entry or None if not found."""
+        with self.transaction():
+            collection_table = self._collection_table(collection)
+            if collection_table is None:
+                return None
+            collection_id, table = collection_table
+            existing = self._get_row(table, entry_id)
+            if existing is None:
+                return None
+            seq, entry = existing
+            updated_entry = {**entry, **copy.deepcopy(updates), "id": entry_id}
+            if validate:
+                self.validate_entry(collection, updated_entry)
+            self._connection().execute(f"UPDATE {table} SET entry = ? WHERE seq = ?", (_dumps(updated_entry), seq))
+            self._unindex_entry(collection_id, seq)
+            self._index_entry(collection_id, seq, updated_entry, self.get_indexes(collection))
+            self._touch(updated_at)
+            return updated_entry
+
+    def delete_entry(self, collection: str, entry_id: str, updated_at: Optional[str] = None) -> bool:
+        """Delete entry by id. Returns False if not found."""
+        with self.transaction():
+            collection_table = self._collection_table(collection)
+            if collection_table is None:
+                return False
+            collection_id, table = collection_table
+            existing = self._get_row(table, entry_id)
+            if existing is None:
+                return False
+            self._connection().execute(f"DELETE FROM {table} WHERE seq = ?", (existing[0],))
+            self._unindex_entry(collection_id, existing[0])
+            self._touch(updated_at)
+            return True
+
+    def add_collection(self, collection: str) -> None:
+        with self.transaction():
+            self._require_exists()
+            self._collection_table(collection, create=True)
+
+    def define_index(self, collection: str, field: str, index_type: Optional[str]) -> None:
+        """Create (or change) a secondary index on a collection field; index_type None drops it."""
+        if index_type and index_type not in INDEX_TYPES:
+            raise Exception(f"Unknown index type '{index_type}', use one of: {', '.join(INDEX_TYPES)}")
+        with self.transaction():
+            self._require_exists()
+            db_indexes = self._meta_value("db_indexes") or {}
+            if index_type:
+                db_indexes.setdefault(collection, {})[field] = index_type
+            else:
+                db_indexes.get(collection, {}).pop(field, None)
+            self._set_meta_value("db_indexes", db_indexes)
+
+            collection_table = self._collection_table(collection)
+            if collection_table is None:
+                return
+            collection_id, table = collection_table
+            connection = self._connection()
+            connection.execute("DELETE FROM entry_index WHERE collection_id = ? AND field = ?", (collection_id, field))
+            if index_type:
+                for seq, entry in connection.execute(f"SELECT seq, entry FROM {table}").fetchall():
+                    self._index_entry(collection_id, seq, json.loads(entry), {field: index_type})
+
+    def replace(self, document: dict) -> None:
+        """Replace the whole database with a document in the JSON database format (import)."""
+        self._create_tables()
+        self.exists = True
+        with self.transaction():
+            connection = self._connection()
+            for (collection_id,) in connection.execute("SELECT id FROM collections").fetchall():
+                connection.execute(f"DROP TABLE IF EXISTS collection_{int(collection_id)}")
+            connection.execute("DELETE FROM collections")
+            connection.execute("DELETE FROM meta")
+            connection.execute("DELETE FROM entry_index")
+
+            # "collections" keeps its place among the top-level keys with a NULL value
+            connection.executemany(
+                "INSERT INTO meta (position, key, value) VALUES (?, ?, ?)",
+                [(position, key, None if key == "collections" else _dumps(value)) for position, (key, value) in enumerate(document.items())]
+            )
+            collections = document.get("collections")
+            for name, entries in (collections.items() if isinstance(collections, dict) else []):
+                self._import_entries(name, entries if isinstance(entries, list) else [])
+            for name, fields in (document.get("db_indexes") or {}).items():
+                for field, index_type in (fields or {}).items():
+                    self.define_index(name, field, index_type)
+
+    def _import_entries(self, collection: str, entries: List[Any]) -> None:
+        """Store a newest-first entry list; like JsonDb only the newest entry of an id gets the id."""
+        _, table = self._collection_table(collection, create=True)
+        seen_ids = set()
+        rows = []
+        for entry in entries:
+            entry_id = entry.get("id") if isinstance(entry, dict) else None
+            if isinstance(entry_id, str) and entry_id not in seen_ids:
+                seen_ids.add(entry_id)
+            else:
+                entry_id = None
+            rows.append((entry_id, _dumps(entry)))
+        # Oldest first, so seq grows with insertion order as for later added entries
+        self._connection().executemany(f"INSERT INTO {table} (id, entry) VALUES (?, ?)", reversed(rows))
+
+    # --- Reading ---
+
+    @property
+    def db_info(self) -> Optional[dict]:
+        return self._meta_value("db_info")
+
+    @property
+    def db_json_schema(self) -> Optional[dict]:
+        return self._meta_value("db_json_schema")
+
+    def has_collection(self, collection: str) -> bool:
+        return self._collection_table(collection) is not None
+
+    def collection_names(self) -> List[str]:
+        if not self.exists:
+            return []
+        return [row[0] for row in self._connection().execute("SELECT name FROM collections ORDER BY id")]
+
+    def get_entry(self, collection: str, entry_id: str) -> Optional[dict]:
+        collection_table = self._collection_table(collection)
+        if collection_table is None:
+            return None
+        row = self._get_row(collection_table[1], entry_id)
+        return None if row is None else row[1]
+
+    def count_entries(self, collection: str) -> Optional[int]:
+        collection_table = self._collection_table(collection)
+        if collection_table is None:
+            return None
+        return self._connection().execute(f"SELECT COUNT(*) FROM {collection_table[1]}").fetchone()[0]
+
+    def iter_entries(self, collection: str, offset: int = 0) -> Iterator[dict]:
+        """Iterate entries of the collection newest first; rows are read from SQLite as the iterator advances."""
+        collection_table = self._collection_table(collection)
+        if collection_table is None:
+            return iter(())
+        cursor = self._connection().execute(
+            f"SELECT entry FROM {collection_table[1]} ORDER BY seq DESC LIMIT -1 OFFSET ?", (offset,)
+        )
+        return (json.loads(row[0]) for row in cursor)
+
+    def get_indexes(self, collection: str) -> Dict[str, str]:
+        """Return {field: index type} of the collection."""
+        return dict((self._meta_value("db_indexes") or {}).get(collection) or {})
+
+    def query(self, collection: str, where: Optional[dict] = None, sort_by: Optional[str] = None,
+              descending: bool = False, limit: Optional[int] = None, offset: int = 0) -> Optional[dict]:
+        """
+        Find entries of a collection (same arguments and results as `JsonDb.query`).
+
+        Conditions on indexed fields are answered by the `entry_index` table; other
+        conditions and sorting by a field without a sorted index are done in Python.
+        """
+        collection_table = self._collection_table(collection)
+        if collection_table is None:
+            return None
+        collection_id, table = collection_table
+        indexes = self.get_indexes(collection)
+        connection = self._connection()
+
+        clauses = []
+        params = []
+        remaining_conditions = []
+        for field, operator, operand in normalize_conditions(where):
+            index_condition = self._index_condition(indexes.get(field), operator, operand)
+            if index_condition is None:
+                remaining_conditions.append((field, operator, operand))
+                continue
+            clauses.append(f"t.seq IN (SELECT seq FROM entry_index WHERE collection_id = ? AND field = ? AND {index_condition[0]})")
+            params += [collection_id, field, *index_condition[1]]
+        where_sql = " AND ".join(clauses) or "1"
+
+        if not remaining_conditions and (not sort_by or indexes.get(sort_by) == "sorted"):
+            # Whole query runs in SQLite, only the requested page is decoded
+            total = connection.execute(f"SELECT COUNT(*) FROM {table} t WHERE {where_sql}", params).fetchone()[0]
+            select_sql = "t.entry"
+            order_sql = "t.seq DESC"
+            select_params = []
+            if sort_by:
+                # Entries without a sortable value come last, ties newest first
+                select_sql += ", (SELECT value FROM entry_index WHERE collection_id = ? AND field = ? AND seq = t.seq) AS sort_value"
+                select_params = [collection_id, sort_by]
+                direction = "DESC" if descending else "ASC"
+                order_sql = f"sort_value IS NULL, sort_value {direction}, t.seq DESC"
+            rows = connection.execute(
+                f"SELECT {select_sql} FROM {table} t WHERE {where_sql} ORDER BY {order_sql} LIMIT ? OFFSET ?",
+                [*select_params, *params, -1 if limit is None else limit, offset]
+            ).fetchall()
+            return {"total": total, "entries": [json.loads(row[0]) for row in rows]}
+
+        matching = []
+        for (entry_json,) in connection.execute(f"SELECT t.entry FROM {table} t WHERE {where_sql} ORDER BY t.seq DESC", params):
+            entry = json.loads(entry_json)
+            if all(isinstance(entry, dict) and matches_condition(entry, *condition) for condition in remaining_conditions):
+                matching.append(entry)
+        if sort_by:
+            matching = sort_entries(matching, sort_by, descending)
+        page = matching[offset:] if limit is None else matching[offset:offset + limit]
+        return {"total": len(matching), "entries": page}
+
+    def to_dict(self) -> dict:
+        """Return the whole database in the JSON database format (export)."""
+        if not self.exists:
+            return {}
+        connection = self._connection()
+        collections = {
+            name: list(self.iter_entries(name))
+            for (name,) in connection.execute("SELECT name FROM collections ORDER BY id").fetchall()
+        }
+        document = {}
+        for key, value in connection.execute("SELECT key, value FROM meta ORDER BY position").fetchall():
+            document[key] = collections if key == "collections" else json.loads(value)
+        if "collections" not in document and collections:
+            document["collections"] = collections
+        return document
+
+
+# Cache of opened databases by resolved path
+_sqlite_dbs: Dict[str, SqliteDb] = {}
+_sqlite_dbs_lock = threading.Lock()
+
+
+def is_sqlite_db_path(db_path: Union[str, Path]) -> bool:
+    return Path(db_path).suffix.lower() in SQLITE_DB_SUFFIXES
+
+
+def open_sqlite_db(db_path: Union[str, Path]) -> SqliteDb:
+    """Return the database for a file path, shared by all callers in this process."""
+    key = str(Path(db_path).resolve())
+    with _sqlite_dbs_lock:
+        db = _sqlite_dbs.get(key)
+        if db is None:
+            db = SqliteDb(key)
+            _sqlite_dbs[key] = db
+    if not db.exists:
+        # Created by another process in the meantime
+        db.exists = db.db_path.exists() and db._has_tables()
+    return db
+
+
+# Export backend classes and functions
+__all__ = [
+    'SqliteDb',
+    'open_sqlite_db',
+    'is_sqlite_db_path',
+    'SQLITE_DB_SUFFIXES'
+]
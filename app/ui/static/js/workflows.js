@@ -1,5 +1,6 @@
 let taskId;
 let SSE; // SSE for Server-Sent Events
+const TASK_POLL_INTERVAL_MS = 500;
 
 // DOM elements
 
@@ -49,7 +50,7 @@ async function startWorkflow() {
         payload.model = domModelSelect.value;
     }
     console.log('startWorkflow - payload:', payload);
-    // 1) Start the workflow (runs until first yield)
+    // 1) Start the workflow (runs in background on the server)
     const res = await fetch('/api/start_task', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
@@ -59,21 +60,53 @@ async function startWorkflow() {
     taskId = data.task_id;
     console.log('startWorkflow - response:', data);
 
-    
-    /* temporary disabled SSE
-    // 2) Open SSE stream for status updates
-    SSE = new EventSource(`/msg/stream?task_id=${taskId}`);
+    // Errors (e.g. missing input) are returned before the task is started
+    if (data.status === 'error') {
+        handleMsg(data);
+        return;
+    }
+
+    // 2) Receive task events as they happen (SSE), polling is a fallback for old browsers
+    if (window.EventSource) {
+        openTaskEventStream(taskId);
+    } else {
+        pollTaskEvents(taskId);
+    }
+};
+
+function openTaskEventStream(streamTaskId) {
+    if (SSE) SSE.close();
+    SSE = new EventSource(`/api/tasks/${streamTaskId}/events`);
     SSE.onmessage = e => {
         const msg = JSON.parse(e.data);
         console.log('SSE message:', msg);
         handleMsg(msg);
     };
-    SSE.onerror = (error) => console.error('SSE error', error);    
-    */
+    SSE.addEventListener('task_end', () => {
+        SSE.close();
+        SSE = null;
+    });
+    // EventSource reconnects automatically and resumes from the last received event id
+    SSE.onerror = (error) => console.error('SSE error', error);
+}
 
-    // 3) Handle the initial response
-    handleMsg(data);
-};
+async function pollTaskEvents(pollTaskId) {
+    let nextEventIndex = 0;
+    while (pollTaskId === taskId) {
+        const res = await fetch(`/api/tasks/${pollTaskId}?after=${nextEventIndex}`);
+        const task = await res.json();
+        if (task.status === 'error') {
+            handleMsg(task);
+            return;
+        }
+        task.events.forEach(event => handleMsg(event));
+        nextEventIndex = task.next_event_index;
+        if (task.task_status === 'finished' || task.task_status === 'failed') {
+            return;
+        }
+        await new Promise(resolve => setTimeout(resolve, TASK_POLL_INTERVAL_MS));
+    }
+}
 
 async function continueWorkflow(input) {
     const res = await fetch('/api/continue_task', {
@@ -82,8 +115,11 @@ async function continueWorkflow(input) {
         body: JSON.stringify({ task_id: taskId, user_input: input })
     });
     const response_payload = await res.json();
-    handleMsg(response_payload);
     console.log('continueWorkflow - response:', response_payload);
+    // Next events of the resumed workflow arrive via the task event stream, only errors are shown here
+    if (response_payload.status === 'error') {
+        handleMsg(response_payload);
+    }
 }
 
 function escapeHtml(text) {
@@ -108,6 +144,28 @@ function renderMessageComponent({ title, body, data, form, isOpen = false, style
     </div>`;
 }
 
+/**
+ * Appends a streamed piece of content (e.g. LLM tokens) to the message of its stream,
+ * creating the message on the first delta.
+ * @param {Object} response - Event with stream_id and message.body holding the delta.
+ */
+function appendStreamedDelta(response) {
+    const streamElementId = `stream-${response.stream_id}`;
+    let streamBody = document.getElementById(streamElementId);
+    if (!streamBody) {
+        domMessages.innerHTML += renderMessageComponent({
+            isOpen: true,
+            title: response.message.title,
+            body: ' ',
+            style: 'color: #a1a1a1;'
+        });
+        streamBody = domMessages.lastElementChild.querySelector('.message-body pre');
+        streamBody.id = streamElementId;
+        streamBody.textContent = '';
+    }
+    streamBody.textContent += response.message.body || '';
+}
+
 function processFuncLog(response) {
     if (response.func_log && response.func_log.length > 0) {
         response.func_log.forEach(status => {
@@ -302,7 +360,11 @@ function handleMsg(response) {
                 //data: JSON.stringify(response, null, 2),
                 style: 'color: #a1a1a1;'
             });
-            continueWorkflow('confirm');
+            // Status messages no longer pause the workflow, it continues on the server
+            break;
+
+        case 'streamed_content_delta':
+            appendStreamedDelta(response);
             break;
 
         default:
@@ -0,0 +1,88 @@
+"""
+Shared HTTP sessions with connection pooling for outgoing API calls.
+
+Every `requests.post()` call opens a new TCP + TLS connection. Sessions
+returned by `get_http_session()` keep connections alive and reuse them for
+all calls to the same provider, and retry failed calls with exponential
+backoff on connection errors and 429/5xx responses.
+
+Sessions are cached per name for the lifetime of the process, so they
+survive plugin reloads.
+"""
+
+import threading
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+# HTTP status codes worth retrying (rate limit and temporary server errors)
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# Cache of sessions by name (usually LLM provider name)
+_http_sessions: Dict[str, requests.Session] = {}
+_http_sessions_lock = threading.Lock()
+
+
+def get_http_session(name: str, pool_size: int = 10, max_retries: int = 3, backoff_factor: float = 0.5) -> requests.Session:
+    """
+    Return a shared, connection-pooled session for the given name.
+
+    The session is created on first use; later calls with the same name
+    return the same session (pool settings of the first call are kept).
+
+    Args:
+        name (str): Session name, e.g. LLM provider name ("openrouter")
+        pool_size (int): Maximum number of kept-alive connections per host
+        max_retries (int): Retries on connection errors and 429/5xx responses
+        backoff_factor (float): Base of exponential backoff between retries (seconds)
+
+    Returns:
+        requests.Session: Shared session (thread-safe for sending requests)
+    """
+    session = _http_sessions.get(name)
+    if session is not None:
+        return session
+
+    with _http_sessions_lock:
+        session = _http_sessions.get(name)
+        if session is not None:
+            return session
+
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=0,  # Do not resend a request which may already be processed (LLM calls are billed)
+            status=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=frozenset({"GET", "POST"}),
+            respect_retry_after_header=True,
+            raise_on_status=False  # Return the last response so callers can report status and body
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _http_sessions[name] = session
+        return session
+
+
+def close_http_sessions(name: Optional[str] = None) -> None:
+    """Close one shared session (by name) or all of them."""
+    with _http_sessions_lock:
+        names = [name] if name else list(_http_sessions.keys())
+        for session_name in names:
+            session = _http_sessions.pop(session_name, None)
+            if session is not None:
+                session.close()
+
+
+# Export public functions
+__all__ = [
+    'get_http_session',
+    'close_http_sessions',
+    'RETRY_STATUS_CODES'
+]
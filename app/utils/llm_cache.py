@@ -0,0 +1,192 @@
+"""
+Content-addressed disk cache for LLM responses.
+
+The cache key is a SHA-256 hash over everything that determines the answer
+(provider, model, rendered messages, temperature, response format, tools),
+so an identical request returns the stored response without calling the
+provider. Entries are JSON files under `user/.runtime/llm_cache/` and are
+shared by all app processes.
+
+Eviction:
+- entries older than `max_age_seconds` are treated as missing and removed
+- when the cache grows over `max_bytes`, least recently used entries are removed
+
+The cache is opt-in: see `APP_SETTINGS.LLM_CACHE_ENABLED` and the `cache`
+argument of `fetch_llm`.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Optional, Union
+
+
+# Bump when the format of cached entries changes, old entries are then ignored
+LLM_CACHE_KEY_VERSION = 1
+
+
+class LlmResponseCache:
+    """Disk-backed LLM response cache with size and age based eviction."""
+
+    def __init__(self, cache_dir: Union[str, Path], max_bytes: int = 200 * 1024 * 1024, max_age_seconds: float = 30 * 24 * 3600):
+        self.cache_dir = Path(cache_dir).resolve()
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        self._total_bytes = None  # Unknown until the first scan
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(**request_parts: Any) -> str:
+        """Return the cache key (hex SHA-256) for the given request parts."""
+        canonical = json.dumps(
+            {"version": LLM_CACHE_KEY_VERSION, **request_parts},
+            sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        # Two-level fan-out keeps directories small
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for `key` or None (counted as hit or miss)."""
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            entry = None
+
+        if entry is not None and time.time() - entry.get("created_at", 0) > self.max_age_seconds:
+            self._remove_entry(entry_path)
+            entry = None
+
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        try:
+            # mtime marks last use, used for least-recently-used eviction
+            os.utime(entry_path)
+        except OSError:
+            pass
+        return entry.get("value")
+
+    def set(self, key: str, value: Any) -> None:
+        """Store `value` (JSON serializable) under `key`."""
+        entry_path = self._entry_path(key)
+        entry_path.parent.mkdir(parents=True, exist_ok=True)
+        content = json.dumps({"created_at": time.time(), "value": value}, ensure_ascii=False)
+        # Write to a temporary file first so readers never see a partial entry
+        tmp_path = entry_path.with_name(f".{entry_path.name}.{uuid.uuid4().hex[:8]}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, entry_path)
+
+        with self._lock:
+            self.writes += 1
+            if self._total_bytes is not None:
+                self._total_bytes += len(content.encode("utf-8"))
+            needs_eviction = self._total_bytes is None or self._total_bytes > self.max_bytes
+        if needs_eviction:
+            self.evict()
+
+    def _remove_entry(self, entry_path: Path) -> None:
+        try:
+            entry_path.unlink()
+        except OSError:
+            return
+        with self._lock:
+            self.evictions += 1
+
+    def _scan_entries(self) -> list:
+        """Return (mtime, size, path) of all entries."""
+        entries = []
+        if not self.cache_dir.exists():
+            return entries
+        for shard in os.scandir(self.cache_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.is_file() and entry.name.endswith(".json"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, Path(entry.path)))
+        return entries
+
+    def evict(self) -> int:
+        """Remove expired entries and least recently used ones over `max_bytes`. Returns number of removed entries."""
+        entries = sorted(self._scan_entries(), key=lambda e: e[0])
+        now = time.time()
+        removed = 0
+        total_bytes = sum(size for _, size, _ in entries)
+        # Unused for longer than max age means created before it as well
+        for mtime, size, path in entries:
+            if now - mtime > self.max_age_seconds or total_bytes > self.max_bytes:
+                self._remove_entry(path)
+                total_bytes -= size
+                removed += 1
+        with self._lock:
+            self._total_bytes = total_bytes
+        return removed
+
+    def clear(self) -> int:
+        """Remove all entries. Returns number of removed entries."""
+        entries = self._scan_entries()
+        for _, _, path in entries:
+            self._remove_entry(path)
+        with self._lock:
+            self._total_bytes = 0
+        return len(entries)
+
+    def stats(self) -> dict:
+        """Return hit/miss counters of this process and current cache size."""
+        entries = self._scan_entries()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "path": str(self.cache_dir),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "writes": self.writes,
+                "evictions": self.evictions,
+                "entries": len(entries),
+                "size_bytes": sum(size for _, size, _ in entries),
+                "max_bytes": self.max_bytes,
+                "max_age_seconds": self.max_age_seconds,
+            }
+
+
+_llm_cache: Optional[LlmResponseCache] = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LlmResponseCache:
+    """Return the process-wide LLM response cache configured in APP_SETTINGS (created on first use)."""
+    global _llm_cache
+    if _llm_cache is None:
+        with _llm_cache_lock:
+            if _llm_cache is None:
+                from app.configs.app_config import APP_SETTINGS
+                _llm_cache = LlmResponseCache(
+                    cache_dir=APP_SETTINGS.LLM_CACHE_PATH,
+                    max_bytes=APP_SETTINGS.LLM_CACHE_MAX_BYTES,
+                    max_age_seconds=APP_SETTINGS.LLM_CACHE_MAX_AGE_SECONDS
+                )
+    return _llm_cache
+
+
+# Export public classes and functions
+__all__ = [
+    'LlmResponseCache',
+    'get_llm_cache'
+]
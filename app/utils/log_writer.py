@@ -0,0 +1,164 @@
+"""
+Background writer for append-only JSONL logs.
+
+`JsonlLogWriter.write()` only puts the record on a queue and returns; a
+daemon thread serializes queued records and appends them in batches to
+`<prefix>_<YYYYMMDD>.jsonl` files. A new file is started each day and when
+the current one exceeds `max_bytes` (`<prefix>_<YYYYMMDD>_1.jsonl`, ...).
+
+Queued records are flushed at interpreter exit. Writers are cached per
+name for the lifetime of the process, so they survive plugin reloads.
+"""
+
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+
+class JsonlLogWriter:
+    """Queue-backed JSONL log sink with one writer thread per process."""
+
+    def __init__(self, log_dir: Union[str, Path], file_prefix: str, max_bytes: int = 50 * 1024 * 1024,
+                 batch_size: int = 100, flush_interval: float = 0.5):
+        self.log_dir = Path(log_dir)
+        self.file_prefix = file_prefix
+        self.max_bytes = max_bytes
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._process_id = None
+        self._current_date = None
+        self._current_part = 0
+        self.records_written = 0
+        self.write_errors = 0
+
+    def _ensure_thread(self) -> None:
+        # A thread does not survive fork, start one in each (gunicorn worker) process
+        if self._thread is not None and self._process_id == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._process_id == os.getpid():
+                return
+            self._queue = queue.Queue()
+            self._process_id = os.getpid()
+            self._thread = threading.Thread(target=self._writer_loop, name=f"log-writer-{self.file_prefix}", daemon=True)
+            self._thread.start()
+
+    def write(self, record: dict) -> None:
+        """Queue one record (JSON serializable dict) for writing."""
+        self._ensure_thread()
+        self._queue.put(record)
+
+    def flush(self, timeout: Optional[float] = 5.0) -> bool:
+        """Wait until all queued records are written. Returns False on timeout."""
+        if self._thread is None or self._process_id != os.getpid():
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def _writer_loop(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            # Collect whatever arrives shortly after, to write it with one open() call
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self._write_batch(batch)
+            except Exception as e:
+                self.write_errors += 1
+                print(f"*** Error writing log records ({self.file_prefix}): {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _current_path(self) -> Path:
+        """Return the file to append to, rotated by date and size."""
+        date = datetime.now().strftime("%Y%m%d")
+        if date != self._current_date:
+            self._current_date = date
+            self._current_part = 0
+        while True:
+            suffix = f"_{self._current_part}" if self._current_part else ""
+            path = self.log_dir / f"{self.file_prefix}_{date}{suffix}.jsonl"
+            try:
+                if path.stat().st_size < self.max_bytes:
+                    return path
+            except FileNotFoundError:
+                return path
+            self._current_part += 1
+
+    def _write_batch(self, batch: list) -> None:
+        lines = []
+        for record in batch:
+            try:
+                lines.append(json.dumps(record, ensure_ascii=False, default=str))
+            except (TypeError, ValueError) as e:
+                self.write_errors += 1
+                print(f"*** Error serializing log record ({self.file_prefix}): {e}")
+        if not lines:
+            return
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        with open(self._current_path(), "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        self.records_written += len(lines)
+
+
+# Cache of writers by name
+_log_writers: Dict[str, JsonlLogWriter] = {}
+_log_writers_lock = threading.Lock()
+
+
+def get_log_writer(name: str, log_dir: Union[str, Path], max_bytes: int = 50 * 1024 * 1024) -> JsonlLogWriter:
+    """
+    Return the shared JSONL log writer for the given name.
+
+    Args:
+        name (str): Writer name, also used as file prefix (e.g. "llm" -> llm_20250101.jsonl)
+        log_dir (str | Path): Folder for the log files
+        max_bytes (int): Size after which a new file is started
+
+    Returns:
+        JsonlLogWriter: Shared writer (settings of the first call are kept)
+    """
+    with _log_writers_lock:
+        writer = _log_writers.get(name)
+        if writer is None:
+            writer = JsonlLogWriter(log_dir=log_dir, file_prefix=name, max_bytes=max_bytes)
+            _log_writers[name] = writer
+        return writer
+
+
+def flush_log_writers(timeout: Optional[float] = 5.0) -> None:
+    """Wait until all writers have written their queued records."""
+    for writer in list(_log_writers.values()):
+        writer.flush(timeout=timeout)
+
+
+atexit.register(flush_log_writers)
+
+
+# Export public classes and functions
+__all__ = [
+    'JsonlLogWriter',
+    'get_log_writer',
+    'flush_log_writers'
+]
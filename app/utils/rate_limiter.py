@@ -0,0 +1,88 @@
+"""
+Per-provider limits for concurrent outgoing API calls.
+
+A `RateLimiter` bounds both the number of calls in flight and the number of
+calls started per minute. Limiters are cached per name (usually the LLM
+provider name) for the lifetime of the process, so all threads calling the
+same provider share one limit.
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter used as a context manager around one API call:
+
+        with get_rate_limiter("openrouter", max_concurrency=8, requests_per_minute=120):
+            session.post(...)
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None, requests_per_minute: Optional[float] = None):
+        self.max_concurrency = max_concurrency
+        self.requests_per_minute = requests_per_minute
+        self._semaphore = threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+        self._min_interval = 60.0 / requests_per_minute if requests_per_minute else 0.0
+        self._next_start = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self._semaphore is not None:
+            self._semaphore.acquire()
+        if self._min_interval:
+            # Reserve the next free start slot, then sleep outside the lock
+            with self._lock:
+                now = time.monotonic()
+                start_at = max(now, self._next_start)
+                self._next_start = start_at + self._min_interval
+            if start_at > now:
+                time.sleep(start_at - now)
+
+    def release(self) -> None:
+        if self._semaphore is not None:
+            self._semaphore.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+        return False
+
+
+# Cache of limiters by name (usually LLM provider name)
+_rate_limiters: Dict[str, RateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(name: str, max_concurrency: Optional[int] = None, requests_per_minute: Optional[float] = None) -> RateLimiter:
+    """
+    Return the shared limiter for the given name.
+
+    The limiter is created on first use; later calls with the same name
+    return the same limiter (limits of the first call are kept).
+
+    Args:
+        name (str): Limiter name, e.g. LLM provider name ("openrouter")
+        max_concurrency (int, optional): Maximum calls in flight, None = unlimited
+        requests_per_minute (float, optional): Maximum call starts per minute, None = unlimited
+
+    Returns:
+        RateLimiter: Shared limiter
+    """
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(name)
+        if limiter is None:
+            limiter = RateLimiter(max_concurrency=max_concurrency, requests_per_minute=requests_per_minute)
+            _rate_limiters[name] = limiter
+        return limiter
+
+
+# Export public classes and functions
+__all__ = [
+    'RateLimiter',
+    'get_rate_limiter'
+]
@@ -17,6 +17,7 @@ class ResponseAction(str, Enum):
     DATA_UPDATED = "data_updated"
     STATUS_MESSAGE = "status_message"
     STREAMED_STATUS_MESSAGE = "streamed_status_message"
+    STREAMED_CONTENT_DELTA = "streamed_content_delta"
 
 class ResponseKey(str, Enum):
     STATUS = "status"
@@ -33,6 +34,17 @@ class ResponseKey(str, Enum):
     FUNC_LOG = "func_log" 
     FORM_ELEMENTS = "form_elements"
     METADATA = "metadata"
+    TASK_STATUS = "task_status"
+    EVENTS = "events"
+    NEXT_EVENT_INDEX = "next_event_index"
+    STREAM_ID = "stream_id"
+
+class TaskStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    WAITING_FOR_INPUT = "waiting_for_input"
+    FINISHED = "finished"
+    FAILED = "failed"
 
 
 
@@ -190,6 +190,52 @@ class Workflow:
         }
 
         return response
+
+    def stream_delta(self, delta: str, stream_id: str, msgTitle: str=None):
+        """Return an event with a piece of streamed content; the UI appends it to the message of the same stream_id."""
+        from datetime import datetime
+        response = {
+            ResponseKey.ACTION.value: ResponseAction.STREAMED_CONTENT_DELTA.value,
+            ResponseKey.TIMESTAMP.value: datetime.now().timestamp(),
+            ResponseKey.STREAM_ID.value: stream_id,
+            ResponseKey.MESSAGE.value: {
+                ResponseKey.TITLE.value: msgTitle,
+                ResponseKey.BODY.value: delta,
+            },
+            ResponseKey.TASK_ID.value: self.task_id
+        }
+
+        return response
+
+    def stream_llm_output(self, deltas, msgTitle: str=None, flush_interval: float=0.2):
+        """
+        Forward content deltas (e.g. from `fetch_llm(..., stream=True)`) as streamed events
+        and return the complete text. Use with `yield from`:
+
+            story = yield from wf.stream_llm_output(fetch_llm(..., stream=True), msgTitle="LLM: Story")
+
+        The first delta is sent immediately; later deltas are coalesced into one event
+        per `flush_interval` seconds so fast streams do not flood the event buffer.
+        """
+        import time
+        import uuid
+        stream_id = uuid.uuid4().hex[:12]
+        content_parts = []
+        pending_parts = []
+        last_flush = 0.0
+        for delta in deltas:
+            content_parts.append(delta)
+            pending_parts.append(delta)
+            if time.monotonic() - last_flush >= flush_interval:
+                yield self.stream_delta(delta="".join(pending_parts), stream_id=stream_id, msgTitle=msgTitle)
+                pending_parts = []
+                last_flush = time.monotonic()
+        if pending_parts:
+            yield self.stream_delta(delta="".join(pending_parts), stream_id=stream_id, msgTitle=msgTitle)
+
+        content = "".join(content_parts)
+        self.log_msg(msgTitle=msgTitle, msgBody=content)
+        return content
     
     def warning_response(self, data, msgTitle=None, msgBody=None):
         response = {
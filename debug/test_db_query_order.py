@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Debug Script: Compare database query results with and without indexes
+This script checks that a sorted index does not change query results: the same queries are run
+on a JSON database without indexes, with indexes and on a SQLite database with indexes.
+Usage: python debug/test_db_query_order.py
+"""
+
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the project root to Python path so we can import modules
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+
+def make_document(rng):
+    """Entries newest first, with many equal values, some of them missing or not sortable"""
+    entries = []
+    for number in range(60):
+        entry = {"id": f"id{number}"}
+        choice = rng.random()
+        if choice < 0.8:
+            entry["n"] = rng.randint(0, 4)
+        elif choice < 0.9:
+            entry["n"] = rng.choice(["a", "b"])
+        elif choice < 0.95:
+            entry["n"] = None
+        entries.append(entry)
+    return {"db_info": {"title": "order test"}, "collections": {"entries": entries}}
+
+
+def test_query_order():
+    """Run queries on all three databases and compare the ids of the results"""
+    print("TESTING query results with and without indexes")
+    print("=" * 50)
+
+    from app.storage.json_db import JsonDb
+    from app.storage.sqlite_db import SqliteDb
+
+    rng = random.Random(7)
+    queries = [
+        {"sort_by": "n"},
+        {"sort_by": "n", "descending": True},
+        {"sort_by": "n", "limit": 7, "offset": 5},
+        {"sort_by": "n", "descending": True, "limit": 7, "offset": 5},
+        {"where": {"n": {"gte": 1, "lt": 4}}, "sort_by": "n"},
+        {"where": {"n": {"gt": 2}}, "sort_by": "n", "descending": True},
+        {"where": {"n": 2}},
+        {"where": {"n": {"prefix": "a"}}},
+    ]
+
+    all_ok = True
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        document = make_document(rng)
+        plain_db = JsonDb(Path(tmp_dir) / "plain.json", load=False)
+        plain_db.replace(document)
+        indexed_db = JsonDb(Path(tmp_dir) / "indexed.json", load=False)
+        indexed_db.replace(document)
+        indexed_db.define_index("entries", "n", "sorted")
+        sqlite_db = SqliteDb(Path(tmp_dir) / "indexed.sqlite")
+        sqlite_db.replace(document)
+        sqlite_db.define_index("entries", "n", "sorted")
+
+        # Changes after the index was built: re-added, updated and deleted entries
+        for db in (plain_db, indexed_db, sqlite_db):
+            db.add_entry("entries", {"id": "new1", "n": 2})
+            db.update_entry("entries", "id3", {"n": 2})
+            db.delete_entry("entries", "id10")
+
+        for query in queries:
+            results = [
+                [entry["id"] for entry in db.query("entries", **query)["entries"]]
+                for db in (plain_db, indexed_db, sqlite_db)
+            ]
+            if results[0] == results[1] == results[2]:
+                print(f"✓ {query}")
+            else:
+                all_ok = False
+                print(f"✗ {query}")
+                print(f"  no index: {results[0]}")
+                print(f"  index:    {results[1]}")
+                print(f"  SQLite:   {results[2]}")
+    return all_ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if test_query_order() else 1)
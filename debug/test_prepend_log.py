@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Debug Script: Test prepend log crash recovery
+This script checks that prepends are not lost after a crash tore the last line of the prepend log.
+Usage: python debug/test_prepend_log.py
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the project root to Python path so we can import modules
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+
+def test_torn_log_line():
+    """Prepend after a torn log line, the later prepends must still be merged"""
+    print("TESTING prepend log with a torn last line")
+    print("=" * 50)
+
+    from app.storage.prepend_log import prepend_to_file, materialize_prepends, prepend_log_path_for
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = Path(tmp_dir) / "news.md"
+        file_path.write_text("old\n", encoding="utf-8")
+
+        prepend_to_file(file_path, "A\n")
+        # Crash in the middle of appending the next record
+        with open(prepend_log_path_for(file_path), "a", encoding="utf-8") as f:
+            f.write('{"op": "prepend", "te')
+        prepend_to_file(file_path, "B\n")
+        prepend_to_file(file_path, "C\n")
+
+        materialize_prepends(file_path)
+        content = file_path.read_text(encoding="utf-8")
+        expected = "C\nB\nA\nold\n"
+        if content == expected:
+            print(f"✓ All prepends kept: {content!r}")
+            return True
+        print(f"✗ Expected {expected!r}, got {content!r}")
+        return False
+
+
+if __name__ == "__main__":
+    sys.exit(0 if test_torn_log_line() else 1)
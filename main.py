@@ -29,8 +29,8 @@ from app.configs.app_config import APP_SETTINGS
 # Import blueprint registration system
 from app.blueprints import register_blueprints
 
-# Import generators from blueprints to maintain shared state
-from app.blueprints import generators
+# Import task executor from blueprints to maintain shared state
+from app.blueprints import task_executor
 
 
 # ----------------------
@@ -128,7 +128,12 @@ if __name__ == '__main__':
     Development server entry point.
     
     For production, use a proper WSGI server like Gunicorn:
-    gunicorn -w 4 -b 0.0.0.0:5000 main:app
+    gunicorn -w 4 -k gthread --threads 8 -b 0.0.0.0:5000 main:app
+
+    Threaded workers are needed because SSE task event streams
+    (/api/tasks/<task_id>/events) keep their connection open.
+    With more than one worker set TASK_STORE_BACKEND=sqlite so every
+    worker can serve requests of tasks started by another worker.
     """
     # Ensure user data directory exists
     os.makedirs(str(APP_SETTINGS.USER_DATA_PATH), exist_ok=True)
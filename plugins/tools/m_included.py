@@ -3,12 +3,28 @@ import requests
 import json
 import re
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 from app.tools import tool
-from app.configs.llm_config import llm_models, llm_providers
+from app.configs.llm_config import llm_models, llm_providers, llm_http_settings
 from app.configs.app_config import APP_SETTINGS
 from app.utils.response_types import ResponseKey, ResponseStatus
+from app.utils.http_client import get_http_session
+from app.utils.llm_cache import get_llm_cache
+from app.utils.rate_limiter import get_rate_limiter
+from app.utils.log_writer import get_log_writer
+from app.storage.json_db import flush_json_dbs
+from app.storage.db_backend import DbBackend
+from app.storage.databases import open_db, save_db, convert_db, iter_db_collection
+from app.storage.sqlite_db import is_sqlite_db_path
+from app.storage.json_db_schema import format_validation_errors
+from app.storage.prepend_log import prepend_to_file, append_to_file, materialize_prepends
+from app.storage.paths import resolve_sandboxed_path, sandboxed_path_or_none, PATH_TRAVERSAL_ERROR
+from app.storage.records import (
+  iter_records as iter_file_records, iter_text_chunks, READ_CHUNK_SIZE,
+  sample_records as sample_file_records, count_records as count_file_records,
+  read_record as read_file_record, find_record as find_file_record, update_record_index
+)
 
 
 @tool(category='date_time')
@@ -64,6 +80,61 @@ def get_llm_provider_info(provider_name):
     return provider_info
 
 
+@tool(category='llm')
+def get_llm_http_settings(provider_name=None):
+    """
+    Returns HTTP client settings (pool size, retries, timeouts) for an LLM provider.
+    Args:
+        provider_name (str, optional): Provider name. Its "http_settings" override the defaults.
+    Returns:
+        dict: Default `llm_http_settings` merged with provider specific overrides.
+    """
+    settings = dict(llm_http_settings)
+    for provider in llm_providers:
+        if provider['name'] == provider_name:
+            settings.update(provider.get('http_settings') or {})
+    return settings
+
+
+@tool(category='llm')
+def get_llm_http_session(provider_name):
+    """
+    Returns the shared connection-pooled HTTP session for an LLM provider, together with request timeout.
+    Args:
+        provider_name (str): Provider name (used as session name).
+    Returns:
+        tuple: (requests.Session, (connect_timeout, read_timeout))
+    Example:
+        >>> session, timeout = get_llm_http_session("openrouter")
+        >>> session.post(url, json=payload, timeout=timeout)
+    """
+    settings = get_llm_http_settings(provider_name)
+    session = get_http_session(
+        name=provider_name,
+        pool_size=settings["pool_size"],
+        max_retries=settings["max_retries"],
+        backoff_factor=settings["backoff_factor"]
+    )
+    return session, (settings["connect_timeout"], settings["read_timeout"])
+
+
+@tool(category='llm')
+def get_llm_rate_limiter(provider_name):
+    """
+    Returns the shared rate limiter (concurrency and requests per minute) for an LLM provider.
+    Args:
+        provider_name (str): Provider name. Limits come from `get_llm_http_settings`.
+    Returns:
+        RateLimiter: Context manager wrapped around each provider call.
+    """
+    settings = get_llm_http_settings(provider_name)
+    return get_rate_limiter(
+        name=provider_name,
+        max_concurrency=settings.get("max_concurrency"),
+        requests_per_minute=settings.get("requests_per_minute")
+    )
+
+
 @tool(category='llm')
 def format_str_as_llm_message_obj(input):
     if isinstance(input, str):
@@ -72,7 +143,7 @@ def format_str_as_llm_message_obj(input):
 
 
 @tool()
-def fetch_llm(model_name, input, structured_output=None, response_format=None, tools=None, temperature=0.6):
+def fetch_llm(model_name, input, structured_output=None, response_format=None, tools=None, temperature=0.6, stream=False, cache=None):
     """
     Calls an LLM model by name with the given input and options.
 
@@ -82,9 +153,15 @@ def fetch_llm(model_name, input, structured_output=None, response_format=None, t
         structured_output (bool, optional): If True, requests a structured (JSON) response. Default is None.
         response_format (dict, optional): Custom response format configuration. Default is None.
         temperature (float, optional): Sampling temperature for randomness. Default is 0.6.
+        stream (bool, optional): If True, returns a generator of content deltas (str) as the
+            provider streams them, instead of waiting for the whole completion. Default is False.
+        cache (bool, optional): If True, an identical earlier request (same model, messages,
+            temperature, response format, tools and stream) is answered from the disk cache and new
+            answers are stored there. Default is None = APP_SETTINGS.LLM_CACHE_ENABLED.
 
     Returns:
         dict: The response from the LLM provider, including status, data, and metadata.
+        generator: With stream=True, content deltas (str). Forward them with `Workflow.stream_llm_output`.
 
     Raises:
         Exception: If the model or provider is not found, or if the API call fails.
@@ -92,6 +169,8 @@ def fetch_llm(model_name, input, structured_output=None, response_format=None, t
     Example:
         >>> fetch_llm("gpt-4", "What is the capital of France?")
         {'status': 'success', 'data': {'content': 'The capital of France is Paris.', 'role': 'assistant'}, ...}
+        >>> "".join(fetch_llm("gpt-4", "What is the capital of France?", stream=True))
+        'The capital of France is Paris.'
     """
     model_info = get_llm_model_info(model_name)    
     provider_info = get_llm_provider_info(provider_name=model_info['provider'])
@@ -100,21 +179,220 @@ def fetch_llm(model_name, input, structured_output=None, response_format=None, t
     provider_base_url = provider_info.get('base_url')
     provider_api_type = provider_info.get('api_type')
     
-    if provider_api_type == 'openai':
-        return call_api_of_type_openai_choices_direct(
-            model_name=model_info['name'],
-            api_key=provider_api_key,
-            base_url=provider_base_url,
-            input=input,
+    if cache is None:
+        cache = APP_SETTINGS.LLM_CACHE_ENABLED
+    cache_key = None
+    if cache:
+        cache_key = get_llm_cache().make_key(
+            provider=provider_info['name'],
+            model=model_info['name'],
+            messages=format_str_as_llm_message_obj(input),
+            temperature=temperature,
             structured_output=structured_output,
-            response_format=response_format,            
+            response_format=response_format,
             tools=tools,
-            temperature=temperature,
-            )
+            # Streamed answers are cached as content only, a non-stream call needs the provider message
+            stream=bool(stream)
+        )
+        cached_output = get_llm_cache().get(cache_key)
+        if cached_output is not None:
+            cached_output.setdefault(ResponseKey.METADATA.value, {})["cached"] = True
+            if stream:
+                return iter([cached_output[ResponseKey.DATA.value].get("content") or ""])
+            return cached_output
+    
+    if provider_api_type == 'openai':
+        call_api = call_api_of_type_openai_choices_stream if stream else call_api_of_type_openai_choices_direct
+        # Streamed calls are limited until the response starts, not for the whole stream
+        with get_llm_rate_limiter(provider_info['name']):
+            output = call_api(
+                model_name=model_info['name'],
+                api_key=provider_api_key,
+                base_url=provider_base_url,
+                input=input,
+                structured_output=structured_output,
+                response_format=response_format,            
+                tools=tools,
+                temperature=temperature,
+                provider_name=provider_info['name'],
+                )
+        if cache_key:
+            if stream:
+                return cache_llm_stream(output, cache_key=cache_key, model_name=model_info['name'])
+            get_llm_cache().set(cache_key, output)
+        return output
     return None
 
+
+@tool(category='llm')
+def cache_llm_stream(deltas, cache_key, model_name=None):
+    """
+    Passes streamed content deltas through and stores the complete answer in the LLM cache
+    when the stream has been fully consumed (answers without content are not stored).
+    """
+    content_parts = []
+    for delta in deltas:
+        content_parts.append(delta)
+        yield delta
+    if not any(content_parts):
+        # Nothing to replay (e.g. an answer with tool calls only)
+        return
+    get_llm_cache().set(cache_key, {
+        ResponseKey.STATUS.value: ResponseStatus.SUCCESS.value,
+        ResponseKey.DATA.value: {"role": "assistant", "content": "".join(content_parts)},
+        ResponseKey.METADATA.value: {"model": model_name}
+    })
+
+
+@tool(category='llm')
+def get_llm_cache_stats():
+    """
+    Returns LLM response cache statistics: hit/miss counters (of this app process), number of entries and size on disk.
+    """
+    return {
+        "enabled_by_default": APP_SETTINGS.LLM_CACHE_ENABLED,
+        **get_llm_cache().stats()
+    }
+
+
+@tool(category='llm')
+def clear_llm_cache():
+    """Removes all cached LLM responses. Returns number of removed entries."""
+    return get_llm_cache().clear()
+
+
+@tool()
+def iter_fetch_llm_many(llm_requests, max_concurrency=None):
+    """
+    Runs several `fetch_llm` calls concurrently and yields their results as they complete.
+
+    Args:
+        llm_requests (list): List of dicts with `fetch_llm` arguments, e.g. {"model_name": ..., "input": ...}.
+        max_concurrency (int, optional): Maximum calls in flight for this batch.
+            Default is `max_concurrency` of llm_http_settings. Per-provider limits apply on top.
+
+    Returns:
+        generator: Tuples (index, output, error) in completion order. `index` is the position in
+            `llm_requests`; either `output` (fetch_llm result) or `error` (Exception) is None.
+
+    Example:
+        >>> for index, output, error in iter_fetch_llm_many([{"model_name": "openai/gpt-4.1-mini", "input": "Hi"}]):
+        ...     print(index, error or output["data"]["content"])
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    llm_requests = list(llm_requests)
+    for request_kwargs in llm_requests:
+        if not isinstance(request_kwargs, dict):
+            raise Exception("Each LLM request must be a dictionary of fetch_llm arguments.")
+        if request_kwargs.get("stream"):
+            raise Exception("Streamed LLM calls are not supported in batch.")
+    if not llm_requests:
+        return
+
+    max_workers = max(1, min(max_concurrency or llm_http_settings["max_concurrency"], len(llm_requests)))
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fetch-llm") as executor:
+        futures = {executor.submit(fetch_llm, **request_kwargs): index for index, request_kwargs in enumerate(llm_requests)}
+        try:
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result(), None
+                except Exception as e:
+                    yield futures[future], None, e
+        finally:
+            # Consumer stopped early (or failed): do not start the remaining calls
+            for future in futures:
+                future.cancel()
+
+
 @tool()
-def call_api_of_type_openai_choices_direct(model_name, api_key, base_url, input, structured_output=None,  response_format=None, temperature=None, tools=None):
+def fetch_llm_many(llm_requests, max_concurrency=None, return_exceptions=False):
+    """
+    Runs several `fetch_llm` calls concurrently and returns their results in the order of the requests.
+
+    Args:
+        llm_requests (list): List of dicts with `fetch_llm` arguments.
+        max_concurrency (int, optional): Maximum calls in flight for this batch.
+        return_exceptions (bool, optional): If True, a failed call puts its Exception in the result
+            list instead of raising it (and cancelling calls not started yet). Default is False.
+
+    Returns:
+        list: `fetch_llm` outputs (or Exceptions) at the positions of their requests.
+
+    Example:
+        >>> outputs = fetch_llm_many([{"model_name": "openai/gpt-4.1-mini", "input": term} for term in terms])
+    """
+    llm_requests = list(llm_requests)
+    results = [None] * len(llm_requests)
+    batch = iter_fetch_llm_many(llm_requests, max_concurrency=max_concurrency)
+    try:
+        for index, output, error in batch:
+            if error is not None and not return_exceptions:
+                raise error
+            results[index] = error if error is not None else output
+    finally:
+        batch.close()
+    return results
+
+@tool(category='llm')
+def build_openai_choices_payload(model_name, input, structured_output=None, response_format=None, temperature=None, tools=None):
+    """
+    Builds the request payload for an OpenAI compatible chat completions API.
+    Args:
+        model_name (str): Name of the model.
+        input (str or list): User input as a string or list of message objects.
+        structured_output (bool, optional): If True, requests a JSON object response format.
+        response_format (dict, optional): Custom response format configuration.
+        temperature (float, optional): Sampling temperature.
+        tools (list, optional): Tool (function) definitions as list of dicts.
+    Returns:
+        dict: Request payload.
+    """
+    payload = {
+        "model": model_name,
+        "messages": format_str_as_llm_message_obj(input),
+        "temperature": temperature
+    }
+    # turn on JSON mode
+    if structured_output == True:
+        if response_format == None:
+            payload["response_format"] = { "type": "json_object" }
+    # pass tools for tool (function) calling 
+    if tools:
+        if isinstance(tools, list) and all(isinstance(t, dict) for t in tools):
+            payload["tools"] = tools
+        else:
+            raise Exception("Invalid tools format. Tools must be a list of dictionaries.")
+    return payload
+
+
+@tool(category='llm')
+def log_llm_call(input, output, provider_name=None, stream=False):
+    """
+    Queues one LLM call (input and output) for the daily LLM log `logs/llm_YYYYMMDD.jsonl`.
+    Records are written in batches by a background thread, so the call does not wait for disk.
+    Args:
+        input (str or list): Request input.
+        output (dict): Provider response (or assembled streamed output).
+        provider_name (str, optional): LLM provider name.
+        stream (bool, optional): True for streamed calls.
+    """
+    log_writer = get_log_writer(
+        name="llm",
+        log_dir=APP_SETTINGS.USER_DATA_FILES_PATH / "logs",
+        max_bytes=APP_SETTINGS.LLM_LOG_MAX_BYTES
+    )
+    log_writer.write({
+        "timestamp": formatted_datetime("%Y-%m-%dT%H:%M:%S"),
+        "provider": provider_name,
+        "stream": stream,
+        "input": format_str_as_llm_message_obj(input) if input else None,
+        "output": output
+    })
+
+
+@tool()
+def call_api_of_type_openai_choices_direct(model_name, api_key, base_url, input, structured_output=None,  response_format=None, temperature=None, tools=None, provider_name=None):
     """
     Calls the OpenAI API with the specified model and input.
 
@@ -126,6 +404,8 @@ def call_api_of_type_openai_choices_direct(model_name, api_key, base_url, input,
         structured_output (bool, optional): If True, requests a JSON object response format.
         response_format (dict, optional): Custom response format configuration. If None and structured_output is True, defaults to JSON object format.
         temperature (float, optional): Sampling temperature for randomness (default: 0.7).
+        provider_name (str, optional): LLM provider name, selects the shared pooled HTTP session.
+            Defaults to the host of base_url.
 
     Returns:
         dict: On success, returns a dictionary with:
@@ -135,9 +415,10 @@ def call_api_of_type_openai_choices_direct(model_name, api_key, base_url, input,
         Raises Exception on error.
 
     Notes:
-        - Logs each API call and response to a timestamped file in the user data logs directory.
+        - Logs each API call and response to the daily LLM log (logs/llm_YYYYMMDD.jsonl), written in background.
         - Supports both plain text and structured (JSON) outputs.
         - Requires valid API key and endpoint.
+        - Reuses kept-alive connections of the provider and retries on 429/5xx with backoff.
     """
     if not model_name:
         raise Exception("Model name for OpenAI API call was not provided")
@@ -156,34 +437,23 @@ def call_api_of_type_openai_choices_direct(model_name, api_key, base_url, input,
         "Content-Type": "application/json"
     }
 
-    payload = {
-        "model": model_name,
-        "messages": format_str_as_llm_message_obj(input),
-        "temperature": temperature
-    }
-    # turn on JSON mode
-    if structured_output == True:
-        if response_format == None:
-            payload["response_format"] = { "type": "json_object" }
-    # pass tools for tool (function) calling 
-    if tools:
-        if isinstance(tools, list) and all(isinstance(t, dict) for t in tools):
-            payload["tools"] = tools
-        else:
-            raise Exception("Invalid tools format. Tools must be a list of dictionaries.")
+    payload = build_openai_choices_payload(
+        model_name=model_name,
+        input=input,
+        structured_output=structured_output,
+        response_format=response_format,
+        temperature=temperature,
+        tools=tools
+    )
+
+    from urllib.parse import urlparse
+    session, timeout = get_llm_http_session(provider_name or urlparse(base_url).netloc)
 
     try:
-        response = requests.post(base_url, headers=headers, data=json.dumps(payload))
+        response = session.post(base_url, headers=headers, data=json.dumps(payload), timeout=timeout)
         if response.status_code == 200:
             result = response.json()
-            log_timestamp = formatted_datetime("%Y%m%d_%H%M%S")
-            log_filepath = user_data_files_path(f"logs/llm_{log_timestamp}.json")
-            log_content = {
-                "input": format_str_as_llm_message_obj(input),
-                "output": result
-            }
-            log_content = json.dumps(log_content, ensure_ascii=False, indent=2)
-            save_to_file(content=log_content, filepath=log_filepath)
+            log_llm_call(input=input, output=result, provider_name=provider_name)
             output = {
                 ResponseKey.STATUS.value: ResponseStatus.SUCCESS.value,
                 ResponseKey.DATA.value: result["choices"][0]["message"],
@@ -205,6 +475,111 @@ def call_api_of_type_openai_choices_direct(model_name, api_key, base_url, input,
         raise Exception(f"Error calling LLM model: {e}")
 
 
+@tool()
+def call_api_of_type_openai_choices_stream(model_name, api_key, base_url, input, structured_output=None, response_format=None, temperature=None, tools=None, provider_name=None):
+    """
+    Calls the OpenAI API in streaming mode and returns a generator of content deltas.
+
+    The request is sent (and HTTP errors are raised) right away; the returned
+    generator then reads the provider's server-sent events chunk by chunk, so
+    the first tokens are available long before the whole completion is done.
+
+    Args:
+        Same as `call_api_of_type_openai_choices_direct`.
+
+    Returns:
+        generator: Yields content deltas (str) as they arrive. When the stream ends,
+            the full call (input and assembled output) is logged like non-streamed calls (`log_llm_call`).
+
+    Example:
+        >>> for delta in call_api_of_type_openai_choices_stream(...):
+        ...     print(delta, end="")
+    """
+    if not model_name:
+        raise Exception("Model name for OpenAI API call was not provided")
+    
+    if not api_key:
+        raise Exception("API key for OpenAI API call was not provided")
+    
+    if not base_url:
+        raise Exception("Base URL for OpenAI API call was not provided")
+    
+    if not input:
+        raise Exception("Input for OpenAI API call was not provided")
+
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
+        "Accept": "text/event-stream"
+    }
+
+    payload = build_openai_choices_payload(
+        model_name=model_name,
+        input=input,
+        structured_output=structured_output,
+        response_format=response_format,
+        temperature=temperature,
+        tools=tools
+    )
+    payload["stream"] = True
+
+    from urllib.parse import urlparse
+    session, timeout = get_llm_http_session(provider_name or urlparse(base_url).netloc)
+
+    try:
+        response = session.post(base_url, headers=headers, data=json.dumps(payload), timeout=timeout, stream=True)
+    except Exception as e:
+        raise Exception(f"Error calling LLM model: {e}")
+    if response.status_code != 200:
+        try:
+            raise Exception(f"Error returned by LLM provider: {response.status_code} - {response.text}")
+        finally:
+            response.close()
+
+    return iter_openai_choices_stream(response=response, input=input, provider_name=provider_name)
+
+
+@tool(category='llm')
+def iter_openai_choices_stream(response, input=None, provider_name=None):
+    """
+    Reads an OpenAI compatible server-sent events response and yields content deltas.
+    Args:
+        response (requests.Response): Response of a request sent with `stream=True`.
+        input (str or list, optional): Request input, used for the call log.
+        provider_name (str, optional): Provider name, used for the call log.
+    Returns:
+        generator: Content deltas (str). The connection is released when the generator ends or is closed.
+    """
+    # SSE is UTF-8 by definition; requests would guess ISO-8859-1 for text/* without charset
+    response.encoding = "utf-8"
+    content_parts = []
+    result = {"model": None, "content": None, "usage": None}
+    try:
+        # chunk_size=None reads data as it arrives instead of waiting for fixed size blocks
+        for line in response.iter_lines(chunk_size=None, decode_unicode=True):
+            # Skip keep-alive blank lines and SSE comments (e.g. ": OPENROUTER PROCESSING")
+            if not line or not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                break
+            chunk = json.loads(data)
+            if chunk.get("error"):
+                raise Exception(f"Error returned by LLM provider: {chunk['error']}")
+            result["model"] = chunk.get("model") or result["model"]
+            result["usage"] = chunk.get("usage") or result["usage"]
+            for choice in chunk.get("choices") or []:
+                delta = (choice.get("delta") or {}).get("content")
+                if delta:
+                    content_parts.append(delta)
+                    yield delta
+    finally:
+        response.close()
+
+    result["content"] = "".join(content_parts)
+    log_llm_call(input=input, output=result, provider_name=provider_name, stream=True)
+
+
 @tool()
 def assistant_output_formatted(assistant_output):
     """Extracts the message content from an assistant output or raises an error if not found."""
@@ -268,48 +643,143 @@ def open_file(filepath):
     FileNotFoundError: If the specified file does not exist.
     IOError: If there is an error reading the file.
   """
-  # Handle absolute paths - check if they're within the user data directory for security
-  if filepath.startswith("/") or (len(filepath) > 1 and filepath[1] == ":"):  # Unix absolute or Windows absolute
-    from pathlib import Path
-    
-    try:
-      user_files_path = Path(APP_SETTINGS.USER_DATA_FILES_PATH).resolve()
-      file_path = Path(filepath).resolve()
-      
-      # Validate the path is within allowed directory for security
-      try:
-        file_path.relative_to(user_files_path)
-        full_path = str(file_path)
-      except ValueError:
-        # Fallback string-based check
-        user_files_str = str(user_files_path)
-        file_path_str = str(file_path)
-        
-        # Normalize path separators for comparison
-        user_files_normalized = user_files_str.replace('\\', '/').rstrip('/')
-        file_path_normalized = file_path_str.replace('\\', '/') 
-        
-        if file_path_normalized.startswith(user_files_normalized + '/') or file_path_normalized == user_files_normalized:
-          full_path = str(file_path)
-        else:
-          raise ValueError("Invalid filepath: Path outside allowed directory")
-          
-    except Exception as e:
-      if "Path outside allowed directory" in str(e):
-        raise
-      else:
-        print(f"Warning: Path resolution failed ({e}), rejecting absolute path for security")
-        raise ValueError("Invalid filepath: Path outside allowed directory")
-  else:
-    # Relative path - join with user data files path
-    full_path = os.path.join(APP_SETTINGS.USER_DATA_FILES_PATH, filepath)
-  
+  full_path = resolve_sandboxed_path(filepath)
+  materialize_prepends(full_path)
   with open(full_path, 'r', encoding='utf-8') as infile:
       return infile.read()
 
 
+def _read_path(filepath, external_root_path=None):
+  """Resolve a file path for reading: within external_root_path if given, else within the user data files path."""
+  if external_root_path:
+    return resolve_sandboxed_path(filepath, root=external_root_path)
+  full_path = resolve_sandboxed_path(filepath)
+  materialize_prepends(full_path)
+  return full_path
+
+
 @tool()
-def save_to_file(filepath, content, prepend=False, delimiter=None):
+def open_file_chunks(filepath, chunk_size=READ_CHUNK_SIZE, external_root_path=None):
+  """
+  Opens a text file and returns an iterator over its content in chunks, for files too big to read at once.
+  Args:
+    filepath (str): The path to the file to be read.
+    chunk_size (int): Number of characters per chunk, defaults to 1M.
+    external_root_path (str, optional): Read the file from this folder instead of the user data files path.
+  Returns:
+    Iterator over text chunks (str).
+  Raises:
+    FileNotFoundError: If the specified file does not exist.
+  Example:
+    >>> for chunk in open_file_chunks("logs/app.log"):
+    ...     process(chunk)
+  """
+  return iter_text_chunks(_read_path(filepath, external_root_path), chunk_size=chunk_size)
+
+
+@tool()
+def iter_records(filepath, delimiter='-----', external_root_path=None):
+  """
+  Reads delimiter-separated records of a text file lazily, one at a time.
+  Gives the same records as split_clean(open_file(filepath), delimiter) without loading the whole file.
+  Args:
+    filepath (str): The path to the file to be read.
+    delimiter (str): Record delimiter, defaults to '-----'.
+    external_root_path (str, optional): Read the file from this folder instead of the user data files path.
+  Returns:
+    Iterator over records (str), stripped, empty records left out.
+  Raises:
+    FileNotFoundError: If the specified file does not exist.
+  Example:
+    >>> for record in iter_records("stories.md"):
+    ...     print(record[:50])
+  """
+  return iter_file_records(_read_path(filepath, external_root_path), delimiter=delimiter)
+
+
+@tool()
+def sample_records(filepath, k, delimiter='-----', external_root_path=None, use_index=True):
+  """
+  Picks k random delimiter-separated records of a text file without loading the whole file.
+  Record offsets are indexed on first use and kept until the file changes, so repeated sampling
+  only reads the picked records. With use_index=False the records are streamed once (reservoir sampling).
+  Args:
+    filepath (str): The path to the file to be read.
+    k (int): Number of records to pick (all records if the file has fewer).
+    delimiter (str): Record delimiter, defaults to '-----'.
+    external_root_path (str, optional): Read the file from this folder instead of the user data files path.
+    use_index (bool): Use the cached record offset index, defaults to True.
+  Returns:
+    list[str]: Picked records in random order.
+  Example:
+    >>> sample_records("afirmace.md", 3)
+    ['...', '...', '...']
+  """
+  return sample_file_records(_read_path(filepath, external_root_path), k, delimiter=delimiter, use_index=use_index)
+
+
+@tool()
+def count_records(filepath, delimiter='-----', external_root_path=None):
+  """
+  Returns the number of delimiter-separated records of a text file (uses the cached record offset index).
+  Args:
+    filepath (str): The path to the file to be read.
+    delimiter (str): Record delimiter, defaults to '-----'.
+    external_root_path (str, optional): Read the file from this folder instead of the user data files path.
+  Returns:
+    int: Number of records.
+  """
+  return count_file_records(_read_path(filepath, external_root_path), delimiter=delimiter)
+
+
+@tool()
+def read_record(filepath, number=None, record_hash=None, delimiter='-----', external_root_path=None):
+  """
+  Reads one delimiter-separated record of a text file by its number or content hash, using the record
+  index (a seek instead of splitting the whole file).
+  Args:
+    filepath (str): The path to the file to be read.
+    number (int, optional): Record number, 0 = first record of the file, negative numbers count from the end.
+    record_hash (str, optional): SHA-256 hash of the stripped record text (instead of number).
+    delimiter (str): Record delimiter, defaults to '-----'.
+    external_root_path (str, optional): Read the file from this folder instead of the user data files path.
+  Returns:
+    str: The record, or None if there is no such record.
+  Example:
+    >>> read_record("ai_news.md", 0)
+    'Newest article ...'
+  """
+  if number is None and record_hash is None:
+    raise ValueError("number or record_hash must be provided")
+  return read_file_record(_read_path(filepath, external_root_path), position=number, hash_value=record_hash, delimiter=delimiter)
+
+
+@tool()
+def record_exists(filepath, record=None, record_hash=None, delimiter='-----', external_root_path=None):
+  """
+  Checks whether a text file contains a delimiter-separated record, by comparing content hashes in the record index.
+  Args:
+    filepath (str): The path to the file to be read.
+    record (str, optional): Record text (compared after stripping whitespace).
+    record_hash (str, optional): SHA-256 hash of the stripped record text (instead of record).
+    delimiter (str): Record delimiter, defaults to '-----'.
+    external_root_path (str, optional): Read the file from this folder instead of the user data files path.
+  Returns:
+    bool: True if the record is in the file.
+  Example:
+    >>> record_exists("stories_reviewed.md", "Once upon a time...")
+    False
+  """
+  if record is None and record_hash is None:
+    raise ValueError("record or record_hash must be provided")
+  full_path = _read_path(filepath, external_root_path)
+  if not os.path.exists(full_path):
+    return False
+  return find_file_record(full_path, record=record, hash_value=record_hash, delimiter=delimiter) is not None
+
+
+@tool()
+def save_to_file(filepath, content, prepend=False, delimiter=None, record_index=False):
   """Saves content to a file with various safety checks and options.
   This function saves the provided content to a file, with options to prepend or append. 
   It includes several safety checks for content validity and file path security.
@@ -318,6 +788,8 @@ def save_to_file(filepath, content, prepend=False, delimiter=None):
     content (str or convertible to str): Content to write to the file. Cannot be empty.
     prepend (bool, optional): If True, adds content at the beginning of file. If False, appends to end. 
       Defaults to False.
+    record_index (bool, optional): With a delimiter, create the record index sidecar used by read_record /
+      record_exists (an existing one is always kept up to date). Defaults to False.
   Raises:
     ValueError: If content is empty, not convertible to string, contains invalid Unicode,
       exceeds 10MB, or if filepath attempts path traversal.
@@ -329,6 +801,8 @@ def save_to_file(filepath, content, prepend=False, delimiter=None):
     - Files are written using UTF-8 encoding
     - Maximum file size limit is 10MB
     - Paths are relative to APP_SETTINGS["output_folder"]
+    - Prepended content is kept in a log sidecar and written into the file when it is read (open_file, file browser)
+    - With a delimiter and record_index, a record index sidecar is kept for read_record / record_exists
   """
   try:
     if content is None:
@@ -340,49 +814,8 @@ def save_to_file(filepath, content, prepend=False, delimiter=None):
     if len(content.strip()) == 0:
       raise ValueError("Content cannot be empty")
     
-    # Security check for path traversal
-    if ".." in filepath:
-      raise ValueError("Invalid filepath: Path traversal not allowed")
-      
-    # Handle absolute paths - check if they're within the user data directory
-    if filepath.startswith("/") or (len(filepath) > 1 and filepath[1] == ":"):  # Unix absolute or Windows absolute
-      from pathlib import Path
-      
-      try:
-        user_files_path = Path(APP_SETTINGS.USER_DATA_FILES_PATH).resolve()
-        file_path = Path(filepath).resolve()
-        
-        # More robust path validation that works across platforms
-        try:
-          # Check if the resolved path is within the allowed directory
-          file_path.relative_to(user_files_path)
-          full_path = str(file_path)
-        except ValueError:
-          # If relative_to fails, do a string-based check as fallback
-          user_files_str = str(user_files_path)
-          file_path_str = str(file_path)
-          
-          # Normalize path separators for comparison
-          user_files_normalized = user_files_str.replace('\\', '/').rstrip('/')
-          file_path_normalized = file_path_str.replace('\\', '/') 
-          
-          if file_path_normalized.startswith(user_files_normalized + '/') or file_path_normalized == user_files_normalized:
-            full_path = str(file_path)
-          else:
-            raise ValueError("Invalid filepath: Path traversal not allowed")
-            
-      except Exception as e:
-        # If path resolution fails completely, this is likely a security issue
-        # Don't fall back to relative path for absolute paths that fail validation
-        if "Path traversal not allowed" in str(e):
-          raise  # Re-raise the security error
-        else:
-          # For other path resolution errors, be more careful
-          print(f"Warning: Path resolution failed ({e}), rejecting absolute path for security")
-          raise ValueError("Invalid filepath: Path traversal not allowed")
-    else:
-      # Relative path - join with user data files path
-      full_path = os.path.join(APP_SETTINGS.USER_DATA_FILES_PATH, filepath)
+    # Relative paths are joined with the user data files path, absolute ones must be inside it
+    full_path = str(resolve_sandboxed_path(filepath))
     directory = os.path.dirname(full_path)
     if directory and not os.path.exists(directory):
       os.makedirs(directory)
@@ -399,18 +832,16 @@ def save_to_file(filepath, content, prepend=False, delimiter=None):
         content += f"\n\n{delimiter}\n"
 
     if prepend:
-      # Read existing content if file exists
-      existing_content = ''
-      if os.path.exists(full_path):
-        with open(full_path, 'r', encoding='utf-8') as infile:
-          existing_content = infile.read()
-      # Write new content followed by existing content
-      with open(full_path, 'w', encoding='utf-8') as outfile:
-        outfile.write(content + '\n' + existing_content)
+      # New content goes to the prepend log, the file is rewritten once when it is read (see app.storage.prepend_log)
+      prepend_to_file(full_path, content + '\n')
+      appended_at = None
     else:
       # Normal append mode
-      with open(full_path, 'a', encoding='utf-8') as outfile:
-        outfile.write(content + '\n')
+      appended_at = append_to_file(full_path, content + '\n')
+
+    if isinstance(delimiter, str) and len(delimiter.strip()) >= 1:
+      # Keep the record index sidecar (record offsets and hashes) of the file up to date, if there is one or it is asked for
+      update_record_index(full_path, delimiter, appended_at=appended_at, create=record_index)
     # Return JSON status after successful save
     return {
       ResponseKey.STATUS.value: ResponseStatus.SUCCESS,
@@ -432,28 +863,15 @@ def save_to_external_file(filename, content, prepend=False, base_path=None):
     """Save content to a file in an external location, creating directories if needed."""
     # Use environment variable if set, otherwise use default path
     base_path = base_path or os.getenv('EXTERNAL_STORAGE_1_LOCAL_PATH')
-    base_path = Path(base_path)
-    full_path = base_path / filename
+    if not base_path:
+        raise ValueError("base_path must be provided")
     
-    # Validate path is within external storage directory - robust cross-platform check
     try:
-        if not full_path.is_absolute():
-            full_path = full_path.resolve()
-        
-        # More robust path validation that works across platforms
-        base_path_resolved = base_path.resolve()
-        full_path_resolved = full_path.resolve()
-        
+        # Validate path is within external storage directory
         try:
-            # Check if the resolved path is within the allowed directory
-            full_path_resolved.relative_to(base_path_resolved)
+            full_path = resolve_sandboxed_path(filename, root=base_path)
         except ValueError:
-            # Fallback to string-based check if relative_to fails
-            base_str = str(base_path_resolved).replace('\\', '/').rstrip('/')
-            full_str = str(full_path_resolved).replace('\\', '/')
-            
-            if not (full_str.startswith(base_str + '/') or full_str == base_str):
-                raise ValueError("Path must be within the external storage directory")
+            raise ValueError("Path must be within the external storage directory")
             
         # Create directories if they don't exist
         full_path.parent.mkdir(parents=True, exist_ok=True)
@@ -490,28 +908,15 @@ def save_to_external_file2(filepath, content, prepend=False, external_root_path=
     if not external_root_path:
         raise ValueError("external_root_path must be provided")
 
-    external_root_path = Path(external_root_path)
-    if not external_root_path.is_absolute():
-        external_root_path = external_root_path.resolve()
-
     # Normalize filepath to ensure it does not override the root path
-    filepath = Path(filepath.lstrip("/\\"))
-    full_path = external_root_path / filepath
+    filepath = filepath.lstrip("/\\")
 
     try:
-        # Validate full_path stays within external_root_path - more robust cross-platform check
-        full_path_resolved = full_path.resolve()
-        external_root_resolved = external_root_path.resolve()
-        
+        # Validate full_path stays within external_root_path
         try:
-            full_path_resolved.relative_to(external_root_resolved)
+            full_path = resolve_sandboxed_path(filepath, root=external_root_path)
         except ValueError:
-            # Fallback to string-based check if relative_to fails
-            external_str = str(external_root_resolved).replace('\\', '/').rstrip('/')
-            full_str = str(full_path_resolved).replace('\\', '/')
-            
-            if not (full_str.startswith(external_str + '/') or full_str == external_str):
-                raise ValueError("Path must be within the external storage root directory")
+            raise ValueError("Path must be within the external storage root directory")
 
         # Add delimiter if it's a valid non-empty string with at least 1 non-whitespace character
         if isinstance(delimiter, str) and len(delimiter.strip()) >= 1:
@@ -552,47 +957,8 @@ def save_to_json_file(data, output_file):
         save_to_json_file(data, "output.json")
     """
     try:
-        # Security check for path traversal
-        if ".." in output_file:
-            raise ValueError("Invalid filepath: Path traversal not allowed")
-            
-        # Handle absolute paths - check if they're within the user data directory
-        if output_file.startswith("/") or (len(output_file) > 1 and output_file[1] == ":"):  # Unix absolute or Windows absolute
-            from pathlib import Path
-            
-            try:
-                user_files_path = Path(APP_SETTINGS.USER_DATA_FILES_PATH).resolve()
-                file_path = Path(output_file).resolve()
-                
-                # More robust path validation that works across platforms
-                try:
-                    # Check if the resolved path is within the allowed directory
-                    file_path.relative_to(user_files_path)
-                    full_path = str(file_path)
-                except ValueError:
-                    # If relative_to fails, do a string-based check as fallback
-                    user_files_str = str(user_files_path)
-                    file_path_str = str(file_path)
-                    
-                    # Normalize path separators for comparison
-                    user_files_normalized = user_files_str.replace('\\', '/').rstrip('/')
-                    file_path_normalized = file_path_str.replace('\\', '/') 
-                    
-                    if file_path_normalized.startswith(user_files_normalized + '/') or file_path_normalized == user_files_normalized:
-                        full_path = str(file_path)
-                    else:
-                        raise ValueError("Invalid filepath: Path traversal not allowed")
-                        
-            except Exception as e:
-                # If path resolution fails completely, this is likely a security issue
-                if "Path traversal not allowed" in str(e):
-                    raise  # Re-raise the security error
-                else:
-                    print(f"Warning: Path resolution failed ({e}), rejecting absolute path for security")
-                    raise ValueError("Invalid filepath: Path traversal not allowed")
-        else:
-            # Relative path - join with user data files path
-            full_path = os.path.join(APP_SETTINGS.USER_DATA_FILES_PATH, output_file)
+        # Relative paths are joined with the user data files path, absolute ones must be inside it
+        full_path = str(resolve_sandboxed_path(output_file))
         
         # Create directories if they don't exist
         directory = os.path.dirname(full_path)
@@ -690,6 +1056,28 @@ def user_data_path(file_path: str) -> str:
     return os.path.join(APP_SETTINGS.USER_DATA_PATH, file_path) 
 
 
+def _json_db_full_path(db_filepath: str):
+    """
+    Resolve a database path: relative paths are joined with the user data files path,
+    absolute paths must be within it. Returns None for a path outside of it.
+    """
+    full_path = sandboxed_path_or_none(db_filepath)
+    return str(full_path) if full_path is not None else None
+
+
+def _json_db_open(db_filepath: str) -> Optional[DbBackend]:
+    """
+    Return the loaded database for a db path (kept in memory for the process, reloaded when the file changes).
+    A database which does not exist has `exists` False; a path outside of the user data files path returns None.
+    """
+    full_path = _json_db_full_path(db_filepath)
+    if full_path is None:
+        # Not even an unloaded backend: its writes would go to the path outside
+        return None
+    # SQLite backend for .sqlite/.sqlite3/.db files, JSON file otherwise
+    return open_db(full_path)
+
+
 @tool(category='database')
 def json_db_load(db_filepath: str) -> dict:
     """
@@ -700,45 +1088,8 @@ def json_db_load(db_filepath: str) -> dict:
     Returns:
         dict: Database content or empty dict if file not found
     """
-    try:
-        # Handle absolute paths - check if they're within the user data directory for security
-        if db_filepath.startswith("/") or (len(db_filepath) > 1 and db_filepath[1] == ":"):  # Unix absolute or Windows absolute
-            from pathlib import Path
-            
-            try:
-                user_files_path = Path(APP_SETTINGS.USER_DATA_FILES_PATH).resolve()
-                file_path = Path(db_filepath).resolve()
-                
-                # Validate the path is within allowed directory for security
-                try:
-                    file_path.relative_to(user_files_path)
-                    full_path = str(file_path)
-                except ValueError:
-                    # Fallback string-based check
-                    user_files_str = str(user_files_path)
-                    file_path_str = str(file_path)
-                    
-                    # Normalize path separators for comparison
-                    user_files_normalized = user_files_str.replace('\\', '/').rstrip('/')
-                    file_path_normalized = file_path_str.replace('\\', '/') 
-                    
-                    if file_path_normalized.startswith(user_files_normalized + '/') or file_path_normalized == user_files_normalized:
-                        full_path = str(file_path)
-                    else:
-                        print(f"Warning: Database path outside allowed directory: {db_filepath}")
-                        return {}
-                        
-            except Exception as e:
-                print(f"Warning: Path resolution failed for database ({e}): {db_filepath}")
-                return {}
-        else:
-            # Relative path - join with user data files path
-            full_path = os.path.join(APP_SETTINGS.USER_DATA_FILES_PATH, db_filepath)
-        
-        with open(full_path, "r", encoding="utf-8") as file:
-            return json.load(file)
-    except FileNotFoundError:
-        return {}
+    db = _json_db_open(db_filepath)
+    return db.to_dict() if db is not None and db.exists else {}
 
 
 @tool(category='database')
@@ -757,66 +1108,15 @@ def json_db_save(db_filepath: str, data: dict) -> dict:
       {"success": False, "message": "Error saving database file: error"}
   """
   try:
-    # Security check for path traversal
-    if ".." in db_filepath:
+    full_path = _json_db_full_path(db_filepath)
+    if full_path is None:
         return {
             "success": False,
             "message": f"Error saving database file: Invalid filepath: Path traversal not allowed"
         }
-        
-    # Handle absolute paths - check if they're within the user data directory
-    if db_filepath.startswith("/") or (len(db_filepath) > 1 and db_filepath[1] == ":"):  # Unix absolute or Windows absolute
-        from pathlib import Path
-        
-        try:
-            user_files_path = Path(APP_SETTINGS.USER_DATA_FILES_PATH).resolve()
-            file_path = Path(db_filepath).resolve()
-            
-            # More robust path validation that works across platforms
-            try:
-                # Check if the resolved path is within the allowed directory
-                file_path.relative_to(user_files_path)
-                full_path = str(file_path)
-            except ValueError:
-                # If relative_to fails, do a string-based check as fallback
-                user_files_str = str(user_files_path)
-                file_path_str = str(file_path)
-                
-                # Normalize path separators for comparison
-                user_files_normalized = user_files_str.replace('\\', '/').rstrip('/')
-                file_path_normalized = file_path_str.replace('\\', '/') 
-                
-                if file_path_normalized.startswith(user_files_normalized + '/') or file_path_normalized == user_files_normalized:
-                    full_path = str(file_path)
-                else:
-                    return {
-                        "success": False,
-                        "message": f"Error saving database file: Invalid filepath: Path traversal not allowed"
-                    }
-                    
-        except Exception as e:
-            # If path resolution fails completely, this is likely a security issue
-            if "Path traversal not allowed" in str(e):
-                return {
-                    "success": False,
-                    "message": f"Error saving database file: {str(e)}"
-                }
-            else:
-                return {
-                    "success": False,
-                    "message": f"Error saving database file: Invalid filepath: Path traversal not allowed"
-                }
-    else:
-        # Relative path - join with user data files path
-        full_path = os.path.join(APP_SETTINGS.USER_DATA_FILES_PATH, db_filepath)
     
-    # Create directories if they don't exist
-    directory = os.path.dirname(full_path)
-    if directory and not os.path.exists(directory):
-        os.makedirs(directory)
-    
-    with open(full_path, "w", encoding="utf-8") as file:
-      json.dump(data, file, indent=2, ensure_ascii=False)
+    # Whole database is written at once, pending journal changes are dropped
+    save_db(full_path, data)
     return {
       "success": True,
       "message": "Database saved successfully."
@@ -862,7 +1162,8 @@ def json_db_create_db_without_schema(
         {"success": False, "message": "Database file already exists."}
     """
     # Check if file already exists
-    if os.path.exists(db_filepath):
+    full_path = _json_db_full_path(db_filepath)
+    if full_path is not None and os.path.exists(full_path):
         return {
           "success": False,
           "message": "Database file already exists.",
@@ -918,12 +1219,8 @@ def json_db_get_entry(db_filepath: str, collection: str, entry_id: str) -> dict:
     Returns:
         dict: Entry data or None if not found
     """
-    db = json_db_load(db_filepath)
-    # return next((entry for entry in db.get(collection, []) if entry["id"] == entry_id), None)
-    for entry in db.get("collections", {}).get(collection, []):
-        if entry["id"] == entry_id:
-            return entry
-    return None
+    db = _json_db_open(db_filepath)
+    return db.get_entry(collection, entry_id) if db is not None else None
 
 
 @tool(category='database')
@@ -950,17 +1247,156 @@ def json_db_get_collection(db_filepath: str, collection: str) -> dict:
             {"success": False, "message": "Database file not found."}
             {"success": False, "message": "Collection not found."}
     """
-    db = json_db_load(db_filepath)
-    if not db:
+    db = _json_db_open(db_filepath)
+    if db is None:
+        return {"success": False, "message": PATH_TRAVERSAL_ERROR}
+    if not db.exists:
         return {"success": False, "message": "Database file not found."}
     
-    collection_data = db.get("collections", {}).get(collection)
+    collection_data = db.get_entries(collection)
     if collection_data is None:
         return {"success": False, "message": "Collection not found."}
         
     return {"success": True, "message": "Collection retrieved successfully.", "data": {"collection_name": collection, "total_entries": len(collection_data), "entries": collection_data}}
 
 
+@tool(category='database')
+def json_db_iter_collection(db_filepath: str, collection: str, offset: int = 0):
+    """
+    Stream entries of one collection (newest first) straight from the database file,
+    without loading the whole database into memory. Use for large databases.
+    Args:
+      db_filepath (str): Path to the database file
+      collection (str): Collection name
+      offset (int): Number of entries to skip
+    Returns:
+      Iterator over entries (dicts)
+    Example:
+      >>> for entry in json_db_iter_collection("databases/knowledge.json", "entries"):
+      ...     print(entry["id"])
+    """
+    full_path = _json_db_full_path(db_filepath)
+    if full_path is None:
+        raise Exception("Invalid filepath: Path traversal not allowed")
+    entries = iter_db_collection(full_path, collection, offset=offset)
+    if entries is None:
+        raise Exception("Database file or collection not found.")
+    return entries
+
+
+@tool(category='database')
+def json_db_query(db_filepath: str, collection: str, where: dict = None, sort_by: str = None, descending: bool = False, limit: int = 50, offset: int = 0) -> dict:
+    """
+    Find entries of a collection by field values, using the collection's indexes where available.
+
+    Args:
+        db_filepath (str): Path to the database file
+        collection (str): Collection name
+        where (dict): Conditions, all must match (optional). A value means equality
+            (for list fields: contains), a dict means operators:
+            {"url": "https://...", "created_at": {"gte": "2025-01-01"}, "title": {"prefix": "AI"}, "tags": {"in": ["a", "b"]}}
+            Operators: eq, in, gt, gte, lt, lte, prefix
+        sort_by (str): Field to sort by (optional, default newest entries first)
+        descending (bool): Sort from highest to lowest value
+        limit (int): Maximum number of entries to return (None = all)
+        offset (int): Number of matching entries to skip
+
+    Returns:
+        dict: Response object with success status and data
+        Example:
+            {
+                "success": True,
+                "message": "Query finished successfully.",
+                "data": {
+                    "collection_name": "entries",
+                    "total_entries": 12,
+                    "offset": 0,
+                    "limit": 50,
+                    "entries": [...]
+                }
+            }
+            {"success": False, "message": "Database file not found."}
+            {"success": False, "message": "Collection not found."}
+    """
+    db = _json_db_open(db_filepath)
+    if db is None:
+        return {"success": False, "message": PATH_TRAVERSAL_ERROR}
+    if not db.exists:
+        return {"success": False, "message": "Database file not found."}
+
+    result = db.query(collection, where=where, sort_by=sort_by, descending=descending, limit=limit, offset=offset)
+    if result is None:
+        return {"success": False, "message": "Collection not found."}
+
+    return {"success": True, "message": "Query finished successfully.", "data": {"collection_name": collection, "total_entries": result["total"], "offset": offset, "limit": limit, "entries": result["entries"]}}
+
+
+@tool(category='database')
+def json_db_create_index(db_filepath: str, collection: str, field: str, index_type: str = "hash") -> dict:
+    """
+    Create a secondary index on a collection field (stored in the database under "db_indexes").
+    Indexes are kept up to date on every change and used by json_db_query.
+    Args:
+      db_filepath (str): Path to the database file
+      collection (str): Collection name
+      field (str): Entry field to index
+      index_type (str): "hash" for equality lookups (e.g. url, tags),
+        "sorted" for range/prefix lookups and sorting (e.g. created_at)
+    Returns:
+      dict: Response object with success status and message
+      Example:
+        {"success": True, "message": "Index created successfully.", "data": {"collection_name": "entries", "indexes": {"url": "hash"}}}
+        {"success": False, "message": "Database file not found."}
+    """
+    db = _json_db_open(db_filepath)
+    if db is None:
+        return {"success": False, "message": PATH_TRAVERSAL_ERROR}
+    if not db.exists:
+        return {"success": False, "message": "Database file not found."}
+    if db.get_indexes(collection).get(field) != index_type:
+        db.define_index(collection, field, index_type)
+    return {"success": True, "message": "Index created successfully.", "data": {"collection_name": collection, "indexes": db.get_indexes(collection)}}
+
+
+@tool(category='database')
+def json_db_drop_index(db_filepath: str, collection: str, field: str) -> dict:
+    """
+    Remove the secondary index of a collection field.
+    Args:
+      db_filepath (str): Path to the database file
+      collection (str): Collection name
+      field (str): Indexed entry field
+    Returns:
+      dict: Response object with success status and message
+      Example:
+        {"success": True, "message": "Index dropped successfully.", "data": {"collection_name": "entries", "indexes": {}}}
+        {"success": False, "message": "Index not found."}
+    """
+    db = _json_db_open(db_filepath)
+    if db is None:
+        return {"success": False, "message": PATH_TRAVERSAL_ERROR}
+    if not db.exists:
+        return {"success": False, "message": "Database file not found."}
+    if field not in db.get_indexes(collection):
+        return {"success": False, "message": "Index not found."}
+    db.define_index(collection, field, None)
+    return {"success": True, "message": "Index dropped successfully.", "data": {"collection_name": collection, "indexes": db.get_indexes(collection)}}
+
+
+def _json_db_prepare_entry(entry: dict, schema, entry_datetime: str, add_createdat: bool = None, add_updatedat: bool = None) -> dict:
+    """Set id, schema defaults and timestamps of a new entry (in place). Returns the entry."""
+    # Defaults and required timestamps of the compiled collection schema
+    if schema is not None:
+        schema.fill_defaults(entry, entry_datetime)
+
+    entry["id"] = entry.get("id", generate_id())
+    if add_createdat and "created_at" not in entry:
+        entry["created_at"] = entry_datetime
+    if add_updatedat and "updated_at" not in entry:
+        entry["updated_at"] = entry_datetime
+    return entry
+
+
 @tool(category='database')
 def json_db_add_entry(db_filepath: str, collection: str, entry: dict, add_createdat: bool = None, add_updatedat: bool = None) -> str:
     """
@@ -984,46 +1420,24 @@ def json_db_add_entry(db_filepath: str, collection: str, entry: dict, add_create
     Raises:
         Exception: With specific message if validation fails.
     """
-    db_data = json_db_load(db_filepath)
-    if not db_data:
+    db = _json_db_open(db_filepath)
+    if db is None:
+        return {"success": False, "message": PATH_TRAVERSAL_ERROR}
+    if not db.exists:
         raise Exception("Database file not found.")
     if not collection:
         raise Exception("Collection name (str) is required.")
     if not entry:
         raise Exception("Entry (dict) is required.")
 
-    if "collections" not in db_data:
-        db_data["collections"] = {}
-    if collection not in db_data["collections"]:
-        db_data["collections"][collection] = []
-
     entry_datetime = current_datetime_iso()
 
-    # Check schema for required timestamps
-    if "db_json_schema" in db_data:
-        schema = db_data["db_json_schema"]
-        if "collections" in schema.get("properties", {}):
-            collection_schema = schema["properties"]["collections"]["properties"].get(collection, {})
-            if "items" in collection_schema:
-                required_fields = collection_schema["items"].get("required", [])
-                if "created_at" in required_fields and "created_at" not in entry:
-                    entry["created_at"] = entry_datetime
-                if "updated_at" in required_fields and "updated_at" not in entry:
-                    entry["updated_at"] = entry_datetime
-
-    entry_id = entry.get("id", generate_id())
-    entry["id"] = entry_id
-    if add_createdat and "created_at" not in entry:
-        entry["created_at"] = entry_datetime
-    if add_updatedat and "updated_at" not in entry:
-        entry["updated_at"] = entry_datetime
-
-    db_data["collections"][collection].insert(0, entry)
+    with db.transaction():
+        _json_db_prepare_entry(entry, db.collection_schema(collection), entry_datetime, add_createdat, add_updatedat)
+        entry_id = entry["id"]
 
-    if "db_info" in db_data:
-        db_data["db_info"]["updated_at"] = entry_datetime
-
-    json_db_save(db_filepath, db_data)
+        # Appended to the database journal, the file is not rewritten
+        db.add_entry(collection, entry, updated_at=entry_datetime)
 
     return {
         ResponseKey.STATUS: ResponseStatus.SUCCESS,
@@ -1051,31 +1465,26 @@ def json_db_update_entry(db_filepath: str, collection: str, entry_id: str, updat
         {"success": False, "message": "Database file not found."}
         {"success": False, "message": "Entry not found."}
     """
-    db = json_db_load(db_filepath)
-    if not db:
+    db = _json_db_open(db_filepath)
+    if db is None:
+        return {"success": False, "message": PATH_TRAVERSAL_ERROR}
+    if not db.exists:
        return {"success": False, "message": "Database file not found."}
-    for entry in db.get("collections", {}).get(collection, []):
-        if entry["id"] == entry_id:
-            entry_datetime = current_datetime_iso()
-
-            # Check schema for required timestamps
-            if "db_json_schema" in db:
-              schema = db["db_json_schema"]
-              if "collections" in schema.get("properties", {}):
-                collection_schema = schema["properties"]["collections"]["properties"].get(collection, {})
-                if "items" in collection_schema:
-                  required_fields = collection_schema["items"].get("required", [])                  
-                  if "created_at" in required_fields and "created_at" not in entry:
-                    updates["created_at"] = entry_datetime                    
-                  if "updated_at" in required_fields and "updated_at" not in entry:
-                    updates["updated_at"] = entry_datetime
-
-            entry.update(updates)
-            if "db_info" in db:
-              db["db_info"]["updated_at"] = entry_datetime
-            json_db_save(db_filepath, db)
-            return {"success": True, "message": "Entry updated successfully.", "data": {"entry_id": entry_id}}
-    return {"success": False, "message": "Entry not found."}
+
+    with db.transaction():
+        entry = db.get_entry(collection, entry_id)
+        if entry is None:
+            return {"success": False, "message": "Entry not found."}
+
+        entry_datetime = current_datetime_iso()
+
+        # Defaults and required timestamps of the compiled collection schema
+        schema = db.collection_schema(collection)
+        if schema is not None:
+            updates = schema.fill_defaults({**entry, **updates}, entry_datetime)
+
+        db.update_entry(collection, entry_id, updates, updated_at=entry_datetime)
+    return {"success": True, "message": "Entry updated successfully.", "data": {"entry_id": entry_id}}
 
 
 @tool(category='database')
@@ -1093,18 +1502,272 @@ def json_db_delete_entry(db_filepath: str, collection: str, entry_id: str) -> bo
         {"success": False, "message": "Database file not found."}
         {"success": False, "message": "Entry not found."}
     """
-    db = json_db_load(db_filepath)
-    db_collection = db.get("collections", {}).get(collection, [])
-    original_len = len(db_collection)
-    db["collections"][collection] = [e for e in db_collection if e["id"] != entry_id]
-    if len(db["collections"][collection]) < original_len:
-        if "db_info" in db:
-            db["db_info"]["updated_at"] = current_datetime_iso()
-        json_db_save(db_filepath, db)
+    db = _json_db_open(db_filepath)
+    if db is None:
+        return {"success": False, "message": PATH_TRAVERSAL_ERROR}
+    if not db.exists:
+        return {"success": False, "message": "Database file not found."}
+    if db.delete_entry(collection, entry_id, updated_at=current_datetime_iso()):
         return {"success": True, "message": "Entry deleted successfully.", "data": {"entry_id": entry_id}}
     return {"success": False, "message": "Entry not found."}
 
 
+def _json_db_validate_batch(schema, entries: list) -> None:
+    """Raise with the errors of all invalid entries of a batch (by position in the batch)."""
+    if schema is None:
+        return
+    invalid = schema.validate_batch(entries)
+    if invalid:
+        details = "; ".join(
+            f"#{position} ({entries[position].get('id')}): {format_validation_errors(errors, max_errors=3)}"
+            for position, errors in list(invalid.items())[:10]
+        )
+        raise Exception(f"{len(invalid)} of {len(entries)} entries do not match the database schema: {details}")
+
+
+@tool(category='database')
+def json_db_bulk_add(db_filepath: str, collection: str, entries: list, add_createdat: bool = None, add_updatedat: bool = None, on_duplicate: str = "skip") -> dict:
+    """
+    Add many entries to a collection in one write (one transaction).
+    Entries are added in list order, so the last one becomes the newest.
+
+    Args:
+        db_filepath (str): Path to the database file
+        collection (str): Collection name
+        entries (list): Entries (dicts) to add, an entry without "id" gets a new one
+        add_createdat (bool): If True, adds created_at timestamp to entries (optional)
+        add_updatedat (bool): If True, adds updated_at timestamp to entries (optional)
+        on_duplicate (str): What to do with an entry whose id is already in the collection
+            or earlier in the batch: "skip" (keep the existing one) or "replace"
+
+    Returns:
+        dict: Response object with success status and data
+        Example:
+            {
+                "success": True,
+                "message": "Entries added: 2, skipped: 1",
+                "data": {"added_ids": ["abc123", "def456"], "skipped_ids": ["ghi789"]}
+            }
+    Raises:
+        Exception: With specific message if validation fails.
+    """
+    db = _json_db_open(db_filepath)
+    if db is None:
+        return {"success": False, "message": PATH_TRAVERSAL_ERROR}
+    if not db.exists:
+        raise Exception("Database file not found.")
+    if not collection:
+        raise Exception("Collection name (str) is required.")
+    if not isinstance(entries, list) or not all(isinstance(entry, dict) for entry in entries):
+        raise Exception("Entries (list of dicts) are required.")
+    if on_duplicate not in ("skip", "replace"):
+        raise Exception("on_duplicate must be 'skip' or 'replace'.")
+
+    entry_datetime = current_datetime_iso()
+    added_ids = []
+    skipped_ids = []
+
+    with db.transaction():
+        schema = db.collection_schema(collection)
+        batch = {}
+        for entry in entries:
+            entry = _json_db_prepare_entry(dict(entry), schema, entry_datetime, add_createdat, add_updatedat)
+            if on_duplicate == "skip" and (entry["id"] in batch or db.get_entry(collection, entry["id"]) is not None):
+                skipped_ids.append(entry["id"])
+                continue
+            # A replaced id moves to the position of its last occurrence
+            batch.pop(entry["id"], None)
+            batch[entry["id"]] = entry
+
+        # Whole batch is validated before anything is written
+        _json_db_validate_batch(schema, list(batch.values()))
+        for entry_id, entry in batch.items():
+            db.add_entry(collection, entry, updated_at=entry_datetime, validate=False)
+            added_ids.append(entry_id)
+
+    return {"success": True, "message": f"Entries added: {len(added_ids)}, skipped: {len(skipped_ids)}", "data": {"added_ids": added_ids, "skipped_ids": skipped_ids}}
+
+
+@tool(category='database')
+def json_db_bulk_update(db_filepath: str, collection: str, updates: list) -> dict:
+    """
+    Update many entries of a collection in one write (one transaction).
+    Args:
+      db_filepath (str): Path to the database file
+      collection (str): Collection name
+      updates (list): Dicts with "id" of the entry and the fields to update,
+        several updates of one id are merged in list order
+    Returns:
+      dict: Response object with success status and data
+      Example:
+        {"success": True, "message": "Entries updated: 2, not found: 1", "data": {"updated_ids": ["abc123", "def456"], "not_found_ids": ["ghi789"]}}
+        {"success": False, "message": "Database file not found."}
+    """
+    db = _json_db_open(db_filepath)
+    if db is None:
+        return {"success": False, "message": PATH_TRAVERSAL_ERROR}
+    if not db.exists:
+        return {"success": False, "message": "Database file not found."}
+    if not isinstance(updates, list) or not all(isinstance(update, dict) and update.get("id") for update in updates):
+        raise Exception("Updates (list of dicts with 'id') are required.")
+
+    merged_updates = {}
+    for update in updates:
+        merged_updates.setdefault(update["id"], {}).update(update)
+
+    entry_datetime = current_datetime_iso()
+    updated_ids = []
+    not_found_ids = []
+
+    with db.transaction():
+        schema = db.collection_schema(collection)
+        updated_entries = {}
+        for entry_id, entry_updates in merged_updates.items():
+            entry = db.get_entry(collection, entry_id)
+            if entry is None:
+                not_found_ids.append(entry_id)
+                continue
+            updated_entries[entry_id] = {**entry, **entry_updates}
+            if schema is not None:
+                schema.fill_defaults(updated_entries[entry_id], entry_datetime)
+
+        # Whole batch is validated before anything is written
+        _json_db_validate_batch(schema, list(updated_entries.values()))
+        for entry_id, updated_entry in updated_entries.items():
+            db.update_entry(collection, entry_id, updated_entry, updated_at=entry_datetime, validate=False)
+            updated_ids.append(entry_id)
+
+    return {"success": True, "message": f"Entries updated: {len(updated_ids)}, not found: {len(not_found_ids)}", "data": {"updated_ids": updated_ids, "not_found_ids": not_found_ids}}
+
+
+@tool(category='database')
+def json_db_bulk_delete(db_filepath: str, collection: str, entry_ids: list) -> dict:
+    """
+    Delete many entries by ID in one write (one transaction).
+    Args:
+      db_filepath (str): Path to the database file
+      collection (str): Collection name
+      entry_ids (list): IDs of the entries to delete (duplicates are ignored)
+    Returns:
+      dict: Response object with success status and data
+      Example:
+        {"success": True, "message": "Entries deleted: 2, not found: 0", "data": {"deleted_ids": ["abc123", "def456"], "not_found_ids": []}}
+        {"success": False, "message": "Database file not found."}
+    """
+    db = _json_db_open(db_filepath)
+    if db is None:
+        return {"success": False, "message": PATH_TRAVERSAL_ERROR}
+    if not db.exists:
+        return {"success": False, "message": "Database file not found."}
+
+    entry_datetime = current_datetime_iso()
+    deleted_ids = []
+    not_found_ids = []
+
+    with db.transaction():
+        for entry_id in dict.fromkeys(entry_ids or []):
+            if db.delete_entry(collection, entry_id, updated_at=entry_datetime):
+                deleted_ids.append(entry_id)
+            else:
+                not_found_ids.append(entry_id)
+
+    return {"success": True, "message": f"Entries deleted: {len(deleted_ids)}, not found: {len(not_found_ids)}", "data": {"deleted_ids": deleted_ids, "not_found_ids": not_found_ids}}
+
+
+@tool(category='database')
+def json_db_transaction(db_filepath: str):
+    """
+    Open a transaction on a database: changes made in the block are written together
+    (one journal append and fsync), under an exclusive lock between processes.
+    If the block raises, none of its changes are written.
+    Args:
+      db_filepath (str): Path to the database file
+    Returns:
+      Context manager yielding the database engine (JsonDb or SqliteDb)
+    Example:
+      >>> with json_db_transaction("databases/notes.json") as db:
+      ...     db.add_entry("notes", {"id": generate_id(), "text": "a"})
+      ...     db.delete_entry("notes", "abc123")
+    """
+    db = _json_db_open(db_filepath)
+    if db is None:
+        raise ValueError(PATH_TRAVERSAL_ERROR)
+    if not db.exists:
+        raise Exception("Database file not found.")
+    return db.transaction()
+
+
+@tool(category='database')
+def json_db_flush(db_filepath: str = None) -> dict:
+    """
+    Write pending changes of loaded databases into their files and drop them from memory.
+    Use before reading or editing a database file directly.
+    Args:
+      db_filepath (str): Path to the database file (optional, default all loaded databases)
+    Returns:
+      dict: Response object with success status and message
+      Example:
+        {"success": True, "message": "Databases flushed: 1", "data": {"flushed": 1}}
+    """
+    if db_filepath is None:
+        flushed = flush_json_dbs(evict=True)
+    else:
+        full_path = _json_db_full_path(db_filepath)
+        if full_path is None:
+            return {"success": False, "message": PATH_TRAVERSAL_ERROR}
+        # SQLite databases have no journal to merge
+        flushed = 0 if is_sqlite_db_path(full_path) else flush_json_dbs(full_path, evict=True)
+    return {"success": True, "message": f"Databases flushed: {flushed}", "data": {"flushed": flushed}}
+
+
+def _json_db_convert(source_db_filepath: str, target_db_filepath: str) -> dict:
+    source_path = _json_db_full_path(source_db_filepath)
+    target_path = _json_db_full_path(target_db_filepath)
+    if source_path is None or target_path is None:
+        return {"success": False, "message": PATH_TRAVERSAL_ERROR}
+    if not _json_db_open(source_db_filepath).exists:
+        return {"success": False, "message": "Database file not found."}
+    db = convert_db(source_path, target_path)
+    collections = {name: db.count_entries(name) for name in db.collection_names()}
+    return {"success": True, "message": f"Database written to {target_db_filepath}", "data": {"db_path": target_db_filepath, "collections": collections}}
+
+
+@tool(category='database')
+def json_db_import_from_json(json_filepath: str, db_filepath: str) -> dict:
+    """
+    Import a JSON database file into another database, e.g. a SQLite database
+    (.sqlite, .sqlite3 or .db) for large collections. The target is replaced.
+    Args:
+      json_filepath (str): Path to the JSON database file
+      db_filepath (str): Path to the target database file
+    Returns:
+      dict: Response object with success status and data
+      Example:
+        {"success": True, "message": "Database written to databases/kb.sqlite", "data": {"db_path": "databases/kb.sqlite", "collections": {"entries": 120000}}}
+        {"success": False, "message": "Database file not found."}
+    """
+    return _json_db_convert(json_filepath, db_filepath)
+
+
+@tool(category='database')
+def json_db_export_to_json(db_filepath: str, json_filepath: str) -> dict:
+    """
+    Export a database (e.g. SQLite) to a plain JSON database file, without loss:
+    the JSON file can be imported back into the same database. The target is replaced.
+    Args:
+      db_filepath (str): Path to the database file
+      json_filepath (str): Path to the target JSON database file
+    Returns:
+      dict: Response object with success status and data
+      Example:
+        {"success": True, "message": "Database written to databases/kb.json", "data": {"db_path": "databases/kb.json", "collections": {"entries": 120000}}}
+        {"success": False, "message": "Database file not found."}
+    """
+    if is_sqlite_db_path(json_filepath):
+        return {"success": False, "message": "Target must be a JSON database file."}
+    return _json_db_convert(db_filepath, json_filepath)
+
+
 def brave_search(query: str, count: int = 5) -> Dict[str, Any]:
     """
     Search the web using Brave Search API.    
@@ -1374,7 +2037,8 @@ def extract_text_from_image_mistral_ocr(file_path):
           "image_url": f"data:{mime_type};base64,{base64_encoded}"
         }
     }
-    response = requests.post(API_BASE_URL, headers=headers, json=payload)
+    session, timeout = get_llm_http_session("mistral")
+    response = session.post(API_BASE_URL, headers=headers, json=payload, timeout=timeout)
     response.raise_for_status()
     result = response.json()
     return result.get("pages", [])[0].get("markdown", "")
@@ -1422,7 +2086,8 @@ def extract_text_from_image_openai(file_path, model=None):
         "temperature": 0,
         "max_tokens": 4096
     }
-    response = requests.post(API_BASE_URL, headers=headers, json=payload)
+    session, timeout = get_llm_http_session("openai")
+    response = session.post(API_BASE_URL, headers=headers, json=payload, timeout=timeout)
     response.raise_for_status()
     result = response.json()
     return result["choices"][0]["message"]["content"]
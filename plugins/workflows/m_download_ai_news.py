@@ -7,16 +7,39 @@ def download_ai_news(task_id ):
     try:
         wf = Workflow(task_id=task_id)
         
-        from plugins.tools.m_included import download_news_newsapi, split_clean, save_to_file, user_data_files_path, open_file
-        import json                    
+        from plugins.tools.m_included import (
+            download_news_newsapi, split_clean, save_to_file, user_data_files_path, open_file,
+            json_db_create_db_without_schema, json_db_create_index, json_db_bulk_add, json_db_query, json_db_add_entry,
+            json_db_flush
+        )
+        from app.storage.json_db import lock_path_for
+        import json
+        import os
 
-        open_file_result = open_file("ai_news.md")
-        
-        yield wf.stream_msg(msgTitle="Old articles - file", msgBody=open_file_result)
+        file_path = user_data_files_path("ai_news.md")
+        db_file_path = user_data_files_path("databases/ai_news.json")
+
+        # Articles are looked up by url in the database index instead of parsing the whole ai_news.md
+        if not os.path.exists(db_file_path):
+            # One-time import of articles saved before the database existed (oldest first, so newest stay first).
+            # Parsed before anything is written, and the database is built under another name and renamed
+            # only when complete, so a failed import is retried by the next run.
+            old_articles = split_clean(open_file("ai_news.md"), delimiter="-----") if os.path.exists(file_path) else []
+            old_entries = [json.loads(old_article) for old_article in reversed(old_articles)]
 
-        old_articles = split_clean(open_file_result, delimiter="-----")
+            import_db_file_path = db_file_path + ".importing"
+            if os.path.exists(import_db_file_path):
+                os.remove(import_db_file_path)
+            json_db_create_db_without_schema(import_db_file_path, title="AI news", initial_collections=["entries"])
+            json_db_create_index(import_db_file_path, collection="entries", field="url", index_type="hash")
+            json_db_bulk_add(import_db_file_path, collection="entries", entries=old_entries)
+            # Merge the journal into the file and drop it from memory before renaming
+            json_db_flush(import_db_file_path)
+            os.replace(import_db_file_path, db_file_path)
+            if lock_path_for(import_db_file_path).exists():
+                lock_path_for(import_db_file_path).unlink()
 
-        old_articles_urls = [json.loads(article).get("url") for article in old_articles]
+            yield wf.stream_msg(msgTitle="Old articles imported to database", msgBody=f"{len(old_articles)} articles from ai_news.md")
 
         # OR vs code OR hetzner OR open web ui OR hugging face
         news = download_news_newsapi(query="openai OR chatgpt OR mistral OR antrhopic OR claude OR github copilot OR cursor", lastDays=14, domains="techcrunch.com,thenextweb.com")
@@ -29,17 +52,15 @@ def download_ai_news(task_id ):
         new_articles_skipped = []
         new_articles_saved = []
 
-        file_path = user_data_files_path("ai_news.md")
-        db_file_path = user_data_files_path("databases/ai_news.json")
-
         for new_article in new_articles:
-            if new_article.get("url") in old_articles_urls:                
+            existing = json_db_query(db_file_path, collection="entries", where={"url": new_article.get("url")}, limit=1)
+            if existing["data"]["total_entries"]:
                 new_articles_skipped.append(new_article.get("url"))
                 continue
             
             new_article_readable = json.dumps(new_article, indent=2, ensure_ascii=False)
             
-            #json_db_add_entry(db_filepath=db_file_path, collection="entries", entry=article, add_createdat=False)
+            json_db_add_entry(db_filepath=db_file_path, collection="entries", entry=dict(new_article), add_createdat=False)
             
             save_file_result = save_to_file(filepath=file_path, content=new_article_readable, delimiter="-----", prepend=True)
             new_articles_saved.append(new_article.get("url"))
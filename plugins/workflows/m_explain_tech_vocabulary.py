@@ -7,7 +7,7 @@ def explain_tech_vocabulary(task_id, model="openai/gpt-4.1-mini"):
     try:
         wf = Workflow(task_id=task_id)
         
-        from plugins.tools.m_included import open_file, split_clean, fetch_llm, save_to_external_file2
+        from plugins.tools.m_included import iter_records, split_clean, iter_fetch_llm_many, save_to_external_file2
         from plugins.prompts.m_explain_swe_terms import explain_swe_terms
         from app.configs.app_config import APP_SETTINGS
         from app.utils.response_types import ResponseKey, ResponseStatus
@@ -36,21 +36,18 @@ def explain_tech_vocabulary(task_id, model="openai/gpt-4.1-mini"):
         except Exception as e:
             raise ValueError(f"Failed to construct input file path. Root: {files_folder_root_path}, Folder: {files_folder_path}, File: {input_file_name + input_file_extension}. Error: {e}")
 
-        # Use Python's built-in open() for external storage files since open_file() is restricted to user data path
+        # Records are read one at a time from the external storage file
         try:
-            with input_file_path.open('r', encoding='utf-8') as f:
-                input_file = f.read()
+            input_file_records = iter_records(filepath=input_file_path, delimiter="-----", external_root_path=files_folder_root_path)
         except Exception as e:
             raise ValueError(f"Failed to read input file: {input_file_path}. Error: {e}")
-        
-        input_file_content_splitted = split_clean(content=input_file, delimiter="-----")
 
         input_file_content_transformed = []
 
         # transform input file content into a list of dictionaries
         # each dictionary contains 'term' and 'explanation' keys
         # IMPORTANT: Process in original order to maintain record sequence
-        for i, item in enumerate(input_file_content_splitted):        
+        for i, item in enumerate(input_file_records):        
             parts = split_clean(content=item, delimiter="==")
             item_dict = {
                 "original_index": i,  # Track original position
@@ -61,35 +58,31 @@ def explain_tech_vocabulary(task_id, model="openai/gpt-4.1-mini"):
 
         yield wf.stream_msg(msg={"title": f"File loaded - total terms: {len(input_file_content_transformed)}", "body": str(input_file_content_transformed)})
 
-        # Process each term and explanation IN ORIGINAL ORDER
-        # Create a copy of the list to avoid modifying during iteration
-        items_to_process = input_file_content_transformed.copy()
-        items_without_explanation = 0
+        # Only process terms that have no explanation or empty explanation
+        items_to_process = [item for item in input_file_content_transformed if not item.get("explanation", "").strip()]
+        items_without_explanation = len(items_to_process)
         items_explained = 0
 
+        # Fetch all explanations concurrently; results arrive in completion order,
+        # each one is written back to its own item, so the record order is kept
+        llm_requests = [{"input": explain_swe_terms(input=item["term"]), "model_name": model} for item in items_to_process]
 
-        for item in items_to_process:
+        for index, llm_output, llm_error in iter_fetch_llm_many(llm_requests):
+            item = items_to_process[index]
             term = item["term"]
-            explanation = item.get("explanation", "").strip()
-            
-            # Only process terms that have no explanation or empty explanation
-            if not explanation:
-                items_without_explanation += 1
-                #yield wf.stream_msg(msg={"title": f"Processing unexplained term: '{term}'", "body": "Fetching explanation from LLM..."})
-                
-                # If no explanation, fetch it using the LLM
-                llm_explanation = fetch_llm(input=explain_swe_terms(input=term), model_name=model).get("data", {}).get("content", "")
-
-                yield wf.stream_msg(msg={"title": f"LLM: explanation for '{term}'", "body": str(llm_explanation)})
-
-                items_explained += 1
-
-                # Update the original item in the list (find by original_index)
-                for orig_item in input_file_content_transformed:
-                    if orig_item["original_index"] == item["original_index"]:
-                        orig_item["explanation"] = llm_explanation
-                        break
-        
+
+            if llm_error is not None:
+                # Leave the term unexplained, it will be processed on the next run
+                yield wf.stream_msg(msg={"title": f"LLM: explanation for '{term}' failed", "body": str(llm_error)})
+                continue
+
+            llm_explanation = llm_output.get("data", {}).get("content", "")
+
+            yield wf.stream_msg(msg={"title": f"LLM: explanation for '{term}'", "body": str(llm_explanation)})
+
+            items_explained += 1
+            item["explanation"] = llm_explanation
+
         yield wf.stream_msg(msg={"title": f"Terms without explanation: {items_without_explanation}", "body": ""})
 
         yield wf.stream_msg(msg={"title": f"Terms explained: {items_explained}", "body": ""})
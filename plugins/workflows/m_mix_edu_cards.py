@@ -7,10 +7,9 @@ def mix_edu_cards(task_id):
     try:
         wf = Workflow(task_id=task_id)
         
-        from plugins.tools.m_included import open_file, split_clean, save_to_external_file2, formatted_datetime
+        from plugins.tools.m_included import sample_records, count_records, save_to_external_file2, formatted_datetime
         from app.configs.app_config import APP_SETTINGS
         import os
-        import random            
 
         files_folder_root = APP_SETTINGS.EXTERNAL_STORAGE_1_LOCAL_PATH
         files_folder_path = "_knowledge_base"
@@ -32,17 +31,15 @@ def mix_edu_cards(task_id):
         final_mixed_content = []
 
         for file_name, items_count in files_to_process.items():
-            file_path = os.path.join(files_folder_root, files_folder_path, file_name)
-            file_content = open_file(filepath=file_path)
-            file_content_splitted = split_clean(content=file_content, delimiter="-----")
-            
-            # Calculate how many items to pick (min between available items and desired count)
-            items_to_pick = min(items_count, len(file_content_splitted))
-            selected_items = random.sample(file_content_splitted, items_to_pick)
+            file_path = os.path.join(files_folder_path, file_name)
+            # Only the picked records are read (record offsets are indexed once per file version)
+            selected_items = sample_records(filepath=file_path, k=items_count, delimiter="-----", external_root_path=files_folder_root)
+            records_count = count_records(filepath=file_path, delimiter="-----", external_root_path=files_folder_root)
+            items_to_pick = len(selected_items)
             
             # Extract the join operation from f-string for Python 3.10 compatibility
             selected_items_text = "\n-----\n".join(selected_items)
-            yield wf.stream_msg(msgTitle=f"File '{file_name}': selected items ({items_to_pick}/{len(file_content_splitted)})", msgBody=f"Selected {items_to_pick} items from {len(file_content_splitted)} available:\n\n{selected_items_text}")
+            yield wf.stream_msg(msgTitle=f"File '{file_name}': selected items ({items_to_pick}/{records_count})", msgBody=f"Selected {items_to_pick} items from {records_count} available:\n\n{selected_items_text}")
             all_files_content.append({file_name: selected_items})
             final_mixed_content.extend(selected_items)
                  
@@ -12,9 +12,9 @@ def write_story(input, task_id, model="openai/gpt-4.1"):
 
         yield wf.stream_msg(msgTitle="Workflow started", msgBody="Generating story...")        
 
-        story = fetch_llm(input=write_story_v1(story_prompt=input.strip()), model_name=model).get("data", "").get("content", "")
+        story_deltas = fetch_llm(input=write_story_v1(story_prompt=input.strip()), model_name=model, stream=True)
 
-        yield wf.stream_msg(msgTitle="LLM: Story generated", msgBody=story)
+        story = yield from wf.stream_llm_output(story_deltas, msgTitle="LLM: Story generated")
 
         file_name = "stories.md"
 